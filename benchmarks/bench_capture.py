@@ -0,0 +1,85 @@
+"""
+Capture + preprocess cost per resolution.
+
+    python benchmarks/bench_capture.py                 # synthetic frames only
+    python benchmarks/bench_capture.py --screen        # also time grabbing the live display
+    python benchmarks/bench_capture.py --out capture.json
+
+Run under a virtual framebuffer (e.g. `xvfb-run -s "-screen 0 3840x2160x24"`) to time --screen headless.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from hero_capture import Preprocessor, ScreenSource  # noqa: E402
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm-up: allocates the reusable buffers
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def synthetic(width: int, height: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    frame = np.full((height, width, 3), 245, dtype=np.uint8)
+    # Noisy dark "text" stripes, one 14px line every 48px
+    for top in range(20, height - 20, 48):
+        frame[top:top + 14, 40:width - 40] = rng.integers(0, 2, size=(14, width - 80, 1), dtype=np.uint8) * 200
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--screen", action="store_true", help="also time ScreenSource.grab()")
+    parser.add_argument("--out", help="write the JSON result here")
+    args = parser.parse_args()
+
+    results = {}
+    for name, (w, h) in RESOLUTIONS.items():
+        frame = synthetic(w, h)
+        pre = Preprocessor()
+        plain = Preprocessor(binarize=False)
+        row = {
+            "grayscale_ms": round(timed(lambda: pre.grayscale(frame), args.repeat), 2),
+            "preprocess_ms": round(timed(lambda: pre.run(frame), args.repeat), 2),
+            "preprocess_no_binarize_ms": round(timed(lambda: plain.run(frame), args.repeat), 2),
+            "scale": pre.scale_for(w),
+        }
+        results[name] = row
+
+    if args.screen:
+        source = ScreenSource()
+        w, h = source.size()
+        pre = Preprocessor()
+        results["screen"] = {
+            "resolution": [w, h],
+            "grab_ms": round(timed(source.grab, args.repeat), 2),
+            "grab_and_preprocess_ms": round(timed(lambda: pre.run(source.grab()), args.repeat), 2),
+        }
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
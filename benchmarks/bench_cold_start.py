@@ -0,0 +1,98 @@
+"""
+Worker cold start: time to import hero.py in a fresh interpreter, per startup phase, plus
+the slowest modules from `python -X importtime`.
+
+    python benchmarks/bench_cold_start.py --runs 5
+    python benchmarks/bench_cold_start.py --out cold.json
+    python benchmarks/bench_cold_start.py --baseline cold.json     # exit 1 on a >15% regression
+    python benchmarks/bench_cold_start.py --log worker.log         # time-to-first-greeting from worker logs
+
+Time to first greeting needs a live LiveKit room, so it is read from the
+"[Startup] First greeting N.NNs after job start" lines the entrypoint logs.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    "import time; t = time.perf_counter(); import hero; total = time.perf_counter() - t; "
+    "import json; print(json.dumps({'import_s': total, 'phases': hero.startup.as_dict()}))"
+)
+GREETING_RE = re.compile(r"\[Startup\] First greeting ([\d.]+)s after job start")
+
+
+def run_probe() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import hero"], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if "." not in name.strip():
+            rows.append((name, int(parts[1]) / 1000))
+    rows.sort(key=lambda r: -r[1])
+    return [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in rows[:top]]
+
+
+def greetings(path: str) -> list:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return [float(m.group(1)) for m in GREETING_RE.finditer(f.read())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--log", help="worker log to read time-to-first-greeting from")
+    parser.add_argument("--out", help="write the JSON result here")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    runs = [run_probe() for _ in range(args.runs)]
+    imports = sorted(r["import_s"] for r in runs)
+    phases = {name: round(statistics.median(r["phases"].get(name, 0) for r in runs), 1) for name in runs[0]["phases"]}
+    result = {
+        "import_median_s": round(statistics.median(imports), 3),
+        "import_max_s": round(imports[-1], 3),
+        "phases_median_ms": phases,
+        "slowest_imports": slowest_imports(args.top),
+    }
+    if args.log:
+        seen = greetings(args.log)
+        if seen:
+            result["first_greeting_median_s"] = round(statistics.median(seen), 2)
+            result["first_greeting_samples"] = len(seen)
+
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        failed = False
+        for key in ("import_median_s", "first_greeting_median_s"):
+            if key in base and key in result and result[key] > base[key] * (1 + args.tolerance):
+                print(f"REGRESSION {key}: {base[key]} -> {result[key]}")
+                failed = True
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Full-frame OCR vs incremental tile OCR over a sequence of screenshots.
+
+    python benchmarks/bench_ocr_tiles.py recordings/session1          # PNGs, sorted by name
+    python benchmarks/bench_ocr_tiles.py --synthetic 20 --out result.json
+
+CPU time includes child processes, so the pytesseract fallback (one process per call)
+is measured fairly against tesserocr.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from hero_ocr import OcrPool  # noqa: E402
+from hero_ocr_tiles import TileOcrCache  # noqa: E402
+
+
+def load_frames(path: str):
+    files = sorted(glob.glob(os.path.join(path, "*.png")) + glob.glob(os.path.join(path, "*.jpg")))
+    return [Image.open(f).convert("RGB") for f in files]
+
+
+def synthetic_frames(count: int, size=(1920, 1080), seed: int = 7):
+    """
+    A text-heavy "desktop" where one text box changes per frame, like typing into a form.
+    """
+    rng = random.Random(seed)
+    words = "invoice report meeting agenda python search result settings window folder open save".split()
+    base = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(base)
+    for row in range(40, size[1] - 40, 26):
+        draw.text((40, row), " ".join(rng.choice(words) for _ in range(14)), fill="black")
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        d = ImageDraw.Draw(frame)
+        d.rectangle((600, 500, 1300, 540), fill="white", outline="gray")
+        d.text((610, 512), f"typed so far: {' '.join(words[: i % len(words) + 1])}", fill="black")
+        frames.append(frame)
+    return frames
+
+
+def cpu_now() -> float:
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+async def run(frames, workers: int):
+    results = {}
+
+    pool = OcrPool(workers=workers)
+    pool.start()
+    started, cpu = time.perf_counter(), cpu_now()
+    for frame in frames:
+        await pool.image_to_string(frame)
+    results["full_frame"] = {"wall_s": time.perf_counter() - started, "cpu_s": cpu_now() - cpu}
+
+    tiles = TileOcrCache(pool=pool)
+    started, cpu = time.perf_counter(), cpu_now()
+    for frame in frames:
+        await tiles.read(frame)
+    results["tiled"] = {"wall_s": time.perf_counter() - started, "cpu_s": cpu_now() - cpu, **tiles.stats()}
+    pool.shutdown()
+
+    for r in results.values():
+        r["cpu_ms_per_call"] = round(r["cpu_s"] / len(frames) * 1000, 1)
+        r["wall_ms_per_call"] = round(r["wall_s"] / len(frames) * 1000, 1)
+    results["cpu_speedup"] = round(results["full_frame"]["cpu_s"] / max(results["tiled"]["cpu_s"], 1e-9), 1)
+    results["frames"] = len(frames)
+    results["resolution"] = list(frames[0].size)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", help="directory of recorded screenshots")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate N synthetic frames instead")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--out", help="write the JSON result here")
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.synthetic) if args.synthetic else load_frames(args.path or ".")
+    if not frames:
+        parser.error("no frames found")
+    result = asyncio.run(run(frames, args.workers))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Replays recorded sessions (HERO_TRACE_DIR traces) through the tools against the recorded
+upstream responses, so production traffic can serve as a benchmark workload.
+
+    python benchmarks/bench_replay.py traces/*.jsonl                  # recorded timing
+    python benchmarks/bench_replay.py traces/abc.jsonl --speed 0 --concurrency 8   # as fast as possible
+    python benchmarks/bench_replay.py traces/*.jsonl --speed 0 --out replay.json --baseline previous.json
+
+Screen and input tools run against the fake desktop from bench_tools.py unless --real-desktop
+is given; open_app and macro are skipped unless named with --allow. Caches start empty, so a
+response the recorded session got from a warm cache shows up under responses_missing.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_tools import install_desktop_fakes, point_at, use_fake_screen  # noqa: E402
+
+SIDE_EFFECTS = ("open_app", "macro")
+
+
+async def run(args) -> list:
+    import hero
+    from hero_http import close_session
+    from hero_trace import load_trace, replay
+
+    if not args.real_desktop:
+        use_fake_screen(args.ocr_ms_per_mp, quiet=not args.verbose)
+    tools = hero.Assistant(json.dumps({"tool_profile": "full"})).tools
+    skip = [t for t in SIDE_EFFECTS if t not in args.allow]
+    reports = []
+    for path in args.traces:
+        # Traces recorded by bench_tools.py name the stand-in URLs they were made against
+        try:
+            point_at(json.loads(load_trace(path)["session"].get("metadata") or "{}").get("upstreams", {}))
+        except (ValueError, AttributeError):
+            pass
+        report = await replay(path, tools, speed=args.speed, concurrency=args.concurrency, skip=skip)
+        reports.append(report)
+        print(f"{os.path.basename(path)}: {sum(r['calls'] for r in report['tools'].values())} calls in "
+              f"{report['wall_s']}s, {report['responses_served']} responses, "
+              f"{sum(report['responses_missing'].values())} missing, {len(report['output_size_changed'])} outputs changed")
+        for name, row in report["tools"].items():
+            print(f"  {name:22s} recorded p50 {row['recorded_p50_ms']:8.2f}ms p95 {row['recorded_p95_ms']:8.2f}ms | "
+                  f"replayed p50 {row['replayed_p50_ms']:8.2f}ms p95 {row['replayed_p95_ms']:8.2f}ms")
+    await close_session()
+    return reports
+
+
+def compare(reports: list, baseline: list, tolerance: float) -> list:
+    regressions = []
+    base = {(r["trace"], name): row for r in baseline for name, row in r["tools"].items()}
+    for report in reports:
+        for name, row in report["tools"].items():
+            old = base.get((report["trace"], name))
+            # Sub-millisecond tools are all noise; a regression must also cost at least 1ms
+            if old and row["replayed_p95_ms"] > max(old["replayed_p95_ms"] * (1 + tolerance), old["replayed_p95_ms"] + 1):
+                regressions.append(f"{report['trace']} {name}: p95 {old['replayed_p95_ms']}ms -> {row['replayed_p95_ms']}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traces", nargs="+")
+    parser.add_argument("--speed", type=float, default=1.0, help="timing scale; 0 = as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=4, help="calls in flight with --speed 0")
+    parser.add_argument("--allow", nargs="*", default=[], help=f"also replay these of {', '.join(SIDE_EFFECTS)}")
+    parser.add_argument("--real-desktop", action="store_true", help="drive the real screen, keyboard and mouse")
+    parser.add_argument("--input-ms", type=float, default=1.0, help="cost of one fake input action")
+    parser.add_argument("--ocr-ms-per-mp", type=float, default=40.0, help="fake OCR cost per megapixel")
+    parser.add_argument("--verbose", action="store_true", help="keep the tools' spoken output")
+    parser.add_argument("--out", help="write the JSON result here")
+    parser.add_argument("--baseline", help="earlier --out file to compare replayed p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if not args.real_desktop:
+        install_desktop_fakes(args.input_ms)
+    # Empty caches, and the search backend the recorded sessions used
+    os.environ["HERO_CACHE_DIR"] = tempfile.mkdtemp(prefix="hero-replay-")
+    os.environ.pop("HERO_TRACE_DIR", None)
+    for path in args.traces:
+        with open(path, encoding="utf-8") as f:
+            if "customsearch" in f.read():
+                os.environ.setdefault("GOOGLE_SEARCH_API_KEY", "replay")
+                os.environ.setdefault("SEARCH_ENGINE_ID", "replay")
+                break
+
+    import logging
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL)
+    reports = asyncio.run(run(args))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"wrote {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(reports, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Chars/sec of each text-injection backend, checked against what actually arrived.
+
+    xvfb-run -a python benchmarks/bench_text_input.py
+    python benchmarks/bench_text_input.py --sizes 10 100 1000 --out text_input.json
+
+A Tk text box is opened and focused as the target; after each run its contents are compared
+with the injected text, so a backend that is fast but drops or mangles characters shows up
+as "correct": false. Needs a display (a virtual one is fine) and, for the clipboard backend,
+xclip or xsel.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk  # noqa: E402
+
+from hero_text_input import text_input  # noqa: E402
+
+SAMPLES = {
+    "ascii": "The quick brown fox jumps over the lazy dog 0123456789. ",
+    "devanagari": "नमस्ते दुनिया ",
+}
+
+
+def make_text(kind: str, size: int) -> str:
+    base = SAMPLES[kind]
+    return (base * (size // len(base) + 1))[:size]
+
+
+class Target:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("hero text input bench")
+        self.box = tk.Text(self.root, width=100, height=30)
+        self.box.pack()
+        self.root.update()
+        self.root.focus_force()
+        self.box.focus_set()
+        self.root.update()
+
+    def run(self, text: str, method: str) -> dict:
+        self.box.delete("1.0", "end")
+        self.root.update()
+        outcome = {}
+
+        def inject():
+            started = time.perf_counter()
+            try:
+                asyncio.run(text_input.type(text, method))
+                outcome["seconds"] = time.perf_counter() - started
+            except Exception as e:
+                outcome["error"] = str(e)
+
+        worker = threading.Thread(target=inject)
+        worker.start()
+        # Tk must keep pumping events on this thread while input arrives
+        while worker.is_alive():
+            self.root.update()
+            time.sleep(0.002)
+        settle = time.perf_counter() + 0.3
+        while time.perf_counter() < settle:
+            self.root.update()
+            time.sleep(0.01)
+
+        if "error" in outcome:
+            return {"error": outcome["error"]}
+        got = self.box.get("1.0", "end-1c")
+        return {
+            "seconds": round(outcome["seconds"], 4),
+            "chars_per_sec": round(len(text) / outcome["seconds"], 1) if outcome["seconds"] else None,
+            "correct": got == text,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 1000])
+    parser.add_argument("--methods", nargs="+", default=["paste", "keys", "chars", "auto"])
+    parser.add_argument("--out", help="write the JSON result here")
+    args = parser.parse_args()
+
+    target = Target()
+    results = {"available": [b.name for b in text_input.backends.values() if b.available()], "runs": []}
+    for kind in SAMPLES:
+        for size in args.sizes:
+            text = make_text(kind, size)
+            for method in args.methods:
+                row = {"text": kind, "chars": size, "method": method}
+                row.update(target.run(text, method))
+                results["runs"].append(row)
+                print(row, flush=True)
+    target.root.destroy()
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
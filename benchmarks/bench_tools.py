@@ -0,0 +1,456 @@
+"""
+Offline load/latency benchmark for every tool the Assistant registers.
+
+Local stand-ins replace every external dependency:
+  - HTTP servers for Google CSE, DuckDuckGo, ipinfo, Open-Meteo geocoding/forecast and result pages,
+    with configurable latency, jitter and error rate (on their own thread and event loop),
+  - a fake pyautogui (no real input) and a fake OCR engine (cost scales with image size),
+  - a synthetic two-frame screen, and a no-op web browser.
+
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --requests 200 --concurrency 16 --latency 120 --jitter 40 --error-rate 0.02
+    python benchmarks/bench_tools.py --upstream google=300,80,0.1 --tools get_weather search_internet
+    python benchmarks/bench_tools.py --out run.json --baseline previous.json   # exit 1 on p95 regressions
+    python benchmarks/bench_tools.py --trace traces/    # record the run for bench_replay.py
+
+open_app and macro are skipped unless named with --tools: they launch real processes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+SKIPPED_BY_DEFAULT = ("open_app", "macro")
+CITIES = ["Delhi", "Mumbai", "London", "Paris", "Tokyo", "Berlin", "Madrid", "Rome", "Oslo", "Lima",
+          "Cairo", "Nairobi", "Sydney", "Toronto", "Chicago", "Denver", "Austin", "Seoul", "Hanoi", "Dubai"]
+
+
+# ========================= UPSTREAM STAND-INS ==========================
+
+@dataclass
+class Upstream:
+    latency_ms: float
+    jitter_ms: float
+    error_rate: float
+    requests: int = 0
+    errors: int = 0
+
+
+class StandIns:
+    """
+    One aiohttp app serving every upstream, run on a private thread so its work doesn't show
+    up as event-loop lag of the code under test.
+    """
+
+    def __init__(self, upstreams: dict):
+        self.upstreams = upstreams
+        self.port = 0
+        self.overrides = {}
+        self._ready = threading.Event()
+
+    async def _delay(self, name: str):
+        up = self.upstreams[name]
+        up.requests += 1
+        await asyncio.sleep(max(0.0, random.gauss(up.latency_ms, up.jitter_ms)) / 1000)
+        if random.random() < up.error_rate:
+            up.errors += 1
+            raise web.HTTPServiceUnavailable()
+
+    async def google(self, request):
+        await self._delay("google")
+        q = request.query.get("q", "")
+        return web.json_response({"items": [
+            {"title": f"{q} result {i}", "snippet": f"About {q}, part {i}. " * 4, "link": self.url(f"/page/{i}")}
+            for i in range(int(request.query.get("num", 3)))
+        ]})
+
+    async def ddg(self, request):
+        await self._delay("duckduckgo")
+        q = request.query.get("q", "")
+        return web.json_response([
+            {"title": f"{q} ddg {i}", "body": f"{q} explained, take {i}. " * 4, "href": self.url(f"/page/{i}")}
+            for i in range(int(request.query.get("max_results", 3)))
+        ])
+
+    async def ipinfo(self, request):
+        await self._delay("ipinfo")
+        return web.json_response({"city": "Delhi", "loc": "28.6519,77.2315"})
+
+    async def geocode(self, request):
+        await self._delay("open-meteo")
+        seed = sum(map(ord, request.query.get("name", "")))
+        return web.json_response({"results": [{"latitude": seed % 90 - 45 + 0.25, "longitude": seed % 180 - 90 + 0.5}]})
+
+    async def forecast(self, request):
+        await self._delay("open-meteo")
+        lats = request.query.get("latitude", "0").split(",")
+        items = [{"current_weather": {"temperature": 20 + i % 10, "windspeed": 7.5, "weathercode": 1}} for i in range(len(lats))]
+        return web.json_response(items if len(items) > 1 else items[0])
+
+    async def page(self, request):
+        await self._delay("pages")
+        words = " ".join(random.choice(["weather", "search", "news", "python", "voice", "agent"]) for _ in range(400))
+        return web.Response(text=f"<html><body><article><p>{words}</p><p>{words}</p></article></body></html>",
+                            content_type="text/html")
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.add_routes([
+            web.get("/customsearch/v1", self.google), web.get("/ddg", self.ddg), web.get("/json", self.ipinfo),
+            web.get("/v1/search", self.geocode), web.get("/v1/forecast", self.forecast), web.get("/page/{n}", self.page),
+        ])
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self._run, name="bench-standins", daemon=True).start()
+        self._ready.wait()
+
+
+# ========================= FAKE BACKENDS ==========================
+
+def install_desktop_fakes(input_ms: float):
+    """Registers a fake pyautogui and a no-op web browser before the tools import them."""
+    gui = types.ModuleType("pyautogui")
+    gui.KEYBOARD_KEYS = list(string.printable) + ["enter", "esc", "tab", "space", "backspace", "delete",
+                                                  "up", "down", "left", "right", "ctrl", "alt", "shift", "win"]
+    gui.PAUSE = 0.0
+
+    def action(*args, **kwargs):
+        time.sleep(input_ms / 1000)
+
+    for name in ("typewrite", "write", "press", "hotkey", "moveTo", "click", "scroll", "keyDown", "keyUp"):
+        setattr(gui, name, action)
+    gui.size = lambda: (1920, 1080)
+    gui.position = lambda: (960, 540)
+    sys.modules["pyautogui"] = gui
+
+    import webbrowser
+    webbrowser.open = lambda url, *a, **k: True
+
+
+def install_fakes(standins: StandIns, input_ms: float):
+    """Desktop fakes plus a duckduckgo_search module that queries the stand-in."""
+    install_desktop_fakes(input_ms)
+    ddg = types.ModuleType("duckduckgo_search")
+
+    class DDGS:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, query, max_results=3):
+            qs = urllib.parse.urlencode({"q": query, "max_results": max_results})
+            with urllib.request.urlopen(standins.url(f"/ddg?{qs}"), timeout=10) as r:
+                return json.loads(r.read())
+
+    ddg.DDGS = DDGS
+    sys.modules["duckduckgo_search"] = ddg
+
+
+class FakeOcrEngine:
+    """Stands in for tesseract: sleeps in proportion to the image area."""
+    ms_per_megapixel = 40.0
+
+    def _cost(self, image):
+        w, h = image.size
+        time.sleep(w * h / 1e6 * self.ms_per_megapixel / 1000)
+
+    def image_to_string(self, image) -> str:
+        self._cost(image)
+        return "File Edit View Help\nSave changes before closing?\nSave  Cancel"
+
+    def image_to_data(self, image):
+        from hero_ocr import OcrWord
+        self._cost(image)
+        words = [("File", 10, 5), ("Edit", 60, 5), ("View", 110, 5), ("Save", 400, 300), ("Cancel", 480, 300)]
+        return [OcrWord(t, 95.0, (x, y, x + 40, y + 16), (1, 1, y)) for t, x, y in words]
+
+    def close(self):
+        pass
+
+
+def synthetic_frames(width=1920, height=1080):
+    rng = np.random.default_rng(0)
+    frames = []
+    for shift in (0, 24):
+        frame = np.full((height, width, 3), 240, dtype=np.uint8)
+        for top in range(20 + shift, height - 40, 48):
+            frame[top:top + 14, 40:width // 2] = rng.integers(0, 2, size=(14, width // 2 - 40, 1), dtype=np.uint8) * 200
+        frames.append(frame)
+    return frames
+
+
+# ========================= WORKLOAD ==========================
+
+def tool_arguments(name: str, i: int, distinct: int):
+    n = i % distinct
+    return {
+        "search_internet": {"query": f"benchmark topic {n}"},
+        "search_tool": {"query": f"benchmark subject {n}", "deep": n % 4 == 0},
+        "get_current_datetime": {},
+        # every fifth call has no city, so it goes through the IP lookup
+        "get_weather": {"city": None if n % 5 == 4 else CITIES[n % len(CITIES)] + ("" if n < len(CITIES) else f" {n}")},
+        "play_spotify_music": {"query": "Blinding Lights"},
+        "type_text": {"text": "hello from the benchmark " * (1 + n % 3)},
+        "press_key": {"key": "enter"},
+        "hotkey": {"keys": "ctrl+s"},
+        "move_mouse": {"x": 100 + n, "y": 200, "duration": 0},
+        "click_mouse": {"x": 300, "y": 300},
+        "scroll": {"amount": -120},
+        "read_screen": {"region": "full" if n % 2 else "top_left"},
+        "find_text": {"label": "Save"},
+        "click_text": {"label": "File"},
+        "wait_for_screen": {"until": "change", "timeout": 1.0},
+        "run_actions": {"actions": json.dumps([{"action": "click", "x": 10, "y": 10},
+                                               {"action": "type", "text": "abc"}, {"action": "press", "key": "enter"}])},
+        "more_output": {"ref": "r0"},
+        "open_app": {"app": "notepad"},
+        "macro": {"command": "open notepad and write hello"},
+    }.get(name)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LagSampler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return self.samples
+
+
+async def drive(calls, concurrency: int, lag: LagSampler) -> dict:
+    """Runs (tool, kwargs) calls with `concurrency` workers; returns latency/throughput/lag stats."""
+    latencies, errors = [], {}
+    queue = list(calls)
+    queue.reverse()
+
+    async def worker():
+        while queue:
+            tool, kwargs = queue.pop()
+            started = time.perf_counter()
+            try:
+                await tool(**kwargs)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    lag.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    lags = await lag.stop()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "loop_lag_p95_ms": round(percentile(lags, 0.95) * 1000, 2),
+        "loop_lag_max_ms": round(max(lags) * 1000, 2) if lags else 0.0,
+    }
+
+
+# ========================= MAIN ==========================
+
+def parse_upstreams(args) -> dict:
+    default = (args.latency, args.jitter, args.error_rate)
+    specs = {name: default for name in ("google", "duckduckgo", "ipinfo", "open-meteo", "pages")}
+    for item in args.upstream:
+        name, _, values = item.partition("=")
+        latency, jitter, error_rate = (float(v) for v in values.split(","))
+        specs[name] = (latency, jitter, error_rate)
+    return {name: Upstream(*spec) for name, spec in specs.items()}
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, row in result["tools"].items():
+        base = baseline.get("tools", {}).get(name)
+        if base and base["p95_ms"] > 0 and row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+    return regressions
+
+
+def point_at(overrides: dict):
+    """Sets upstream URL constants, e.g. {"hero_search.GOOGLE_CSE_URL": "http://127.0.0.1:..."}."""
+    import importlib
+    for target, url in overrides.items():
+        module, _, name = target.rpartition(".")
+        setattr(importlib.import_module(module), name, url)
+
+
+def use_fake_screen(ocr_ms_per_mp: float, quiet: bool = True):
+    """Synthetic screen and fake OCR engine; `quiet` drops the tools' spoken output."""
+    import hero_capture
+    import hero_ctrl_system
+    from hero_capture import ArraySource, CapturePipeline
+    from hero_ocr import ocr_pool
+
+    hero_capture._pipeline = CapturePipeline(source=ArraySource(synthetic_frames()))
+    FakeOcrEngine.ms_per_megapixel = ocr_ms_per_mp
+    ocr_pool.engine_factory = FakeOcrEngine
+    if quiet:
+        hero_ctrl_system.speak = lambda msg: f"JARVIS: {msg}"
+
+
+async def run(args, standins: StandIns) -> dict:
+    import hero
+    from hero_http import close_session
+    from hero_metrics import metrics
+    from hero_trace import recorder
+
+    # The stand-in URLs go into the trace so bench_replay.py can request the same keys
+    recorder.start(f"bench-{int(time.time())}", json.dumps({"tool_profile": "full", "upstreams": standins.overrides}))
+    use_fake_screen(args.ocr_ms_per_mp, quiet=not args.verbose)
+
+    tools = {t.info.name: t for t in hero.Assistant().tools}
+    wanted = args.tools or [n for n in tools if n not in SKIPPED_BY_DEFAULT]
+    lag = LagSampler()
+    result = {"config": vars(args), "tools": {}, "skipped": []}
+
+    for name in wanted:
+        if name not in tools or tool_arguments(name, 0, 1) is None:
+            result["skipped"].append(name)
+            continue
+        calls = [(tools[name], tool_arguments(name, i, args.distinct)) for i in range(args.requests)]
+        result["tools"][name] = row = await drive(calls, args.concurrency, lag)
+        print(f"{name:22s} p50 {row['p50_ms']:8.2f}ms  p95 {row['p95_ms']:8.2f}ms  p99 {row['p99_ms']:8.2f}ms  "
+              f"{row['throughput_rps']:8.1f} req/s  lag p95 {row['loop_lag_p95_ms']:.1f}ms  errors {row['errors'] or 0}",
+              flush=True)
+
+    names = list(result["tools"])
+    if names:
+        rng = random.Random(0)
+        calls = []
+        for i in range(args.requests * 2):
+            name = rng.choice(names)
+            calls.append((tools[name], tool_arguments(name, i, args.distinct)))
+        result["mixed"] = await drive(calls, args.concurrency, lag)
+        print(f"{'mixed':22s} p50 {result['mixed']['p50_ms']:8.2f}ms  p95 {result['mixed']['p95_ms']:8.2f}ms  "
+              f"{result['mixed']['throughput_rps']:8.1f} req/s", flush=True)
+
+    result["upstreams"] = {n: {"requests": u.requests, "errors_served": u.errors} for n, u in standins.upstreams.items()}
+    print("upstreams: " + ", ".join(f"{n} {u['requests']} req/{u['errors_served']} err" for n, u in result["upstreams"].items()))
+    if result["skipped"]:
+        print(f"skipped: {', '.join(result['skipped'])}")
+    result["tool_metrics"] = metrics.summary()["tools"]
+    await close_session()
+    recorder.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="calls per tool")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=25, help="distinct queries/cities (cache hit ratio)")
+    parser.add_argument("--latency", type=float, default=80, help="upstream latency, ms")
+    parser.add_argument("--jitter", type=float, default=20, help="upstream latency std dev, ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream 503s")
+    parser.add_argument("--upstream", action="append", default=[], metavar="NAME=LAT,JITTER,ERR",
+                        help="per-upstream override: google, duckduckgo, ipinfo, open-meteo, pages")
+    parser.add_argument("--input-ms", type=float, default=1.0, help="cost of one fake input action")
+    parser.add_argument("--ocr-ms-per-mp", type=float, default=40.0, help="fake OCR cost per megapixel")
+    parser.add_argument("--tools", nargs="+", help="only these tools")
+    parser.add_argument("--verbose", action="store_true", help="keep the tools' spoken output and error logs")
+    parser.add_argument("--trace", metavar="DIR", help="also record the run as a trace (see bench_replay.py)")
+    parser.add_argument("--out", help="write the JSON result here")
+    parser.add_argument("--baseline", help="earlier --out file to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    standins = StandIns(parse_upstreams(args))
+    standins.start()
+    install_fakes(standins, args.input_ms)
+
+    # Isolated caches and settings; must be in place before the hero modules are imported
+    os.environ.update({
+        "HERO_CACHE_DIR": tempfile.mkdtemp(prefix="hero-bench-"),
+        "HERO_TOOL_PROFILE": "full",
+        "GOOGLE_SEARCH_API_KEY": "bench",
+        "SEARCH_ENGINE_ID": "bench",
+        "HERO_TRACE_DIR": args.trace or "",
+    })
+    standins.overrides = {
+        "hero_search.GOOGLE_CSE_URL": standins.url("/customsearch/v1"),
+        "hero_weather_datetime.IPINFO_URL": standins.url("/json"),
+        "hero_weather_datetime.GEOCODING_URL": standins.url("/v1/search"),
+        "hero_weather_cache.FORECAST_URL": standins.url("/v1/forecast"),
+    }
+    point_at(standins.overrides)
+
+    import logging
+    # Tools log (and swallow) the injected upstream errors; --verbose shows them
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL)
+    result = asyncio.run(run(args, standins))
+    result["summary"] = {
+        "tools": len(result["tools"]),
+        "median_p95_ms": round(statistics.median([r["p95_ms"] for r in result["tools"].values()]), 2) if result["tools"] else 0,
+    }
+
+    text = json.dumps(result, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        print(f"wrote {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,140 @@
-from dotenv import load_dotenv
+import asyncio
+import logging
 import os
-from livekit import agents
-from livekit.agents import AgentSession, Agent, RoomInputOptions
-from livekit.plugins import (
-    google,
-    noise_cancellation,
+import time
+from hero_startup import startup, warm_up
+
+with startup.phase("dotenv"):
+    from dotenv import load_dotenv
+    # Before the tool imports: their HERO_* settings are read at import time
+    load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
 )
-from livekit.agents import function_tool
-from hero_prompts import behavior_prompts, reply_prompts
-from hero_search import search_internet, search_tool
-from hero_weather_datetime import get_current_datetime, get_weather
-#"""from hero_ctrl_system import(list_folder_items,
-#                              run_application,
-  #                            play_media_file,
-   #                           get_battery_percentage,
-    #                          open_settings,
-     #                         get_system_info,
-      #                        )"""
-from hero_music import play_spotify_music
-from hero_ctrl_system import (
+
+with startup.phase("livekit"):
+    from livekit import agents
+    from livekit.agents import AgentSession, Agent, RoomInputOptions
+    from livekit.plugins import (
+        google,
+        noise_cancellation,
+    )
+    from livekit.agents import function_tool
+
+# Tool modules load their heavy dependencies (pyautogui, OCR, DDGS) on first use or in warm_up()
+with startup.phase("tools"):
+    from hero_prompts import behavior_prompts, reply_prompts
+    from hero_search import search_internet, search_tool
+    from hero_weather_datetime import get_current_datetime, get_weather
+    #"""from hero_ctrl_system import(list_folder_items,
+    #                              run_application,
+      #                            play_media_file,
+       #                           get_battery_percentage,
+        #                          open_settings,
+         #                         get_system_info,
+          #                        )"""
+    from hero_music import play_spotify_music
+    from hero_output import budget_output, more_output
+    from hero_cache import open_all
+    from hero_load import LOAD_THRESHOLD, load, publisher
+    from hero_ocr import ocr_pool
+    from hero_tools import chain, wrap_tool, wrap_tools
+    from hero_metrics import instrument, metrics, serve as serve_metrics, watch_loop, write_summary
+    from hero_trace import recorder, trace
+    from hero_tool_registry import tool_registry
+    from hero_fs_index import file_index, find_file
+    from hero_app_index import app_index
+    from test_simulations import list_folder_items
+    from hero_ctrl_system import (
+        type_text,
+        press_key,
+        hotkey,
+        move_mouse,
+        click_mouse,
+        scroll,
+        read_screen,
+        find_text,
+        click_text,
+        wait_for_screen,
+        run_actions,
+        open_app,
+        macro
+    )
+
+# Every tool is timed (instrument), recorded when HERO_TRACE_DIR is set (trace) and sees its
+# output compacted to budget (budget_output)
+middleware = chain(instrument, trace, budget_output)
+
+tool_registry.group("search", "web search", wrap_tools([search_internet, search_tool], middleware))
+tool_registry.group("info", "date, time and weather", wrap_tools([get_current_datetime, get_weather], middleware))
+tool_registry.group("music", "play music on Spotify", wrap_tools([play_spotify_music], middleware))
+tool_registry.group("screen", "read and find text on screen, wait for the screen",
+                    wrap_tools([read_screen, find_text, wait_for_screen], middleware))
+tool_registry.group("control", "keyboard and mouse control", wrap_tools([
     type_text,
     press_key,
     hotkey,
     move_mouse,
     click_mouse,
     scroll,
-    read_screen,
-    open_app,
-    macro
-)
-load_dotenv()
+    click_text,
+    run_actions,
+], middleware))
+tool_registry.group("apps", "open apps and run multi-step tasks", wrap_tools([open_app, macro], middleware))
+tool_registry.group("files", "find files by name, list folders", wrap_tools([find_file, list_folder_items], middleware))
+#tool_registry.group("system", "apps and system info", wrap_tools([
+#    create_folder,
+#    run_application,
+#    play_media_file,
+#    get_battery_percentage,
+#    open_settings,
+#    get_system_info,
+#], middleware))
+tool_registry.always.append(wrap_tool(more_output, chain(instrument, trace)))
+
+tool_registry.profile("full", "search", "info", "music", "screen", "control", "apps", "files")
+tool_registry.profile("voice", "search", "info", "music")
+tool_registry.profile("minimal", "search", "info")
+tool_registry.profile("desktop", "info", "screen", "control", "apps", "files")
 
 class Assistant(Agent):
-    def __init__(self) -> None:
-        super().__init__(instructions=behavior_prompts,
-                         tools= [search_internet, get_current_datetime, get_weather, search_tool,
-                                 #create_folder,
-                                 #list_folder_items,
-                                 #run_application,
-                                 #play_media_file,
-                                 #get_battery_percentage,
-                                 #open_settings,
-                                 #get_system_info,
-                                 play_spotify_music,
-                                 type_text,
-                                 press_key,
-                                 hotkey,
-                                 move_mouse,
-                                 click_mouse,
-                                 scroll,
-                                 read_screen,
-                                 open_app,
-                                 macro]
-                         )
+    def __init__(self, metadata: str = "") -> None:
+        groups = tool_registry.select(metadata)
+        tools = tool_registry.tools_for(groups)
+        if len(groups) < len(tool_registry.groups):
+            tools.append(wrap_tool(tool_registry.capability_tool(self, groups), chain(instrument, trace)))
+        size = tool_registry.schema_size(tools)
+        logging.info(f"[Tools] {', '.join(groups)}: {size['tools']} tools, {size['bytes']} bytes (~{size['tokens']} tokens)")
+        super().__init__(instructions=behavior_prompts, tools=tools)
+
+def prewarm(proc: agents.JobProcess):
+    # Runs once per job process before it is handed a job; everything here is reused by its jobs
+    with startup.phase("prewarm"):
+        warm_up().join()
+        ocr_pool.start()
+        open_all()
+        file_index.start()
+        app_index.start()
+        proc.userdata["noise_cancellation"] = noise_cancellation.BVC()
+        publisher.start()
+        serve_metrics()
+    startup.log()
 
 async def entrypoint(ctx: agents.JobContext):
+    job_started = time.perf_counter()
+    # The process outlives the job; its session summary only counts what happens from here
+    metrics_start = metrics.snapshot()
+    lag_watch = asyncio.create_task(watch_loop())
+    recorder.start(ctx.job.id, ctx.job.metadata)
+
+    async def on_shutdown():
+        lag_watch.cancel()
+        recorder.stop()
+        write_summary(ctx.job.id, metrics_start)
+
+    ctx.add_shutdown_callback(on_shutdown)
     try:
         session = AgentSession(
          llm=google.beta.realtime.RealtimeModel(
@@ -63,13 +143,23 @@ async def entrypoint(ctx: agents.JobContext):
              api_key=os.getenv("GOOGLE_API_KEY")
          ),  
      )
-     
+
+        greeted = False
+
+        def on_state_changed(ev):
+            nonlocal greeted
+            if ev.new_state == "speaking" and not greeted:
+                greeted = True
+                logging.info(f"[Startup] First greeting {time.perf_counter() - job_started:.2f}s after job start")
+                startup.log()
+
+        session.on("agent_state_changed", on_state_changed)
 
         await session.start(
             room=ctx.room,
-            agent=Assistant(),
+            agent=Assistant(ctx.job.metadata),
             room_input_options=RoomInputOptions(
-                noise_cancellation=noise_cancellation.BVC(),
+                noise_cancellation=ctx.proc.userdata.get("noise_cancellation") or noise_cancellation.BVC(),
             ),
         )
 
@@ -80,4 +170,11 @@ async def entrypoint(ctx: agents.JobContext):
         print(f"Error in entrypoint: {e}")
 
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+    startup.log()
+    logging.info(tool_registry.report())
+    agents.cli.run_app(agents.WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        load_fnc=load,
+        load_threshold=LOAD_THRESHOLD,
+    ))
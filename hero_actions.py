@@ -0,0 +1,235 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from hero_input import input_worker
+from hero_screen_index import screen_index
+from hero_screen_wait import screen_hash, wait_for_screen_state
+from hero_text_input import text_input
+
+MAX_ACTIONS = 50
+MAX_WAIT = 30.0
+MAX_PRESSES = 50
+MAX_CLICKS = 3
+MAX_SCROLL = 1200  # Windows counts wheel movement in 120ths of a notch
+
+# action -> (required fields, optional fields); values are the accepted types
+ACTION_SPECS: Dict[str, Tuple[Dict[str, tuple], Dict[str, tuple]]] = {
+    "type": ({"text": (str,)}, {"interval": (int, float)}),
+    "press": ({"key": (str,)}, {"presses": (int,)}),
+    "hotkey": ({"keys": (str,)}, {}),
+    "move": ({"x": (int,), "y": (int,)}, {"duration": (int, float)}),
+    "click": ({}, {"x": (int,), "y": (int,), "button": (str,), "clicks": (int,)}),
+    "click_text": ({"label": (str,)}, {"region": (str,), "button": (str,)}),
+    "scroll": ({"amount": (int,)}, {}),
+    "wait": ({"seconds": (int, float)}, {}),
+}
+# Accepted on every step
+STEP_OPTIONS = {"wait_after": (int, float), "wait_for": (str,), "wait_text": (str,), "assert_text": (str,), "timeout": (int, float)}
+WAIT_CONDITIONS = ("change", "stable", "text")
+BUTTONS = ("left", "right", "middle")
+
+
+class ActionError(ValueError):
+    pass
+
+
+@dataclass
+class StepResult:
+    index: int
+    action: str
+    ok: bool
+    seconds: float
+    detail: str = ""
+
+
+def _known_key(key: str, normalize) -> bool:
+    import pyautogui
+    k = normalize(key)
+    return len(k) == 1 or k in pyautogui.KEYBOARD_KEYS
+
+
+def _screen_bounds() -> Tuple[int, int, int, int]:
+    """(left, top, right, bottom) of the virtual screen spanning every monitor; left/top are
+    negative when a monitor sits left of or above the primary one."""
+    try:
+        if os.name == "nt":
+            import ctypes
+            metric = ctypes.windll.user32.GetSystemMetrics
+            left, top = metric(76), metric(77)  # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN
+            return left, top, left + metric(78), top + metric(79)
+        if sys.platform == "darwin":
+            try:
+                import mss
+                with mss.mss() as sct:
+                    mon = sct.monitors[0]  # bounding box of all displays
+                return mon["left"], mon["top"], mon["left"] + mon["width"], mon["top"] + mon["height"]
+            except ImportError:
+                pass
+        # On X11 the root window already spans every monitor, starting at 0,0
+        import pyautogui
+        width, height = pyautogui.size()
+        return 0, 0, width, height
+    except Exception as e:
+        # No display, no X server, pyautogui failing to load...
+        raise ActionError(f"cannot read the screen size: {e!r}")
+
+
+def validate(raw: str, normalize_key) -> List[Dict[str, Any]]:
+    """
+    Parses and checks the whole action list before anything runs. Raises ActionError
+    naming the first bad step, including when the screen cannot be queried. Blocking
+    (imports pyautogui and queries the screen size):
+    call it through asyncio.to_thread.
+    """
+    try:
+        steps = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ActionError(f"actions is not valid JSON: {e}")
+    if isinstance(steps, dict):
+        steps = [steps]
+    if not isinstance(steps, list) or not steps:
+        raise ActionError("actions must be a non-empty JSON list")
+    if len(steps) > MAX_ACTIONS:
+        raise ActionError(f"at most {MAX_ACTIONS} actions per call")
+
+    left, top, right, bottom = _screen_bounds()
+    for i, step in enumerate(steps, 1):
+        if not isinstance(step, dict) or step.get("action") not in ACTION_SPECS:
+            raise ActionError(f"step {i}: action must be one of {', '.join(ACTION_SPECS)}")
+        required, optional = ACTION_SPECS[step["action"]]
+        for name, types in required.items():
+            if name not in step:
+                raise ActionError(f"step {i} ({step['action']}): missing '{name}'")
+        for name, value in step.items():
+            if name == "action":
+                continue
+            types = required.get(name) or optional.get(name) or STEP_OPTIONS.get(name)
+            if types is None:
+                raise ActionError(f"step {i} ({step['action']}): unknown field '{name}'")
+            if isinstance(value, bool) or not isinstance(value, types):
+                raise ActionError(f"step {i} ({step['action']}): '{name}' has the wrong type")
+
+        action = step["action"]
+        keys = [step["key"]] if action == "press" else step["keys"].split("+") if action == "hotkey" else []
+        for k in keys:
+            try:
+                known = _known_key(k, normalize_key)
+            except Exception as e:
+                raise ActionError(f"cannot check keys: {e!r}")
+            if not known:
+                raise ActionError(f"step {i} ({action}): unknown key '{k}'")
+        if ("x" in step) != ("y" in step):
+            raise ActionError(f"step {i} ({action}): give both x and y")
+        if "x" in step and not (left <= step["x"] < right and top <= step["y"] < bottom):
+            raise ActionError(f"step {i} ({action}): {step['x']},{step['y']} is off screen "
+                              f"({left},{top} to {right - 1},{bottom - 1})")
+        if step.get("button", "left") not in BUTTONS:
+            raise ActionError(f"step {i} ({action}): button must be one of {', '.join(BUTTONS)}")
+        if step.get("wait_for", "change") not in WAIT_CONDITIONS:
+            raise ActionError(f"step {i} ({action}): wait_for must be one of {', '.join(WAIT_CONDITIONS)}")
+        if step.get("wait_for") == "text" and not step.get("wait_text"):
+            raise ActionError(f"step {i} ({action}): wait_for 'text' needs wait_text")
+        for name in ("seconds", "wait_after", "timeout"):
+            if name in step and not 0 <= step[name] <= MAX_WAIT:
+                raise ActionError(f"step {i} ({action}): {name} must be between 0 and {MAX_WAIT}")
+        if "presses" in step and not 1 <= step["presses"] <= MAX_PRESSES:
+            raise ActionError(f"step {i} ({action}): presses must be between 1 and {MAX_PRESSES}")
+        if "clicks" in step and not 1 <= step["clicks"] <= MAX_CLICKS:
+            raise ActionError(f"step {i} ({action}): clicks must be between 1 and {MAX_CLICKS}")
+        if "amount" in step and not -MAX_SCROLL <= step["amount"] <= MAX_SCROLL:
+            raise ActionError(f"step {i} ({action}): amount must be between -{MAX_SCROLL} and {MAX_SCROLL}")
+        if "interval" in step and not 0 <= step["interval"] <= 1:
+            raise ActionError(f"step {i} ({action}): interval must be between 0 and 1")
+        if "duration" in step and not 0 <= step["duration"] <= MAX_WAIT:
+            raise ActionError(f"step {i} ({action}): duration must be between 0 and {MAX_WAIT}")
+    return steps
+
+
+async def _execute(step: Dict[str, Any], normalize_key) -> str:
+    action = step["action"]
+    if action == "type":
+        used = await text_input.type(step["text"], interval=step.get("interval", 0))
+        return f"{len(step['text'])} chars via {used}"
+    if action == "press":
+        await input_worker.run("press", normalize_key(step["key"]), presses=step.get("presses", 1))
+        return step["key"]
+    if action == "hotkey":
+        await input_worker.run("hotkey", *[normalize_key(k) for k in step["keys"].split("+")])
+        return step["keys"]
+    if action == "move":
+        await input_worker.run("moveTo", step["x"], step["y"], duration=step.get("duration", 0))
+        return f"{step['x']},{step['y']}"
+    if action == "click":
+        kwargs = {"button": step.get("button", "left"), "clicks": step.get("clicks", 1)}
+        if "x" in step:
+            await input_worker.run("click", step["x"], step["y"], **kwargs)
+        else:
+            await input_worker.run("click", **kwargs)
+        return kwargs["button"]
+    if action == "click_text":
+        matches = (await screen_index.get(step.get("region", "full"))).find(step["label"], limit=1)
+        if not matches:
+            raise ActionError(f"'{step['label']}' not on screen")
+        x, y = matches[0].item.center
+        await input_worker.run("click", x, y, button=step.get("button", "left"))
+        screen_index.invalidate()
+        return f"'{matches[0].item.text}' at {x},{y}"
+    if action == "scroll":
+        await input_worker.run("scroll", step["amount"])
+        return str(step["amount"])
+    if action == "wait":
+        await asyncio.sleep(step["seconds"])
+        return f"{step['seconds']}s"
+    raise ActionError(f"unsupported action {action}")
+
+
+async def _post_conditions(step: Dict[str, Any], baseline: Optional[int] = None) -> Optional[str]:
+    """
+    Applies wait_after / wait_for / assert_text. Returns an error message or None.
+    `baseline` is the screen hash from before the step, for wait_for "change".
+    """
+    if step.get("wait_after"):
+        await asyncio.sleep(step["wait_after"])
+    timeout = step.get("timeout", 5.0)
+    if step.get("wait_for"):
+        result = await wait_for_screen_state(step["wait_for"], step.get("wait_text", ""), timeout=timeout,
+                                             baseline=baseline)
+        if not result.met:
+            return f"screen did not {step['wait_for']} within {timeout}s"
+    if step.get("assert_text"):
+        result = await wait_for_screen_state("text", step["assert_text"], timeout=min(timeout, 2.0))
+        if not result.met:
+            return f"'{step['assert_text']}' not on screen"
+    return None
+
+
+async def run_actions_pipeline(steps: List[Dict[str, Any]], normalize_key) -> List[StepResult]:
+    """
+    Runs validated steps in order and stops at the first failure.
+    """
+    results = []
+    for i, step in enumerate(steps, 1):
+        started = time.perf_counter()
+        try:
+            # Taken before the action, so a UI that reacts at once still counts as a change
+            baseline = await asyncio.to_thread(screen_hash) if step.get("wait_for") == "change" else None
+            detail = await _execute(step, normalize_key)
+            error = await _post_conditions(step, baseline)
+        except Exception as e:
+            detail, error = "", str(e)
+        results.append(StepResult(i, step["action"], error is None, time.perf_counter() - started, error or detail))
+        if error:
+            break
+    return results
+
+
+def summarize(results: List[StepResult], total: int) -> str:
+    ok = sum(r.ok for r in results)
+    elapsed = sum(r.seconds for r in results)
+    parts = [f"{r.index} {r.action} {'ok' if r.ok else 'FAILED'} {r.seconds:.2f}s ({r.detail})" for r in results]
+    return f"{ok}/{total} actions ok in {elapsed:.2f}s | " + " | ".join(parts)
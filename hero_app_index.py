@@ -0,0 +1,398 @@
+import configparser
+import json
+import logging
+import os
+import re
+import shlex
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from difflib import get_close_matches
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import hero_proc
+from hero_cache import cache_path
+
+logger = logging.getLogger(__name__)
+
+APP_INDEX_PATH = os.getenv("HERO_APP_INDEX_PATH") or cache_path("apps.json")
+# How often the source folders are checked for installs/uninstalls; the index is only
+# rebuilt when one of them changed
+APP_REFRESH_INTERVAL = float(os.getenv("HERO_APP_REFRESH_INTERVAL", "300"))
+APP_FUZZY_CUTOFF = float(os.getenv("HERO_APP_FUZZY_CUTOFF", "0.75"))
+
+_VERSION = 2
+_WINDOWS = os.name == "nt"
+_KEY_RE = re.compile(r"[^a-z0-9+]+")
+_FIELD_CODE_RE = re.compile(r"^%[fFuUdDnNickvm]$")  # .desktop Exec placeholders for files/URLs
+_PROGRAM_FILES_DEPTH = 3  # Program Files\Vendor\App\bin\app.exe is as deep as it is searched
+_SKIP_EXES = ("unins", "uninst", "setup", "update", "crashpad", "crash_handler", "helper", "installer")
+
+# Never launched by name, whatever matches them: power, session and admin commands that act
+# on their own when started without arguments (on systemd, `shutdown` schedules a power-off)
+DENIED = {"shutdown", "reboot", "halt", "poweroff", "suspend", "hibernate", "hwclock", "systemctl",
+          "init", "telinit", "runlevel", "logout", "loginctl", "sudo", "su", "pkexec", "doas", "rm",
+          "dd", "mkfs", "fdisk", "sfdisk", "parted", "wipefs", "kill", "killall", "pkill", "xkill",
+          "format", "diskpart", "bcdedit", "logoff", "tsdiscon", "rundll32"}
+# Sources whose entries are meant to be started by a user; bare PATH executables are only
+# launched when asked for by their exact name
+LAUNCHER_SOURCES = ("desktop", "start_menu", "program_files", "applications")
+
+# Spoken names mapped to the names an app goes by on each platform, first found wins
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "notepad": ("notepad", "gedit", "gnome text editor", "text editor", "kate", "mousepad", "textedit"),
+    "calculator": ("calc", "calculator", "gnome calculator", "kcalc", "galculator"),
+    "cmd": ("cmd", "terminal", "gnome terminal", "konsole", "xfce4 terminal", "x terminal emulator", "xterm"),
+    "terminal": ("windows terminal", "wt", "gnome terminal", "konsole", "terminal", "cmd", "xterm"),
+    "chrome": ("google chrome", "chrome", "chromium", "chromium browser"),
+    "browser": ("google chrome", "firefox", "microsoft edge", "chromium", "safari"),
+    "edge": ("microsoft edge", "msedge"),
+    "files": ("file explorer", "explorer", "files", "nautilus", "dolphin", "thunar", "finder"),
+    "explorer": ("file explorer", "explorer", "nautilus", "dolphin", "thunar", "finder"),
+    "settings": ("settings", "gnome control center", "systemsettings", "system preferences"),
+    "vscode": ("visual studio code", "code"),
+    "vs code": ("visual studio code", "code"),
+    "word": ("microsoft word", "winword", "libreoffice writer"),
+    "excel": ("microsoft excel", "excel", "libreoffice calc"),
+    "paint": ("paint", "mspaint", "pinta", "kolourpaint"),
+}
+
+
+def app_key(name: str) -> str:
+    """Normalized lookup key: lowercase words, no punctuation or .exe/.lnk/.desktop suffix."""
+    name = name.strip().lower()
+    for suffix in (".exe", ".lnk", ".desktop", ".app"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return _KEY_RE.sub(" ", name).strip()
+
+
+@dataclass
+class AppEntry:
+    name: str                   # display name
+    command: List[str]          # argv, or a single .lnk/.exe/.app path to hand to the shell
+    source: str                 # path | desktop | start_menu | program_files | applications
+    keys: List[str] = field(default_factory=list)
+
+
+# ------------------------- sources -------------------------
+
+def _path_dirs() -> List[str]:
+    return [d for d in dict.fromkeys(os.getenv("PATH", "").split(os.pathsep)) if d and os.path.isdir(d)]
+
+
+def _scan_path() -> List[AppEntry]:
+    exts = {e.lower() for e in os.getenv("PATHEXT", ".EXE;.BAT;.CMD").split(";")} if _WINDOWS else None
+    apps = []
+    for d in _path_dirs():
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if _WINDOWS:
+                            if os.path.splitext(e.name)[1].lower() not in exts or not e.is_file():
+                                continue
+                        elif not e.is_file() or not os.access(e.path, os.X_OK):
+                            continue
+                    except OSError:
+                        continue
+                    apps.append(AppEntry(e.name, [e.path], "path", [app_key(e.name)]))
+        except OSError:
+            continue
+    return apps
+
+
+def _desktop_dirs() -> List[str]:
+    data_home = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = (os.getenv("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(":")
+    extra = ["/var/lib/flatpak/exports/share", os.path.expanduser("~/.local/share/flatpak/exports/share"),
+             "/var/lib/snapd/desktop"]
+    dirs = [os.path.join(d, "applications") for d in [data_home] + data_dirs + extra if d]
+    return [d for d in dict.fromkeys(dirs) if os.path.isdir(d)]
+
+
+def _desktop_exec(line: str) -> List[str]:
+    try:
+        argv = shlex.split(line)
+    except ValueError:
+        return []
+    return [a.replace("%%", "%") for a in argv if not _FIELD_CODE_RE.match(a)]
+
+
+def _parse_desktop(path: str) -> Optional[AppEntry]:
+    parser = configparser.RawConfigParser(strict=False, interpolation=None)
+    parser.optionxform = str
+    try:
+        parser.read(path, encoding="utf-8")
+        entry = parser["Desktop Entry"]
+    except (configparser.Error, KeyError, UnicodeDecodeError, OSError):
+        return None
+    # Terminal=true apps (vim, htop) would start detached with no terminal to show them
+    if entry.get("Type", "Application") != "Application" or entry.get("NoDisplay") == "true" \
+            or entry.get("Hidden") == "true" or entry.get("Terminal") == "true":
+        return None
+    argv = _desktop_exec(entry.get("Exec", ""))
+    if not argv:
+        return None
+    name = entry.get("Name") or os.path.splitext(os.path.basename(path))[0]
+    keys = [name, os.path.basename(path), os.path.basename(argv[0]), entry.get("GenericName", "")]
+    keys += [k for k in entry.get("Keywords", "").split(";")]
+    return AppEntry(name, argv, "desktop", [k for k in dict.fromkeys(app_key(k) for k in keys) if k])
+
+
+def _scan_desktop() -> List[AppEntry]:
+    apps = []
+    for d in _desktop_dirs():
+        for base, _, files in os.walk(d):
+            for f in files:
+                if f.endswith(".desktop"):
+                    entry = _parse_desktop(os.path.join(base, f))
+                    if entry:
+                        apps.append(entry)
+    return apps
+
+
+def _start_menu_dirs() -> List[str]:
+    roots = [os.getenv("ProgramData", r"C:\ProgramData"), os.getenv("APPDATA", "")]
+    dirs = [os.path.join(r, "Microsoft", "Windows", "Start Menu", "Programs") for r in roots if r]
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def _scan_start_menu() -> List[AppEntry]:
+    apps = []
+    for d in _start_menu_dirs():
+        for base, _, files in os.walk(d):
+            for f in files:
+                stem, ext = os.path.splitext(f)
+                if ext.lower() in (".lnk", ".url", ".appref-ms") and not stem.lower().startswith("uninstall"):
+                    apps.append(AppEntry(stem, [os.path.join(base, f)], "start_menu", [app_key(stem)]))
+    return apps
+
+
+def _program_files_dirs() -> List[str]:
+    dirs = [os.getenv("ProgramFiles", r"C:\Program Files"), os.getenv("ProgramFiles(x86)", r"C:\Program Files (x86)"),
+            os.path.join(os.getenv("LOCALAPPDATA", ""), "Programs") if os.getenv("LOCALAPPDATA") else ""]
+    return [d for d in dict.fromkeys(dirs) if d and os.path.isdir(d)]
+
+
+def _scan_program_files() -> List[AppEntry]:
+    apps = []
+    for root in _program_files_dirs():
+        depth0 = root.rstrip(os.sep).count(os.sep)
+        for base, dirs, files in os.walk(root):
+            if base.count(os.sep) - depth0 >= _PROGRAM_FILES_DEPTH:
+                dirs[:] = []
+            dirs[:] = [d for d in dirs if d.lower() not in ("common files", "windowsapps", "installer", "uninstall")]
+            for f in files:
+                stem, ext = os.path.splitext(f)
+                if ext.lower() != ".exe" or stem.lower().startswith(_SKIP_EXES):
+                    continue
+                folder = os.path.basename(base)
+                keys = [app_key(stem)] + ([app_key(folder)] if app_key(folder).startswith(app_key(stem)) else [])
+                apps.append(AppEntry(stem, [os.path.join(base, f)], "program_files", keys))
+    return apps
+
+
+def _scan_mac_applications() -> List[AppEntry]:
+    apps = []
+    for d in ("/Applications", "/System/Applications", os.path.expanduser("~/Applications")):
+        try:
+            names = os.listdir(d)
+        except OSError:
+            continue
+        for n in names:
+            if n.endswith(".app"):
+                path = os.path.join(d, n)
+                apps.append(AppEntry(n[:-4], ["open", "-a", path], "applications", [app_key(n)]))
+    return apps
+
+
+def _sources() -> List[Tuple[str, Callable[[], List[AppEntry]], List[str]]]:
+    """(name, scanner, folders whose mtimes tell when it needs rescanning) for this platform."""
+    if _WINDOWS:
+        return [("start_menu", _scan_start_menu, _start_menu_dirs()),
+                ("program_files", _scan_program_files, _program_files_dirs()),
+                ("path", _scan_path, _path_dirs())]
+    sources = [("desktop", _scan_desktop, _desktop_dirs()), ("path", _scan_path, _path_dirs())]
+    if sys.platform == "darwin":
+        sources.insert(0, ("applications", _scan_mac_applications, ["/Applications", "/System/Applications"]))
+    return sources
+
+
+def _signature(dirs: Iterable[str]) -> Dict[str, float]:
+    sig = {}
+    for d in dirs:
+        try:
+            sig[d] = os.stat(d).st_mtime
+        except OSError:
+            pass
+    return sig
+
+
+def _denied(app: AppEntry) -> bool:
+    names = [app_key(os.path.basename(app.command[0]))] + app.keys if app.command else app.keys
+    return any(n in DENIED or n.split(" ", 1)[0] in DENIED for n in names if n)
+
+
+# ------------------------- index -------------------------
+
+class AppIndex:
+    """
+    Installed applications by normalized name, built from the platform's launchers (.desktop
+    entries and PATH on Linux, Start Menu, Program Files and PATH on Windows) and saved as
+    JSON so a restarted worker starts from the saved copy instead of rescanning. A background
+    thread rebuilds it whenever one of the scanned folders changes. Lookups are dict reads:
+    exact name, then alias, then a whole word of a name, then a close fuzzy match. Only
+    launcher entries (LAUNCHER_SOURCES) take part in word and fuzzy matching, and DENIED
+    commands are never indexed.
+    """
+
+    def __init__(self, path: str = APP_INDEX_PATH):
+        self.path = path
+        self.apps: List[AppEntry] = []
+        self.built_at = 0.0
+        self._by_key: Dict[str, AppEntry] = {}
+        self._by_word: Dict[str, List[AppEntry]] = {}
+        self._fuzzy_keys: List[str] = []
+        self._resolved: Dict[Tuple[str, bool], Optional[AppEntry]] = {}
+        self._signature: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="hero-app-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self.ensure()
+        while not self._stop.wait(APP_REFRESH_INTERVAL):
+            self.refresh()
+
+    def ensure(self) -> None:
+        """Loads the saved index, or builds one if there is none yet or it is out of date."""
+        with self._lock:
+            if self.built_at:
+                return
+            if self._load() and not self._stale():
+                return
+        self.refresh(force=True)
+
+    def _stale(self) -> bool:
+        current = _signature(d for _, _, dirs in _sources() for d in dirs)
+        return current != self._signature
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuilds the index if a source folder changed (or `force`); returns whether it did."""
+        if not force and not self._stale():
+            return False
+        started = time.perf_counter()
+        apps, dirs = [], []
+        for name, scan, source_dirs in _sources():
+            try:
+                apps.extend(scan())
+            except Exception:
+                logger.exception(f"[Apps] Scanning {name} failed")
+            dirs.extend(source_dirs)
+        with self._lock:
+            self._install(apps, _signature(dirs), time.time())
+        self._save()
+        logger.info(f"[Apps] Indexed {len(apps)} applications ({len(self._by_key)} names) "
+                    f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return True
+
+    def _install(self, apps: List[AppEntry], signature: Dict[str, float], built_at: float) -> None:
+        by_key: Dict[str, AppEntry] = {}
+        by_word: Dict[str, List[AppEntry]] = {}
+        apps = [a for a in apps if not _denied(a)]
+        # Sources come in preference order (launcher entries before bare executables), so the
+        # first entry to claim a name keeps it
+        for app in apps:
+            launcher = app.source in LAUNCHER_SOURCES
+            for key in app.keys:
+                by_key.setdefault(key, app)
+                if launcher:
+                    for word in key.split():
+                        by_word.setdefault(word, []).append(app)
+        fuzzy = [k for k, a in by_key.items() if a.source in LAUNCHER_SOURCES] + list(ALIASES)
+        self.apps, self._by_key, self._by_word, self._fuzzy_keys = apps, by_key, by_word, fuzzy
+        self._signature, self.built_at = signature, built_at
+        self._resolved = {}
+
+    def _load(self) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _VERSION or data.get("platform") != sys.platform:
+                return False
+            apps = [AppEntry(**a) for a in data["apps"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self._install(apps, data.get("signature", {}), data.get("built_at", 0.0) or time.time())
+        logger.info(f"[Apps] Loaded {len(apps)} applications from {self.path}")
+        return True
+
+    def _save(self) -> None:
+        data = {"version": _VERSION, "platform": sys.platform, "built_at": self.built_at,
+                "signature": self._signature, "apps": [asdict(a) for a in self.apps]}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)  # other workers never read a half-written file
+        except OSError as e:
+            logger.warning(f"[Apps] Could not save the index: {e}")
+
+    def resolve(self, name: str, path: bool = True) -> Optional[AppEntry]:
+        """
+        The installed app best matching a spoken or typed name, or None. With `path` False
+        bare PATH executables are not considered at all, not even by exact name.
+        """
+        if not self.built_at:
+            self.ensure()
+        key = app_key(name)
+        if not key:
+            return None
+        if (key, path) in self._resolved:
+            return self._resolved[(key, path)]
+
+        def exact(k: str) -> Optional[AppEntry]:
+            app = self._by_key.get(k)
+            return app if app is not None and (path or app.source in LAUNCHER_SOURCES) else None
+
+        app = exact(key)
+        if app is None:
+            app = next((a for a in map(exact, ALIASES.get(key, ())) if a is not None), None)
+        if app is None and key in self._by_word:
+            # "code" -> "visual studio code": the shortest name containing the word
+            app = min(self._by_word[key], key=lambda a: (len(a.name), a.name))
+        if app is None:
+            close = get_close_matches(key, self._fuzzy_keys, n=1, cutoff=APP_FUZZY_CUTOFF)
+            if close:
+                app = exact(close[0]) or next((a for a in map(exact, ALIASES.get(close[0], ())) if a is not None), None)
+        self._resolved[(key, path)] = app
+        return app
+
+    def stats(self) -> dict:
+        return {"apps": len(self.apps), "names": len(self._by_key), "built_at": self.built_at,
+                "sources": {s: sum(1 for a in self.apps if a.source == s) for s in {a.source for a in self.apps}}}
+
+
+app_index = AppIndex()
+
+
+async def launch(command: List[str]) -> None:
+    """
+    Starts an app without waiting for it: shortcuts and executables go through the shell on
+    Windows, argv lists are spawned detached elsewhere.
+    """
+    if _WINDOWS and len(command) == 1:
+        os.startfile(command[0])
+        return
+    await hero_proc.launch(command)
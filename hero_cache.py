@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("HERO_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "hero")
+
+# Eviction runs every N writes rather than on each one, COUNT(*) is not free.
+_EVICT_EVERY = 64
+
+# Every SqliteCache in this process, so the worker prewarm can open them all
+_instances: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def cache_path(name: str) -> str:
+    """
+    Returns the path of a file inside the shared cache directory (HERO_CACHE_DIR).
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+
+class SqliteCache:
+    """
+    JSON key/value table in an SQLite file, shared by every worker process on the host.
+    Entries carry an optional TTL; once the table grows past `max_entries` the least
+    recently used rows are evicted. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 10_000, ttl: Optional[float] = None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            # WAL lets other worker processes read while one of them writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_used REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_lru ON {self.table}(last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                if row is None or (row[1] is not None and row[1] < now):
+                    if row is not None:
+                        conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self.misses += 1
+                    return None
+                conn.execute(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"[cache] {self.table} read failed: {e}")
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+                )
+                self._writes += 1
+                if self._writes % _EVICT_EVERY == 1:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"[cache] {self.table} write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        size = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = size - self.max_entries
+        if excess > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+            logger.info(f"[cache] {self.table}: evicted {excess} least recently used entries")
+
+    def open(self) -> None:
+        """
+        Connects (and creates the table) now rather than on the first lookup.
+        """
+        with self._lock:
+            self._connect()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "table": self.table,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_all() -> int:
+    """
+    Opens every cache created so far; used by the worker prewarm. Returns how many.
+    """
+    caches = list(_instances)
+    for cache in caches:
+        cache.open()
+    return len(caches)
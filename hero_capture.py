@@ -0,0 +1,342 @@
+import glob
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Frames wider than this are downscaled by an integer factor before OCR
+OCR_MAX_WIDTH = int(os.getenv("HERO_OCR_MAX_WIDTH", "1920"))
+OCR_BINARIZE = os.getenv("HERO_OCR_BINARIZE", "1").lower() in ("1", "true", "yes")
+FOCUS_BOX = (900, 320)
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass
+class Frame:
+    """
+    Preprocessed capture. `pixels` is a 2-D uint8 array; a pixel (px, py) maps back to the
+    screen at (origin[0] + px * scale, origin[1] + py * scale).
+    """
+    pixels: np.ndarray
+    origin: Tuple[int, int]
+    scale: int
+
+    def to_screen(self, x: float, y: float) -> Tuple[int, int]:
+        return int(self.origin[0] + x * self.scale), int(self.origin[1] + y * self.scale)
+
+    def to_image(self):
+        from PIL import Image
+        return Image.fromarray(self.pixels)
+
+
+# ========================= CAPTURE SOURCES ==========================
+
+class CaptureSource:
+    """
+    Where frames come from. `grab()` returns an (H, W, 3) uint8 RGB array for the bbox
+    (left, top, right, bottom) or the whole screen.
+    """
+
+    def size(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def grab(self, bbox: Optional[Box] = None) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ScreenSource(CaptureSource):
+    """
+    Real display (or a virtual framebuffer via DISPLAY). Uses mss when installed, whose raw
+    BGRA buffer is wrapped without copying; otherwise PIL.ImageGrab.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._size: Optional[Tuple[int, int]] = None
+        try:
+            import mss  # noqa: F401
+            self._use_mss = True
+        except ImportError:
+            self._use_mss = False
+
+    def _mss(self):
+        # mss handles are not thread safe, keep one per thread
+        if not hasattr(self._local, "sct"):
+            import mss
+            self._local.sct = mss.mss()
+        return self._local.sct
+
+    def size(self) -> Tuple[int, int]:
+        if self._size is None:
+            if self._use_mss:
+                mon = self._mss().monitors[0]
+                self._size = (mon["width"], mon["height"])
+            else:
+                import pyautogui
+                self._size = tuple(pyautogui.size())
+        return self._size
+
+    def grab(self, bbox: Optional[Box] = None) -> np.ndarray:
+        if self._use_mss:
+            sct = self._mss()
+            if bbox is None:
+                mon = sct.monitors[0]
+                bbox = (mon["left"], mon["top"], mon["left"] + mon["width"], mon["top"] + mon["height"])
+            shot = sct.grab({"left": bbox[0], "top": bbox[1], "width": bbox[2] - bbox[0], "height": bbox[3] - bbox[1]})
+            bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+            return bgra[:, :, 2::-1]  # BGRA -> RGB view, no copy
+        from PIL import ImageGrab
+        return np.asarray(ImageGrab.grab(bbox=bbox).convert("RGB"))
+
+
+class ArraySource(CaptureSource):
+    """
+    Serves frames from in-memory arrays, cycling through them (tests and benchmarks).
+    """
+
+    def __init__(self, frames: List[np.ndarray]):
+        self.frames = frames
+        self._i = 0
+
+    def size(self) -> Tuple[int, int]:
+        h, w = self.frames[0].shape[:2]
+        return w, h
+
+    def grab(self, bbox: Optional[Box] = None) -> np.ndarray:
+        frame = self.frames[self._i % len(self.frames)]
+        self._i += 1
+        if bbox is not None:
+            frame = frame[bbox[1]:bbox[3], bbox[0]:bbox[2]]
+        return frame
+
+
+class ImageFileSource(ArraySource):
+    """
+    Headless source backed by an image file or a directory of images (sorted by name).
+    """
+
+    def __init__(self, path: str):
+        from PIL import Image
+        paths = sorted(glob.glob(os.path.join(path, "*.png")) + glob.glob(os.path.join(path, "*.jpg"))) \
+            if os.path.isdir(path) else [path]
+        super().__init__([np.asarray(Image.open(p).convert("RGB")) for p in paths])
+
+
+def default_source() -> CaptureSource:
+    """
+    HERO_CAPTURE_SOURCE selects an image file/directory instead of the live screen.
+    """
+    path = os.getenv("HERO_CAPTURE_SOURCE")
+    return ImageFileSource(path) if path else ScreenSource()
+
+
+# ========================= PREPROCESSING ==========================
+
+class Preprocessor:
+    """
+    Vectorized grayscale -> integer downscale -> Otsu binarization. Intermediate buffers are
+    allocated once per frame shape and reused; only the (small) output array is new.
+    """
+
+    def __init__(self, max_width: int = OCR_MAX_WIDTH, binarize: bool = OCR_BINARIZE):
+        self.max_width = max_width
+        self.binarize = binarize
+        self._buffers: Dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _buf(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        key = (name, shape, np.dtype(dtype).str)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def scale_for(self, width: int) -> int:
+        return max(1, -(-width // self.max_width))  # ceil division
+
+    def grayscale(self, rgb: np.ndarray) -> np.ndarray:
+        # ITU-R 601 luma in fixed point: (77 R + 150 G + 29 B) >> 8
+        h, w = rgb.shape[:2]
+        acc = self._buf("acc", (h, w), np.uint16)
+        tmp = self._buf("tmp", (h, w), np.uint16)
+        np.multiply(rgb[:, :, 0], 77, out=acc, dtype=np.uint16)
+        np.multiply(rgb[:, :, 1], 150, out=tmp, dtype=np.uint16)
+        acc += tmp
+        np.multiply(rgb[:, :, 2], 29, out=tmp, dtype=np.uint16)
+        acc += tmp
+        acc >>= 8
+        gray = self._buf("gray", (h, w), np.uint8)
+        np.copyto(gray, acc, casting="unsafe")
+        return gray
+
+    def downscale(self, gray: np.ndarray, factor: int) -> np.ndarray:
+        if factor == 1:
+            return gray
+        h, w = gray.shape[0] // factor, gray.shape[1] // factor
+        acc = self._buf("down", (h, w), np.uint32)
+        acc.fill(0)
+        for dy in range(factor):
+            for dx in range(factor):
+                acc += gray[dy:h * factor:factor, dx:w * factor:factor]
+        out = self._buf("small", (h, w), np.uint8)
+        np.floor_divide(acc, factor * factor, out=acc)
+        np.copyto(out, acc, casting="unsafe")
+        return out
+
+    @staticmethod
+    def otsu_threshold(gray: np.ndarray) -> int:
+        hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+        total = hist.sum()
+        weights = np.cumsum(hist)
+        means = np.cumsum(hist * np.arange(256))
+        fg = total - weights
+        valid = (weights > 0) & (fg > 0)
+        between = np.zeros(256)
+        mu_b = np.divide(means, weights, out=np.zeros(256), where=valid)
+        mu_f = np.divide(means[-1] - means, fg, out=np.zeros(256), where=valid)
+        between[valid] = weights[valid] * fg[valid] * (mu_b[valid] - mu_f[valid]) ** 2
+        return int(np.argmax(between))
+
+    def run(self, rgb: np.ndarray, origin: Tuple[int, int] = (0, 0)) -> Frame:
+        with self._lock:
+            factor = self.scale_for(rgb.shape[1])
+            small = self.downscale(self.grayscale(rgb), factor)
+            if self.binarize:
+                mask = small > self.otsu_threshold(small)
+                if mask.mean() < 0.5:
+                    np.logical_not(mask, out=mask)  # dark theme: keep dark text on a light background
+                out = mask.view(np.uint8) * np.uint8(255)
+            else:
+                out = small.copy()
+        return Frame(out, origin, factor)
+
+
+# ========================= NAMED REGIONS ==========================
+
+def _active_window_box() -> Optional[Box]:
+    try:
+        if os.name == "nt":
+            import pygetwindow
+            win = pygetwindow.getActiveWindow()
+            return (win.left, win.top, win.right, win.bottom) if win else None
+        if shutil.which("xdotool"):
+            out = subprocess.run(["xdotool", "getactivewindow", "getwindowgeometry", "--shell"],
+                                 capture_output=True, text=True, timeout=1).stdout
+            geo = dict(line.split("=", 1) for line in out.split() if "=" in line)
+            x, y, w, h = (int(geo[k]) for k in ("X", "Y", "WIDTH", "HEIGHT"))
+            return (x, y, x + w, y + h)
+    except Exception as e:
+        logger.warning(f"[Capture] Active window lookup failed: {e}")
+    return None
+
+
+def _focus_box(screen_w: int, screen_h: int) -> Box:
+    # Area around the mouse pointer, where the user (or our click) is working
+    import pyautogui
+    x, y = pyautogui.position()
+    w, h = FOCUS_BOX
+    left = min(max(0, x - w // 2), max(0, screen_w - w))
+    top = min(max(0, y - h // 2), max(0, screen_h - h))
+    return (left, top, min(screen_w, left + w), min(screen_h, top + h))
+
+
+def resolve_region(region: str, screen_size: Tuple[int, int]) -> Optional[Box]:
+    """
+    Maps "full", "active_window", "focused", "top_left"/"top_right"/"bottom_left"/
+    "bottom_right", "top"/"bottom"/"left"/"right" or a raw "x1,y1,x2,y2" string to a bbox.
+    None means the whole screen.
+    """
+    w, h = screen_size
+    name = region.strip().lower().replace(" ", "_").replace("-", "_")
+    named = {
+        "top_left": (0, 0, w // 2, h // 2),
+        "top_right": (w // 2, 0, w, h // 2),
+        "bottom_left": (0, h // 2, w // 2, h),
+        "bottom_right": (w // 2, h // 2, w, h),
+        "top": (0, 0, w, h // 2),
+        "bottom": (0, h // 2, w, h),
+        "left": (0, 0, w // 2, h),
+        "right": (w // 2, 0, w, h),
+    }
+    if name in ("", "full", "screen"):
+        return None
+    if name in named:
+        return named[name]
+    if name in ("active_window", "window"):
+        return _active_window_box()
+    if name in ("focused", "focus", "cursor"):
+        return _focus_box(w, h)
+    x1, y1, x2, y2 = map(int, region.split(","))
+    return (x1, y1, x2, y2)
+
+
+# ========================= PERCEPTUAL HASH ==========================
+
+def dhash(gray: np.ndarray, size: int = 16) -> int:
+    """
+    Difference hash: block-average to (size, size + 1) and compare horizontal neighbours.
+    Returns a size*size-bit integer; similar images differ in few bits.
+    """
+    h, w = gray.shape
+    if not h or not w:
+        return 0
+    if h < size or w < size + 1:
+        # Regions smaller than the hash grid: repeat pixels so every cell covers at least one
+        gray = np.repeat(np.repeat(gray, -(-size // h), axis=0), -(-(size + 1) // w), axis=1)
+        h, w = gray.shape
+    ys = np.linspace(0, h, size + 1, dtype=int)
+    xs = np.linspace(0, w, size + 2, dtype=int)
+    # Sum over row bands then column bands (reduceat keeps it vectorized)
+    rows = np.add.reduceat(gray.astype(np.uint32), ys[:-1], axis=0)
+    cells = np.add.reduceat(rows, xs[:-1], axis=1).astype(np.float64)
+    cells /= np.outer(np.diff(ys), np.diff(xs))
+    bits = (cells[:, 1:] > cells[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# ========================= PIPELINE ==========================
+
+class CapturePipeline:
+    def __init__(self, source: Optional[CaptureSource] = None, preprocessor: Optional[Preprocessor] = None):
+        self.source = source or default_source()
+        self.preprocessor = preprocessor or Preprocessor()
+
+    def capture(self, region: str = "full") -> Frame:
+        """
+        Blocking: grab + preprocess. Call it through asyncio.to_thread from coroutines.
+        """
+        bbox = resolve_region(region, self.source.size())
+        rgb = self.source.grab(bbox)
+        origin = (bbox[0], bbox[1]) if bbox else (0, 0)
+        return self.preprocessor.run(rgb, origin)
+
+    def thumbnail(self, region: str = "full", width: int = 256) -> np.ndarray:
+        """
+        Blocking: cheap grayscale thumbnail (strided subsample, no buffers touched) for change detection.
+        """
+        rgb = self.source.grab(resolve_region(region, self.source.size()))
+        step = max(1, rgb.shape[1] // width)
+        small = rgb[::step, ::step].astype(np.uint16)
+        return ((small[:, :, 0] * 77 + small[:, :, 1] * 150 + small[:, :, 2] * 29) >> 8).astype(np.uint8)
+
+
+_pipeline: Optional[CapturePipeline] = None
+
+
+def get_pipeline() -> CapturePipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = CapturePipeline()
+    return _pipeline
@@ -1,13 +1,18 @@
-import pyautogui
 import asyncio
 import logging
-import subprocess
-import pytesseract
-from PIL import ImageGrab
+import os
 from livekit.agents import function_tool
+from hero_capture import get_pipeline
+from hero_ocr_tiles import tile_ocr
+from hero_screen_index import screen_index
+from hero_screen_wait import wait_for_screen_state
+from hero_macros import format_timings, macros, run_plan
+from hero_input import input_worker
+from hero_text_input import text_input
+from hero_actions import ActionError, run_actions_pipeline, summarize, validate
+from hero_app_index import app_index, launch
 
-# Enable tesseract path (Adjust if installed in custom location)
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# Tesseract location comes from TESSERACT_CMD (or PATH), see hero_ocr.tesseract_cmd()
 
 
 # ========================= HELPERS ==========================
@@ -32,41 +37,49 @@ def speak(msg):
 # ========================= CORE TOOLS ==========================
 
 @function_tool()
-async def type_text(text: str, fast: bool = False, interval: float = 0.05) -> str:
-    speed = 0 if fast else interval
-    await asyncio.to_thread(pyautogui.typewrite, text, interval=speed)
+async def type_text(text: str, method: str = "auto", interval: float = 0.0) -> str:
+    """
+    Types text into the focused window. method: "auto" (fastest that works for this text),
+    "paste" (clipboard), "keys" (native key batch) or "chars" (one key per character,
+    `interval` seconds apart). Non-English text needs "auto", "paste" or "keys".
+    """
+    try:
+        used = await text_input.type(text, method, interval)
+    except ValueError as e:
+        return speak(f"Failed to type: {e}")
+    logging.info(f"[Type Text] {len(text)} chars via {used}")
     return speak(f"Typed '{text}'")
 
 
 @function_tool()
 async def press_key(key: str) -> str:
     k = normalize_key(key)
-    await asyncio.to_thread(pyautogui.press, k)
+    await input_worker.run("press", k)
     return speak(f"Pressed {key}")
 
 
 @function_tool()
 async def hotkey(keys: str) -> str:
     key_list = [normalize_key(k) for k in keys.split("+")]
-    await asyncio.to_thread(pyautogui.hotkey, *key_list)
+    await input_worker.run("hotkey", *key_list)
     return speak(f"Executed '{keys}' shortcut")
 
 
 @function_tool()
 async def move_mouse(x: int, y: int, duration: float = 0.2) -> str:
-    await asyncio.to_thread(pyautogui.moveTo, x, y, duration=duration)
+    await input_worker.run("moveTo", x, y, duration=duration)
     return speak(f"Moved mouse to {x},{y}")
 
 
 @function_tool()
 async def click_mouse(x: int = None, y: int = None, button: str = "left") -> str: # type: ignore
-    await asyncio.to_thread(pyautogui.click, x, y, button=button) if x and y else await asyncio.to_thread(pyautogui.click, button=button)
+    await input_worker.run("click", x, y, button=button) if x and y else await input_worker.run("click", button=button)
     return speak(f"Clicked {button} button")
 
 
 @function_tool()
 async def scroll(amount: int = 500) -> str:
-    await asyncio.to_thread(pyautogui.scroll, amount)
+    await input_worker.run("scroll", amount)
     direction = "down" if amount < 0 else "up"
     return speak(f"Scrolled {direction}")
 
@@ -76,39 +89,139 @@ async def scroll(amount: int = 500) -> str:
 @function_tool()
 async def read_screen(region: str = "full") -> str:
     """
-    region example: "0,0,800,600" or "full"
+    region example: "0,0,800,600", "full", "active_window", "focused" (around the mouse),
+    or a quadrant/half: "top_left", "top_right", "bottom_left", "bottom_right", "top", "bottom", "left", "right"
     """
-    if region == "full":
-        img = ImageGrab.grab()
-    else:
-        x, y, w, h = map(int, region.split(","))
-        img = ImageGrab.grab(bbox=(x, y, w, h))
+    try:
+        frame = await asyncio.to_thread(get_pipeline().capture, region)
+    except ValueError:
+        return speak(f"Unknown screen region: {region}")
 
-    text = pytesseract.image_to_string(img)
+    # Only tiles that changed since earlier captures are OCR'd again
+    text = await tile_ocr.read(frame.to_image())
     return speak(f"Screen text detected: {text.strip()[:200]}")
 
 
-# ========================= MACRO COMMANDS ==========================
+@function_tool()
+async def find_text(label: str, region: str = "full") -> str:
+    """
+    Finds on-screen text matching `label` (fuzzy) and returns its screen coordinates.
+    region: same values as read_screen.
+    """
+    try:
+        index = await screen_index.get(region)
+    except ValueError:
+        return speak(f"Unknown screen region: {region}")
+
+    matches = index.find(label)
+    if not matches:
+        return speak(f"Could not find '{label}' on screen")
+    found = "; ".join(f"'{m.item.text}' at {m.item.center[0]},{m.item.center[1]} ({m.score:.0%})" for m in matches)
+    return speak(f"Found {found}")
+
 
 @function_tool()
-async def open_app(app: str) -> str:
-    known = {
-        "notepad": "notepad.exe",
-        "calculator": "calc.exe",
-        "cmd": "cmd.exe",
-        "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        "spotify": r"C:\Users\%USERNAME%\AppData\Roaming\Spotify\Spotify.exe",
-    }
+async def click_text(label: str, region: str = "full", button: str = "left", double: bool = False) -> str:
+    """
+    Finds on-screen text matching `label` (fuzzy) and clicks its center in one step,
+    e.g. click_text("Save") or click_text("Sign in", region="active_window").
+    """
+    try:
+        index = await screen_index.get(region)
+    except ValueError:
+        return speak(f"Unknown screen region: {region}")
+
+    matches = index.find(label, limit=1)
+    if not matches:
+        return speak(f"Could not find '{label}' on screen")
+    match = matches[0]
+    x, y = match.item.center
+    await input_worker.run("click", x, y, clicks=2 if double else 1, button=button)
+    # The click will most likely change the screen
+    screen_index.invalidate()
+    return speak(f"Clicked '{match.item.text}' at {x},{y}")
+
+
+@function_tool()
+async def wait_for_screen(until: str = "change", text: str = "", region: str = "full",
+                          timeout: float = 10.0, fps: float = 4.0) -> str:
+    """
+    Waits for the screen instead of polling read_screen or sleeping.
+    until: "change" (region changes), "stable" (region stops changing, e.g. page finished loading)
+    or "text" (region shows `text`). region: same values as read_screen. timeout in seconds.
+    """
+    if text and until == "change":
+        until = "text"
+    if until not in ("change", "stable", "text"):
+        return speak(f"Unknown wait condition: {until}")
+    if until == "text" and not text.strip():
+        return speak("Say which text to wait for")
+    try:
+        result = await wait_for_screen_state(until, text, region, timeout, fps)
+    except ValueError:
+        return speak(f"Unknown screen region: {region}")
+
+    if result.met:
+        return speak(f"Screen {result.reason} after {result.waited:.1f}s ({result.frames} frames, {result.ocr_calls} OCR)")
+    return speak(f"Timed out after {result.waited:.1f}s waiting for screen to {until}")
 
-    exe = known.get(app.lower())
-    if not exe:
-        return speak(f"Unknown app: {app}")
 
+@function_tool()
+async def run_actions(actions: str) -> str:
+    """
+    Runs several control actions in one call. `actions` is a JSON list, e.g.
+    [{"action": "click", "x": 200, "y": 300},
+     {"action": "type", "text": "hello", "wait_for": "stable"},
+     {"action": "hotkey", "keys": "ctrl+s", "assert_text": "Saved"}]
+    Actions: type(text), press(key), hotkey(keys), move(x, y), click(x?, y?, button?, clicks?),
+    click_text(label, region?), scroll(amount), wait(seconds).
+    Any step may add wait_after (seconds), wait_for ("change" | "stable" | "text" with wait_text),
+    assert_text and timeout. The whole list is checked before anything runs; execution stops
+    at the first failing step.
+    """
+    try:
+        steps = await asyncio.to_thread(validate, actions, normalize_key)
+    except ActionError as e:
+        return speak(f"Actions rejected: {e}")
+
+    results = await run_actions_pipeline(steps, normalize_key)
+    summary = summarize(results, len(steps))
+    logging.info(f"[Run Actions] {summary}")
+    return speak(summary)
+
+
+# ========================= MACRO COMMANDS ==========================
+
+async def start_app(app: str) -> str:
+    """
+    Launches an installed app and returns its name. Raises RuntimeError if it is unknown or
+    fails to start; open_app and macro steps share it.
+    """
+    # Bare PATH executables only on Windows, where they open a window of their own; elsewhere
+    # they may be terminal programs that would start with nothing to show them
+    entry = await asyncio.to_thread(app_index.resolve, app, os.name == "nt")
+    if entry is None:
+        raise RuntimeError(f"Unknown app: {app}")
+    try:
+        await launch(entry.command)
+    except Exception as e:
+        logging.exception(f"[Open App] Failed to launch {entry.command}")
+        raise RuntimeError(f"Failed to open {app}") from e
+    logging.info(f"[Open App] '{app}' -> {entry.name} ({entry.source}): {entry.command}")
+    return entry.name
+
+
+@function_tool()
+async def open_app(app: str) -> str:
+    """
+    Opens an installed application by name ("notepad", "chrome", "vs code"); close
+    misspellings and common aliases are matched too.
+    """
     try:
-        subprocess.Popen(exe)
-        return speak(f"Opening {app}")
-    except Exception:
-        return speak(f"Failed to open {app}")
+        name = await start_app(app)
+    except RuntimeError as e:
+        return speak(str(e))
+    return speak(f"Opening {name}")
 
 
 @function_tool()
@@ -118,25 +231,22 @@ async def macro(command: str) -> str:
     examples:
       - "open notepad and write hello world"
       - "open chrome and search AI news"
-      - "open cmd and type ipconfig"
+      - "open cmd and run ipconfig"
+      - "open notepad and calculator"
     """
-
-    text = command.lower()
-
-    if "open notepad" in text:
-        await open_app("notepad")
-        await asyncio.sleep(1)
-        to_type = text.split("write")[-1].strip() if "write" in text else ""
-        if to_type:
-            await type_text(to_type)
-        return speak("Task completed")
-
-    if "open chrome" in text and "search" in text:
-        query = text.split("search")[-1].strip()
-        await open_app("chrome")
-        await asyncio.sleep(2)
-        await type_text(query)
-        await press_key("enter")
-        return speak("Search completed")
-
-    return speak("Macro understood but not programmed yet")
+    plan = macros.compile(command)
+    if plan is None:
+        return speak("Macro understood but not programmed yet")
+
+    # Executors raise on failure; run_plan stops the plan on the first one
+    actions = {
+        "open_app": start_app,
+        "type_text": text_input.type,
+        "press_key": lambda key: input_worker.run("press", normalize_key(key)),
+    }
+    try:
+        timings = await run_plan(plan, actions)
+    except RuntimeError as e:
+        return speak(f"Task stopped: {e}")
+    logging.info(f"[Macro] {plan.template}: {format_timings(timings)}")
+    return speak(f"Task completed ({format_timings(timings)})")
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import List, Sequence
+
+from hero_http import stream_text
+from hero_search_cache import STOPWORDS, tokenize
+from hero_search_router import SearchResult
+
+logger = logging.getLogger(__name__)
+
+DEEP_TOP_N = int(os.getenv("HERO_DEEP_TOP_N", "3"))
+DEEP_CONCURRENCY = int(os.getenv("HERO_DEEP_CONCURRENCY", "4"))
+DEEP_PAGE_DEADLINE = float(os.getenv("HERO_DEEP_PAGE_DEADLINE", "2.5"))
+DEEP_BUDGET = float(os.getenv("HERO_DEEP_BUDGET", "3.5"))
+DEEP_MAX_PAGE_BYTES = int(os.getenv("HERO_DEEP_MAX_PAGE_BYTES", str(512 * 1024)))
+DEEP_PASSAGES = int(os.getenv("HERO_DEEP_PASSAGES", "5"))
+DEEP_PASSAGE_CHARS = int(os.getenv("HERO_DEEP_PASSAGE_CHARS", "400"))
+
+_SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "button", "select", "template"}
+_BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "td", "dd", "article", "section", "div"}
+_MIN_PASSAGE_CHARS = 60
+
+_pool = asyncio.Semaphore(DEEP_CONCURRENCY)
+
+
+@dataclass
+class Passage:
+    text: str
+    source: str
+    rank: int
+    score: float = 0.0
+
+
+class MainTextParser(HTMLParser):
+    """
+    Incremental HTML -> paragraph extractor. Feed it decoded chunks as they arrive; text
+    inside boilerplate containers (nav, footer, scripts...) is dropped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.passages: List[str] = []
+        self._skip_depth = 0
+        self._buf: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS or tag == "br":
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._buf.append(data)
+
+    def _flush(self):
+        text = " ".join("".join(self._buf).split())
+        self._buf.clear()
+        if len(text) >= _MIN_PASSAGE_CHARS:
+            self.passages.append(text)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in tokenize(text) if t not in STOPWORDS]
+
+
+def rank_passages(query: str, passages: Sequence[Passage], limit: int = DEEP_PASSAGES) -> List[Passage]:
+    """
+    BM25-style scoring of passages against the query, with a small boost for
+    passages from higher-ranked search results. Near-duplicate passages are dropped.
+    """
+    terms = set(_tokens(query))
+    if not passages or not terms:
+        return list(passages)[:limit]
+
+    docs = [Counter(_tokens(p.text)) for p in passages]
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    df = {t: sum(1 for d in docs if t in d) for t in terms}
+    for p, d in zip(passages, docs):
+        length = sum(d.values()) or 1
+        score = 0.0
+        for t in terms:
+            tf = d.get(t, 0)
+            if tf:
+                idf = math.log(1 + (len(docs) - df[t] + 0.5) / (df[t] + 0.5))
+                score += idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / avg_len))
+        p.score = score / (1 + 0.1 * p.rank)
+
+    ranked, seen = [], set()
+    for p in sorted(passages, key=lambda p: p.score, reverse=True):
+        fingerprint = p.text[:80].lower()
+        if p.score <= 0 or fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        ranked.append(p)
+        if len(ranked) >= limit:
+            break
+    return ranked
+
+
+async def _fetch_page(result: SearchResult, rank: int) -> List[Passage]:
+    parser = MainTextParser()
+    async with _pool:
+        await asyncio.wait_for(
+            stream_text(result.url, parser.feed, max_bytes=DEEP_MAX_PAGE_BYTES, timeout=DEEP_PAGE_DEADLINE),
+            DEEP_PAGE_DEADLINE,
+        )
+    parser.close()
+    return [Passage(text[:DEEP_PASSAGE_CHARS], result.title, rank) for text in parser.passages]
+
+
+async def deep_passages(query: str, results: Sequence[SearchResult], top_n: int = DEEP_TOP_N,
+                        budget: float = DEEP_BUDGET) -> List[Passage]:
+    """
+    Fetches the top-N result pages concurrently and returns the best passages. Pages that
+    fail or are still loading when the budget runs out are dropped.
+    """
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(_fetch_page(r, i)) for i, r in enumerate(results[:top_n]) if r.url]
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+
+    passages: List[Passage] = []
+    pages = 0
+    for task in done:
+        if task.exception() is None:
+            pages += 1
+            passages.extend(task.result())
+        else:
+            logger.info(f"[Deep Search] Page dropped: {task.exception()!r}")
+    ranked = rank_passages(query, passages)
+    logger.info(
+        f"[Deep Search] {pages}/{len(tasks)} pages, {len(passages)} passages -> {len(ranked)} "
+        f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return ranked
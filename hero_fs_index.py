@@ -0,0 +1,627 @@
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import itertools
+import logging
+import os
+import re
+import select
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from livekit.agents import function_tool
+
+from hero_cache import cache_path
+
+logger = logging.getLogger(__name__)
+
+_HOME = os.path.expanduser("~")
+_DEFAULT_ROOTS = [os.path.join(_HOME, d) for d in ("Desktop", "Documents", "Downloads", "Music", "Pictures", "Videos")]
+
+FS_INDEX_ENABLED = os.getenv("HERO_FS_INDEX", "1").lower() in ("1", "true", "yes")
+FS_ROOTS = [r for r in os.getenv("HERO_FS_ROOTS", "").split(os.pathsep) if r] or \
+    [r for r in _DEFAULT_ROOTS if os.path.isdir(r)] or [_HOME]
+FS_INDEX_PATH = os.getenv("HERO_FS_INDEX_PATH") or cache_path("files.sqlite3")
+# Polling fallback: how often directory mtimes are checked, and how often everything is
+# rescanned (a file edited in place doesn't change its directory's mtime)
+FS_POLL_INTERVAL = float(os.getenv("HERO_FS_POLL_INTERVAL", "5"))
+FS_RESCAN_INTERVAL = float(os.getenv("HERO_FS_RESCAN_INTERVAL", "900"))
+FS_PAGE_SIZE = int(os.getenv("HERO_FS_PAGE_SIZE", "20"))
+FUZZY_THRESHOLD = 0.6
+
+# Never descended into; hidden (dot) entries are skipped as well
+EXCLUDED_DIRS = {"node_modules", "__pycache__", "venv", "site-packages", "AppData", "$RECYCLE.BIN",
+                 "System Volume Information"}
+_CANDIDATES = 2000  # rows fetched per search strategy before ranking
+_CORRECTIONS = 3  # vocabulary words tried per misspelt query word
+_WORD_RE = re.compile(r"[\W_]+")
+_BATCH_DIRS = 200  # directories written per transaction during a sweep
+_SETTLE = 0.5  # inotify: seconds of quiet before changed directories are rescanned...
+_MAX_DELAY = 5.0  # ...or at the latest this long after the first change
+
+
+@dataclass
+class FileEntry:
+    path: str
+    is_dir: bool
+    size: int
+    mtime: float
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+def _skipped(name: str) -> bool:
+    """Entries left out of the index, and so of every listing."""
+    return name.startswith(".") or name in EXCLUDED_DIRS
+
+
+def _ext(name: str) -> str:
+    return os.path.splitext(name)[1][1:].lower()
+
+
+def _words(name: str) -> Set[str]:
+    """Lowercase words of a file name, the vocabulary typo correction picks from."""
+    return {w for w in _WORD_RE.split(os.path.splitext(name)[0].lower()) if len(w) >= 3 and not w.isdigit()}
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _create_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Creates the tables; returns whether trigram full-text search (substring/fuzzy lookups
+    in milliseconds) is available, otherwise name searches fall back to a LIKE scan.
+    """
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS dirs (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, mtime REAL);
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY, dir INTEGER NOT NULL, name TEXT NOT NULL, ext TEXT NOT NULL,
+            size INTEGER NOT NULL, mtime REAL NOT NULL, is_dir INTEGER NOT NULL);
+        CREATE UNIQUE INDEX IF NOT EXISTS files_dir ON files(dir, name);
+        CREATE INDEX IF NOT EXISTS files_name ON files(name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS files_ext ON files(ext, mtime);
+        CREATE INDEX IF NOT EXISTS files_mtime ON files(mtime);
+        CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, scanned_at REAL);
+        CREATE TABLE IF NOT EXISTS words (id INTEGER PRIMARY KEY, word TEXT NOT NULL UNIQUE);
+    """)
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(
+                name, content='files', content_rowid='id', tokenize='trigram');
+            CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                INSERT INTO names(rowid, name) VALUES (new.id, new.name); END;
+            CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                INSERT INTO names(names, rowid, name) VALUES ('delete', old.id, old.name); END;
+            CREATE VIRTUAL TABLE IF NOT EXISTS word_grams USING fts5(
+                word, content='words', content_rowid='id', tokenize='trigram');
+            CREATE TRIGGER IF NOT EXISTS words_ai AFTER INSERT ON words BEGIN
+                INSERT INTO word_grams(rowid, word) VALUES (new.id, new.word); END;
+        """)
+        return True
+    except sqlite3.OperationalError as e:
+        logger.info(f"[Files] No trigram full-text search in this SQLite ({e}), using LIKE scans")
+        return False
+
+
+class _Inotify:
+    """
+    Minimal inotify binding (Linux, through libc) reporting which watched directories changed.
+    """
+
+    IN_ATTRIB, IN_CLOSE_WRITE = 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED = 0x400, 0x800, 0x4000, 0x8000
+    IN_ONLYDIR, IN_DONT_FOLLOW = 0x01000000, 0x02000000
+    MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+    _EVENT = "iIII"  # int wd; uint32 mask, cookie, len; then `len` bytes of name
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths: Dict[int, str] = {}
+
+    def watch(self, path: str) -> None:
+        """Raises OSError(ENOSPC) once the per-user watch limit is used up."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return  # the directory vanished or is unreadable; its parent's rescan handles it
+        self.paths[wd] = path
+
+    def read(self, timeout: float) -> Tuple[Set[str], bool]:
+        """Directories with changes, and whether events were lost (queue overflow)."""
+        changed, overflow = set(), False
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed, overflow
+        header = struct.calcsize(self._EVENT)
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos + header <= len(data):
+                wd, mask, _, length = struct.unpack_from(self._EVENT, data, pos)
+                pos += header + length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                path = self.paths.get(wd)
+                if mask & self.IN_IGNORED:
+                    self.paths.pop(wd, None)
+                elif path is not None:
+                    # a directory moved or deleted itself is picked up by its parent's rescan
+                    changed.add(os.path.dirname(path) if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF) else path)
+        return changed, overflow
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _HostLock:
+    """
+    Non-blocking exclusive lock on a file: only one worker process per host maintains the
+    index, the others just read it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        f = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+
+class FileIndex:
+    """
+    Names, sizes and mtimes of everything under FS_ROOTS in SQLite (directories stored once,
+    files by directory id, plus a trigram full-text table on names). A background thread does
+    an os.scandir sweep, then keeps it current from inotify on Linux or by polling directory
+    mtimes elsewhere. Lookups only read the database, from any thread or process.
+    """
+
+    def __init__(self, roots: Iterable[str] = FS_ROOTS, path: str = FS_INDEX_PATH):
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots]
+        self.path = path
+        self.fts = False
+        self.mode = "idle"  # idle | reader | sweeping | inotify | polling
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._inotify: Optional[_Inotify] = None
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = _connect(self.path)
+        with self._schema_lock:
+            if not self._schema_ready:
+                self.fts = _create_schema(conn)
+                self._schema_ready = True
+        return conn
+
+    # ------------------------- maintenance (writer thread) -------------------------
+
+    def start(self) -> None:
+        if self._thread is not None or not FS_INDEX_ENABLED:
+            return
+        self._thread = threading.Thread(target=self._run, name="hero-fs-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        lock = _HostLock(self.path + ".lock")
+        self.mode = "reader"
+        # Another process maintains the index; take over if it goes away
+        while not lock.acquire():
+            if self._stop.wait(FS_RESCAN_INTERVAL):
+                return
+        conn = self._open()
+        if os.name == "posix" and not os.getenv("HERO_FS_POLL"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logger.info(f"[Files] inotify unavailable ({e}), polling every {FS_POLL_INTERVAL:.0f}s")
+        try:
+            self._sweep(conn)
+            if self._inotify is not None:
+                self._watch(conn)
+            else:
+                self._poll(conn)
+        except Exception:
+            logger.exception("[Files] Indexer stopped")
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+            conn.close()
+
+    def _sweep(self, conn: sqlite3.Connection) -> None:
+        self.mode = "sweeping"
+        started = time.perf_counter()
+        for root in self.roots:
+            if os.path.isdir(root):
+                self._walk(conn, [root])
+                conn.execute("INSERT OR REPLACE INTO roots (path, scanned_at) VALUES (?, ?)", (root, time.time()))
+        files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        logger.info(f"[Files] Indexed {files} entries under {len(self.roots)} root(s) in {time.perf_counter() - started:.1f}s")
+
+    def _walk(self, conn: sqlite3.Connection, stack: List[str]) -> None:
+        done = 0
+        conn.execute("BEGIN")
+        try:
+            while stack and not self._stop.is_set():
+                stack.extend(self._scan_dir(conn, stack.pop()))
+                done += 1
+                if done % _BATCH_DIRS == 0:
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN")
+        finally:
+            conn.execute("COMMIT")
+
+    def _add_watch(self, path: str) -> None:
+        if self._inotify is None:
+            return
+        try:
+            self._inotify.watch(path)
+        except OSError as e:
+            logger.warning(f"[Files] {e}; falling back to polling")
+            self._inotify.close()
+            self._inotify = None
+
+    def _scan_dir(self, conn: sqlite3.Connection, path: str) -> List[str]:
+        """
+        Brings one directory's rows up to date; returns its subdirectories.
+        """
+        try:
+            dir_mtime = os.stat(path).st_mtime
+            entries = []
+            with os.scandir(path) as it:
+                for e in it:
+                    if _skipped(e.name):
+                        continue
+                    try:
+                        is_dir = e.is_dir(follow_symlinks=False)
+                        st = e.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append((e.name, is_dir, 0 if is_dir else st.st_size, st.st_mtime))
+        except OSError:
+            self._drop_tree(conn, path)
+            return []
+
+        self._add_watch(path)
+        row = conn.execute("SELECT id FROM dirs WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            dir_id = conn.execute("INSERT INTO dirs (path, mtime) VALUES (?, ?)", (path, dir_mtime)).lastrowid
+        else:
+            dir_id = row[0]
+            conn.execute("UPDATE dirs SET mtime = ? WHERE id = ?", (dir_mtime, dir_id))
+        known = {name: (fid, size, mtime, is_dir)
+                 for fid, name, size, mtime, is_dir in conn.execute(
+                     "SELECT id, name, size, mtime, is_dir FROM files WHERE dir = ?", (dir_id,))}
+        subdirs = []
+        for name, is_dir, size, mtime in entries:
+            old = known.pop(name, None)
+            if is_dir:
+                subdirs.append(os.path.join(path, name))
+            if old is None:
+                conn.execute("INSERT INTO files (dir, name, ext, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?)",
+                             (dir_id, name, "" if is_dir else _ext(name), size, mtime, int(is_dir)))
+                if self.fts:
+                    # words are never removed: a stale one only costs a correction that finds nothing
+                    conn.executemany("INSERT OR IGNORE INTO words (word) VALUES (?)", [(w,) for w in _words(name)])
+            elif old[1:] != (size, mtime, int(is_dir)):
+                conn.execute("UPDATE files SET size = ?, mtime = ?, is_dir = ? WHERE id = ?",
+                             (size, mtime, int(is_dir), old[0]))
+        for name, (fid, _, _, was_dir) in known.items():
+            conn.execute("DELETE FROM files WHERE id = ?", (fid,))
+            if was_dir:
+                self._drop_tree(conn, os.path.join(path, name))
+        return subdirs
+
+    def _drop_tree(self, conn: sqlite3.Connection, path: str) -> None:
+        ids = [r[0] for r in conn.execute("SELECT id FROM dirs WHERE path = ? OR (path > ? AND path < ?)",
+                                          (path, path + os.sep, path + os.sep + "\U0010ffff"))]
+        for dir_id in ids:
+            conn.execute("DELETE FROM files WHERE dir = ?", (dir_id,))
+            conn.execute("DELETE FROM dirs WHERE id = ?", (dir_id,))
+
+    def _rescan(self, conn: sqlite3.Connection, dirs: Iterable[str]) -> None:
+        """
+        Rescans changed directories; subdirectories that are new to the index are walked.
+        """
+        new = []
+        conn.execute("BEGIN")
+        try:
+            for path in dirs:
+                for sub in self._scan_dir(conn, path):
+                    if conn.execute("SELECT 1 FROM dirs WHERE path = ?", (sub,)).fetchone() is None:
+                        new.append(sub)
+        finally:
+            conn.execute("COMMIT")
+        if new:
+            self._walk(conn, new)
+
+    def _under_roots(self, path: str) -> bool:
+        return any(path == r or path.startswith(r + os.sep) for r in self.roots)
+
+    def _watch(self, conn: sqlite3.Connection) -> None:
+        self.mode = "inotify"
+        logger.info(f"[Files] Watching {len(self._inotify.paths)} directories with inotify")
+        pending: Set[str] = set()
+        first_change = 0.0
+        while not self._stop.is_set():
+            if self._inotify is None:
+                return self._poll(conn)
+            changed, overflow = self._inotify.read(_SETTLE)
+            if overflow:
+                logger.info("[Files] inotify queue overflowed, rescanning everything")
+                self._sweep(conn)
+                self.mode = "inotify"
+                pending.clear()
+                continue
+            changed = {p for p in changed if self._under_roots(p)}
+            if changed and not pending:
+                first_change = time.monotonic()
+            pending |= changed
+            if pending and (not changed or time.monotonic() - first_change > _MAX_DELAY):
+                self._rescan(conn, sorted(pending))
+                pending.clear()
+
+    def _poll(self, conn: sqlite3.Connection) -> None:
+        self.mode = "polling"
+        last_sweep = time.monotonic()
+        while not self._stop.wait(FS_POLL_INTERVAL):
+            if time.monotonic() - last_sweep > FS_RESCAN_INTERVAL:
+                self._sweep(conn)
+                self.mode = "polling"
+                last_sweep = time.monotonic()
+                continue
+            changed = []
+            for path, mtime in conn.execute("SELECT path, mtime FROM dirs").fetchall():
+                try:
+                    if os.stat(path).st_mtime != mtime:
+                        changed.append(path)
+                except OSError:
+                    changed.append(os.path.dirname(path))
+            if changed:
+                self._rescan(conn, changed)
+
+    # ------------------------- lookups -------------------------
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def _filters(self, ext: Iterable[str], since: float, folder: str, kind: str) -> Tuple[str, list]:
+        sql, args = [], []
+        ext = [e.lower().lstrip(".") for e in ext if e]
+        if ext:
+            sql.append(f"f.ext IN ({','.join('?' * len(ext))})")
+            args += ext
+        if since:
+            sql.append("f.mtime >= ?")
+            args.append(since)
+        if folder:
+            folder = os.path.abspath(os.path.expanduser(folder))
+            sql.append("(d.path = ? OR (d.path > ? AND d.path < ?))")
+            args += [folder, folder + os.sep, folder + os.sep + "\U0010ffff"]
+        if kind in ("file", "folder"):
+            sql.append("f.is_dir = ?")
+            args.append(int(kind == "folder"))
+        return "".join(f" AND {s}" for s in sql), args
+
+    def _ids(self, where: str, args: list, limit: int = _CANDIDATES, order: str = "") -> List[Tuple[int, str, float]]:
+        join = " JOIN dirs d ON d.id = f.dir" if "d.path" in where else ""
+        return self._reader().execute(
+            f"SELECT f.id, f.name, f.mtime FROM files f{join} WHERE {where}{order} LIMIT {int(limit)}", args).fetchall()
+
+    def _entries(self, ids: List[int]) -> List[FileEntry]:
+        if not ids:
+            return []
+        rows = {fid: FileEntry(os.path.join(p, n), bool(is_dir), size, mtime)
+                for fid, p, n, is_dir, size, mtime in self._reader().execute(
+                    "SELECT f.id, d.path, f.name, f.is_dir, f.size, f.mtime FROM files f JOIN dirs d ON d.id = f.dir "
+                    f"WHERE f.id IN ({','.join('?' * len(ids))})", ids)}
+        return [rows[i] for i in ids if i in rows]
+
+    def _match_words(self, words: List[str], filters: str, args: list) -> List[Tuple[int, str, float]]:
+        """Entries whose name contains every word."""
+        long_words = [w for w in words if len(w) >= 3]
+        if self.fts and long_words:
+            match = " AND ".join('"' + w.replace('"', '""') + '"' for w in long_words)
+            rows = self._ids(f"f.id IN (SELECT rowid FROM names WHERE names MATCH ?){filters}", [match] + args)
+            return [r for r in rows if all(w in r[1].lower() for w in words)]
+        like = " AND ".join("f.name LIKE ?" for _ in words)
+        return self._ids(f"{like}{filters}", [f"%{w}%" for w in words] + args)
+
+    def _corrections(self, word: str) -> List[Tuple[str, float]]:
+        """Vocabulary words close to a misspelt query word, with their similarity."""
+        grams = {word[i:i + 3] for i in range(len(word) - 2)}
+        match = " OR ".join('"' + g.replace('"', '""') + '"' for g in grams)
+        rows = self._reader().execute(
+            "SELECT word FROM words WHERE id IN "
+            "(SELECT rowid FROM word_grams WHERE word_grams MATCH ? ORDER BY rank LIMIT 200)", (match,)).fetchall()
+        scored = sorted(((w, SequenceMatcher(None, word, w).ratio()) for (w,) in rows), key=lambda ws: -ws[1])
+        return [(w, r) for w, r in scored[:_CORRECTIONS] if r >= FUZZY_THRESHOLD and w != word]
+
+    def search(self, name: str = "", ext: Iterable[str] = (), modified_within_days: float = 0,
+               folder: str = "", kind: str = "any", offset: int = 0,
+               limit: int = FS_PAGE_SIZE) -> Tuple[List[FileEntry], int]:
+        """
+        Entries matching `name` (prefix, then containing every word, then with misspelt words
+        corrected), best first and newest first within a tier, filtered by extension, age,
+        folder and kind. Returns one page and the number of matches (capped per tier).
+        """
+        since = time.time() - modified_within_days * 86400 if modified_within_days else 0
+        filters, args = self._filters(ext, since, folder, kind)
+        query = " ".join(name.lower().split())
+        if not query:
+            total = self._reader().execute(
+                f"SELECT COUNT(*) FROM files f JOIN dirs d ON d.id = f.dir WHERE 1{filters}", args).fetchone()[0]
+            rows = self._ids(f"1{filters}", args, limit=offset + limit, order=" ORDER BY f.mtime DESC")
+            return self._entries([r[0] for r in rows[offset:]]), total
+
+        ranked: Dict[int, Tuple[float, float]] = {}  # id -> (score, mtime)
+
+        def add(rows: List[Tuple[int, str, float]], score: float) -> None:
+            for fid, _, mtime in rows:
+                if fid not in ranked:
+                    ranked[fid] = (score, mtime)
+
+        add(self._ids(f"f.name COLLATE NOCASE >= ? AND f.name COLLATE NOCASE < ?{filters}",
+                      [query, query + "\U0010ffff"] + args), 3.0)
+        words = query.split()
+        add(self._match_words(words, filters, args), 2.0)
+        if len(ranked) < offset + limit and self.fts:
+            # Typos: swap each unmatched word for close vocabulary words
+            options = []
+            for w in words:
+                fixes = self._corrections(w) if len(w) >= 4 and not self._match_words([w], filters, args) else []
+                options.append(fixes or [(w, 1.0)])
+            for combo in itertools.islice(itertools.product(*options), _CORRECTIONS ** 2):
+                if any(r < 1.0 for _, r in combo):
+                    add(self._match_words([w for w, _ in combo], filters, args), min(r for _, r in combo))
+        ordered = sorted(ranked.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        return self._entries([fid for fid, _ in ordered[offset:offset + limit]]), len(ordered)
+
+    def listing(self, path: str, offset: int = 0, limit: int = FS_PAGE_SIZE) -> Optional[Tuple[List[FileEntry], int]]:
+        """
+        One page of a directory from the index (folders first, then by name), or None when
+        the directory isn't indexed.
+        """
+        path = os.path.abspath(os.path.expanduser(path))
+        conn = self._reader()
+        row = conn.execute("SELECT id FROM dirs WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        total = conn.execute("SELECT COUNT(*) FROM files WHERE dir = ?", (row[0],)).fetchone()[0]
+        rows = conn.execute("SELECT name, is_dir, size, mtime FROM files WHERE dir = ? "
+                            "ORDER BY is_dir DESC, name COLLATE NOCASE LIMIT ? OFFSET ?", (row[0], limit, offset))
+        return [FileEntry(os.path.join(path, n), bool(d), s, m) for n, d, s, m in rows], total
+
+    def ready(self) -> bool:
+        """Whether every root has had its first full sweep (in any process)."""
+        scanned = {r[0] for r in self._reader().execute("SELECT path FROM roots")}
+        return all(r in scanned for r in self.roots if os.path.isdir(r))
+
+    def stats(self) -> dict:
+        conn = self._reader()
+        return {
+            "mode": self.mode,
+            "roots": self.roots,
+            "dirs": conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0],
+            "entries": conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+        }
+
+
+file_index = FileIndex()
+
+
+def scan_listing(path: str, offset: int = 0, limit: int = FS_PAGE_SIZE) -> Tuple[List[FileEntry], int]:
+    """
+    Same as FileIndex.listing, straight from the filesystem, leaving out the same hidden and
+    excluded entries so a folder lists the same whether or not it is indexed.
+    """
+    entries = []
+    with os.scandir(path) as it:
+        for e in it:
+            if _skipped(e.name):
+                continue
+            try:
+                is_dir = e.is_dir()
+                st = e.stat()
+            except OSError:
+                continue
+            entries.append(FileEntry(os.path.join(path, e.name), is_dir, 0 if is_dir else st.st_size, st.st_mtime))
+    entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+    return entries[offset:offset + limit], len(entries)
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def describe(entry: FileEntry, full_path: bool = True) -> str:
+    label = entry.path if full_path else entry.name
+    modified = datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M")
+    if entry.is_dir:
+        return f"{label}{os.sep} (folder, {modified})"
+    return f"{label} ({_size(entry.size)}, {modified})"
+
+
+def page_footer(page: int, shown: int, total: int, tool: str, args: str = "") -> str:
+    start = (page - 1) * FS_PAGE_SIZE
+    footer = f"\n[{start + 1}-{start + shown} of {total}"
+    if start + shown < total:
+        footer += f"; call {tool}({args + ', ' if args else ''}page={page + 1}) for more"
+    return footer + "]"
+
+
+@function_tool
+async def find_file(name: str = "", extension: str = "", modified_within_days: float = 0,
+                    folder: str = "", kind: str = "any", page: int = 1) -> str:
+    """
+    Finds files and folders on this computer by name, instead of listing folders one by one.
+    name: part of the name, typos allowed (empty = any). extension: e.g. "pdf" or "pdf,docx".
+    modified_within_days: only recently changed items. folder: only inside this folder.
+    kind: "file", "folder" or "any". Results are newest first within each match quality.
+    """
+    page = max(1, int(page))
+    exts = [e.strip() for e in extension.split(",") if e.strip()]
+    try:
+        started = time.perf_counter()
+        rows, total = await asyncio.to_thread(file_index.search, name, exts, modified_within_days, folder, kind,
+                                              (page - 1) * FS_PAGE_SIZE, FS_PAGE_SIZE)
+        logger.info(f"[Files] find_file({name!r}, ext={exts}, days={modified_within_days}, folder={folder!r}) "
+                    f"-> {total} in {(time.perf_counter() - started) * 1000:.1f}ms")
+        building = not rows and not await asyncio.to_thread(file_index.ready)
+    except sqlite3.Error as e:
+        logger.exception("[Files] Search failed")
+        return f"File search failed: {e}"
+    if not rows:
+        if page > 1:
+            return f"No more results for '{name}'"
+        return f"No files found for '{name}'" + (" (the file index is still being built)" if building else "")
+    args = ", ".join(f"{k}={v!r}" for k, v in (("name", name), ("extension", extension),
+                                               ("modified_within_days", modified_within_days),
+                                               ("folder", folder), ("kind", kind)) if v and v != "any")
+    return "\n".join(describe(r) for r in rows) + page_footer(page, len(rows), total, "find_file", args)
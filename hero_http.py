@@ -0,0 +1,268 @@
+import asyncio
+import codecs
+import contextlib
+import contextvars
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode, urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# ⚙️ SETTINGS (override through .env)
+# -------------------------------------------------
+HTTP_TIMEOUT = float(os.getenv("HERO_HTTP_TIMEOUT", "5"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HERO_HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_RETRIES = int(os.getenv("HERO_HTTP_RETRIES", "1"))
+HTTP_BACKOFF = float(os.getenv("HERO_HTTP_BACKOFF", "0.2"))
+HTTP_LIMIT = int(os.getenv("HERO_HTTP_LIMIT", "32"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HERO_HTTP_LIMIT_PER_HOST", "8"))
+HTTP_DNS_TTL = int(os.getenv("HERO_HTTP_DNS_TTL", "300"))
+HTTP_KEEPALIVE = float(os.getenv("HERO_HTTP_KEEPALIVE", "30"))
+
+USER_AGENT = "HERO-Assistant/1.0"
+
+# Status codes worth another attempt; everything else >= 400 is raised straight away.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Query parameters never written to logs or traces
+SECRET_PARAMS = {"key", "api_key", "apikey", "token", "access_token", "secret", "password", "cx", "appid"}
+
+
+@dataclass
+class RequestTiming:
+    method: str
+    host: str
+    status: Optional[int]
+    elapsed_ms: float
+    attempts: int
+
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_timings: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("hero_http_timings", default=None)
+
+# Trace hooks (see hero_trace), both None in normal operation:
+# response_hook(key, status, elapsed_ms, body, error) sees every upstream response once decoded;
+# responder(key) is awaited for the recorded body of a request instead of going to the network.
+response_hook: Optional[Callable[[str, Optional[int], float, Any, Optional[str]], None]] = None
+responder: Optional[Callable[[str], Awaitable[Any]]] = None
+
+
+def request_key(method: str, url: str, params: Optional[dict] = None) -> str:
+    """
+    Identifies a request for the trace hooks: method, URL and sorted parameters, secrets redacted.
+    """
+    query = sorted((k, "REDACTED" if k.lower() in SECRET_PARAMS else str(v)) for k, v in (params or {}).items())
+    return f"{method} {url}" + (f"?{urlencode(query)}" if query else "")
+
+
+def _observe(key: str, status: Optional[int], started: float, body: Any = None,
+             error: Optional[BaseException] = None) -> None:
+    if response_hook is not None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        response_hook(key, status, elapsed_ms, body, repr(error) if error is not None else None)
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Returns the pooled keep-alive session for the running event loop, creating it on first use.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_LIMIT,
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            use_dns_cache=True,
+            ttl_dns_cache=HTTP_DNS_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            headers={"User-Agent": USER_AGENT},
+        )
+        _session_loop = loop
+        logger.info(f"[http] Session opened (limit={HTTP_LIMIT}, per_host={HTTP_LIMIT_PER_HOST}, dns_ttl={HTTP_DNS_TTL}s)")
+    return _session
+
+
+async def close_session() -> None:
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+@contextlib.contextmanager
+def track_requests(label: str):
+    """
+    Collects a RequestTiming for every request made inside the block (including child tasks)
+    and logs a one-line summary for the tool call when it exits.
+    """
+    timings: list = []
+    token = _timings.set(timings)
+    started = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+        parts = ", ".join(
+            f"{t.method} {t.host} {t.status or 'ERR'} {t.elapsed_ms:.0f}ms"
+            + (f" x{t.attempts}" if t.attempts > 1 else "")
+            for t in timings
+        )
+        logger.info(f"[{label}] {len(timings)} request(s) in {total_ms:.0f}ms" + (f": {parts}" if parts else ""))
+
+
+def _record(timing: RequestTiming) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.append(timing)
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    expect: str = "json",
+) -> Any:
+    """
+    Performs a request on the shared session and returns the decoded body.
+    `expect` is "json", "text" or "bytes". Connection errors, timeouts and 429/5xx
+    responses are retried with exponential backoff; other 4xx responses raise immediately.
+    """
+    retries = HTTP_RETRIES if retries is None else retries
+    req_timeout = aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+    host = urlsplit(url).hostname or url
+    key = request_key(method, url, params)
+    started = time.perf_counter()
+    status = None
+    attempt = 0
+
+    try:
+        if responder is not None:
+            attempt = 1
+            body = await responder(key)
+            status = 200
+            return body
+        while True:
+            attempt += 1
+            try:
+                async with get_session().request(method, url, params=params, headers=headers, timeout=req_timeout) as resp:
+                    status = resp.status
+                    if status in _RETRY_STATUSES and attempt <= retries:
+                        raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=status, message=resp.reason or "")
+                    resp.raise_for_status()
+                    if expect == "json":
+                        body = await resp.json(content_type=None)
+                    elif expect == "text":
+                        body = await resp.text(errors="replace")
+                    else:
+                        body = await resp.read()
+                    _observe(key, status, started, body)
+                    return body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in _RETRY_STATUSES
+                if not retryable or attempt > retries:
+                    _observe(key, status, started, error=e)
+                    raise
+                delay = HTTP_BACKOFF * (2 ** (attempt - 1))
+                logger.warning(f"[http] {method} {host} attempt {attempt} failed ({e!r}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    finally:
+        _record(RequestTiming(method, host, status, (time.perf_counter() - started) * 1000, attempt))
+
+
+async def get_json(url: str, **kwargs) -> Any:
+    return await request("GET", url, expect="json", **kwargs)
+
+
+async def get_text(url: str, **kwargs) -> str:
+    return await request("GET", url, expect="text", **kwargs)
+
+
+async def stream_text(url: str, on_text, *, max_bytes: int = 512 * 1024, timeout: Optional[float] = None,
+                      content_types: tuple = ("text/html", "text/plain", "application/xhtml")) -> int:
+    """
+    Streams a text response to `on_text(str)` chunk by chunk as it is decoded, stopping after
+    `max_bytes`. Responses whose content type is not listed are skipped. Returns bytes read.
+    """
+    host = urlsplit(url).hostname or url
+    key = request_key("GET", url)
+    started = time.perf_counter()
+    status = None
+    read = 0
+    req_timeout = aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+    try:
+        if responder is not None:
+            text = await responder(key)
+            status = 200
+            on_text(text)
+            return len(text.encode())
+        seen = [] if response_hook is not None else None
+        async with get_session().get(url, timeout=req_timeout) as resp:
+            status = resp.status
+            resp.raise_for_status()
+            if not resp.content_type.startswith(content_types):
+                _observe(key, status, started, "")
+                return 0
+            try:
+                decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            async for chunk in resp.content.iter_chunked(16 * 1024):
+                read += len(chunk)
+                text = decoder.decode(chunk)
+                on_text(text)
+                if seen is not None:
+                    seen.append(text)
+                if read >= max_bytes:
+                    break
+            text = decoder.decode(b"", final=True)
+            on_text(text)
+            if seen is not None:
+                _observe(key, status, started, "".join(seen) + text)
+            return read
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _observe(key, status, started, error=e)
+        raise
+    finally:
+        _record(RequestTiming("GET", host, status, (time.perf_counter() - started) * 1000, 1))
+
+
+async def run_blocking(host: str, fn, *args, **kwargs) -> Any:
+    """
+    Runs a blocking client call (e.g. the DDGS library) in a worker thread so it cannot
+    stall the event loop, recording its timing alongside the pooled requests.
+    """
+    key = request_key("CALL", f"{host}/{getattr(fn, '__name__', 'call')}", {f"arg{i}": a for i, a in enumerate(args)} | kwargs)
+    started = time.perf_counter()
+    ok = False
+    try:
+        if responder is not None:
+            result = await responder(key)
+            ok = True
+            return result
+        try:
+            result = await asyncio.to_thread(fn, *args, **kwargs)
+        except Exception as e:
+            _observe(key, None, started, error=e)
+            raise
+        ok = True
+        _observe(key, 200, started, result)
+        return result
+    finally:
+        _record(RequestTiming("CALL", host, 200 if ok else None, (time.perf_counter() - started) * 1000, 1))
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Settle time after each action, replacing pyautogui.PAUSE (0.1s) for calls made through the worker
+INPUT_PAUSE = float(os.getenv("HERO_INPUT_PAUSE", "0.02"))
+_LATENCY_SAMPLES = 256
+
+
+@dataclass
+class InputOp:
+    action: str                  # pyautogui function name, or a label when `fn` is set
+    args: Tuple
+    kwargs: Dict[str, Any]
+    pause: float
+    fn: Optional[Callable] = None
+    queued_at: float = field(default_factory=time.perf_counter)
+    waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = field(default_factory=list)
+
+
+def _coalesce(previous: InputOp, op: InputOp) -> bool:
+    """
+    Folds `op` into `previous` (still queued, not started) when running both would be
+    redundant: consecutive moves go straight to the last target with the last duration,
+    consecutive in-place scrolls add up.
+    """
+    if previous.fn or op.fn or previous.action != op.action:
+        return False
+    if op.action == "moveTo":
+        previous.args, previous.kwargs = op.args, op.kwargs
+    elif op.action == "scroll" and len(op.args) == 1 and previous.kwargs == op.kwargs:
+        previous.args = (previous.args[0] + op.args[0],)
+    else:
+        return False
+    previous.pause = max(previous.pause, op.pause)
+    previous.waiters.extend(op.waiters)
+    return True
+
+
+class InputWorker:
+    """
+    One dedicated thread that owns all synthetic input. Actions run strictly in submission
+    order, so concurrent tool calls can't interleave keystrokes, and pause sleeps don't tie
+    up the shared default executor.
+    """
+
+    def __init__(self, pause: float = INPUT_PAUSE):
+        self.pause = pause
+        self._queue: Deque[InputOp] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._latency: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=_LATENCY_SAMPLES))
+        self.coalesced = 0
+        self.max_depth = 0
+        self.error: Optional[BaseException] = None  # why pyautogui could not be loaded
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="hero-input", daemon=True)
+            self._thread.start()
+
+    async def run(self, action: str, *args, pause: Optional[float] = None, **kwargs) -> Any:
+        """
+        Queues pyautogui.<action>(*args, **kwargs) and waits for it to run. `pause` overrides the
+        settle time after this action (0 for none). Raises RuntimeError if pyautogui can't be
+        loaded (e.g. no display).
+        """
+        if self.error is not None:
+            raise _unavailable(self.error)
+        return await self._submit(InputOp(action, args, kwargs, self.pause if pause is None else pause))
+
+    async def call(self, label: str, fn: Callable, *args, pause: Optional[float] = None, **kwargs) -> Any:
+        """
+        Queues an arbitrary blocking input routine (e.g. a paste or a native key batch) in the same
+        ordered stream as the pyautogui actions.
+        """
+        return await self._submit(InputOp(label, args, kwargs, self.pause if pause is None else pause, fn))
+
+    async def _submit(self, op: InputOp) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        op.waiters.append((loop, fut))
+        with self._cond:
+            if self._queue and _coalesce(self._queue[-1], op):
+                self.coalesced += 1
+            else:
+                self._queue.append(op)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._ensure_thread()
+            self._cond.notify()
+        return await fut
+
+    def _load(self):
+        # Loaded here rather than at import so the worker process starts without it
+        try:
+            import pyautogui
+            return pyautogui
+        except Exception as e:
+            logger.error(f"[Input] pyautogui unavailable, keyboard and mouse actions will fail: {e!r}")
+            self.error = e
+            return None
+
+    def _loop(self) -> None:
+        pyautogui = self._load()
+
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                op = self._queue.popleft()
+
+            if all(fut.cancelled() for _, fut in op.waiters):
+                continue
+            started = time.perf_counter()
+            try:
+                if op.fn is not None:
+                    # Routines that don't need pyautogui (xdotool, SendInput) still run without it
+                    result = op.fn(*op.args, **op.kwargs)
+                elif pyautogui is None:
+                    raise _unavailable(self.error)
+                else:
+                    result = getattr(pyautogui, op.action)(*op.args, _pause=False, **op.kwargs)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            if op.pause > 0:
+                time.sleep(op.pause)
+
+            done = time.perf_counter()
+            self._counts[op.action] += 1
+            self._latency[op.action].append(done - op.queued_at)
+            if done - started > 1.0:
+                logger.info(f"[Input] {op.action} took {done - started:.2f}s")
+            for loop, fut in op.waiters:
+                loop.call_soon_threadsafe(_settle, fut, result, error)
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        actions = {}
+        for name, samples in self._latency.items():
+            ordered = sorted(samples)
+            actions[name] = {
+                "count": self._counts[name],
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return {"queue_depth": self.queue_depth(), "max_depth": self.max_depth,
+                "coalesced": self.coalesced, "actions": actions}
+
+
+def _unavailable(error: BaseException) -> RuntimeError:
+    return RuntimeError(f"keyboard/mouse control unavailable: {error!r}")
+
+
+def _settle(fut: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if fut.done():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+input_worker = InputWorker()
@@ -0,0 +1,147 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from hero_cache import cache_path
+from hero_input import input_worker
+from hero_ocr import ocr_pool
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+LOAD_DIR = os.getenv("HERO_LOAD_DIR") or cache_path("load")
+REPORT_INTERVAL = float(os.getenv("HERO_LOAD_REPORT_INTERVAL", "1"))
+# Queued input actions at which a job process counts as fully saturated
+INPUT_BACKLOG_LIMIT = int(os.getenv("HERO_INPUT_BACKLOG_LIMIT", "20"))
+LOAD_THRESHOLD = float(os.getenv("HERO_LOAD_THRESHOLD", "0.75"))
+_STALE_AFTER = REPORT_INTERVAL * 5
+
+if psutil:
+    psutil.cpu_percent(interval=None)  # the first call only sets the reference point
+
+
+def snapshot() -> Dict[str, float]:
+    """
+    Saturation counters of this process: OCR pool queue/busy workers and input worker backlog.
+    """
+    ocr = ocr_pool.stats()
+    return {
+        "pid": os.getpid(),
+        "ocr_queue": ocr["queue_depth"],
+        "ocr_busy": ocr["busy"],
+        "ocr_capacity": ocr_pool.workers + ocr_pool.max_queue,
+        "input_backlog": input_worker.queue_depth(),
+        "updated": time.time(),
+    }
+
+
+def saturation(reports: List[Dict[str, float]]) -> float:
+    """
+    Combined saturation of job processes in [0, 1]: OCR work in flight over the OCR capacity of
+    all of them, and input backlog over their combined limit. One busy session among idle ones
+    only counts for its share.
+    """
+    if not reports:
+        return 0.0
+    ocr = sum(r["ocr_queue"] + r["ocr_busy"] for r in reports) / max(1, sum(r["ocr_capacity"] for r in reports))
+    backlog = sum(r["input_backlog"] for r in reports) / max(1, INPUT_BACKLOG_LIMIT * len(reports))
+    return min(1.0, max(ocr, backlog))
+
+
+class LoadPublisher:
+    """
+    Job processes run their tools out of sight of the worker's main process, so each one
+    writes its counters to LOAD_DIR/<pid>.json every REPORT_INTERVAL seconds for load() to read.
+    """
+
+    def __init__(self, directory: str = LOAD_DIR, interval: float = REPORT_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.path = ""
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Resolved here, not in __init__: a forked job process must not reuse its parent's file
+        self.path = os.path.join(self.directory, f"{os.getpid()}.json")
+        self._thread = threading.Thread(target=self._run, name="hero-load", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(snapshot(), f)
+                os.replace(tmp, self.path)  # readers never see a half-written file
+            except OSError as e:
+                logger.debug(f"[Load] Could not publish load: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if not self.path:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+publisher = LoadPublisher()
+
+
+def read_reports(directory: str = LOAD_DIR) -> List[Dict[str, float]]:
+    """
+    Current reports of live job processes; files of exited or silent processes are removed.
+    """
+    reports = []
+    now = time.time()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return reports
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        alive = psutil.pid_exists(report["pid"]) if psutil else True
+        if not alive or now - report["updated"] > _STALE_AFTER:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        reports.append(report)
+    return reports
+
+
+def load() -> float:
+    """
+    Worker load for the LiveKit dispatcher in [0, 1]: the higher of host CPU use and the
+    combined saturation of the job processes. Jobs stop being assigned once it passes the load
+    threshold.
+    """
+    cpu = psutil.cpu_percent(interval=None) / 100 if psutil else 0.0
+    jobs = saturation(read_reports())
+    value = round(max(cpu, jobs), 3)
+    if value >= LOAD_THRESHOLD:
+        logger.info(f"[Load] Worker saturated: load={value} (cpu={cpu:.2f}, jobs={jobs:.2f})")
+    return value
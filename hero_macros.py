@@ -0,0 +1,229 @@
+import asyncio
+import functools
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from hero_screen_wait import wait_for_screen_state
+
+logger = logging.getLogger(__name__)
+
+READY_TIMEOUT = float(os.getenv("HERO_MACRO_READY_TIMEOUT", "8"))
+_POLL = 0.1
+
+# How to recognise an app once launched: (window title fragment, process name fragment)
+APP_SIGNATURES = {
+    "notepad": ("notepad", "notepad"),
+    "calculator": ("calculator", "calc"),
+    "cmd": ("command prompt", "cmd"),
+    "chrome": ("chrome", "chrome"),
+    "spotify": ("spotify", "spotify"),
+}
+
+
+@dataclass(frozen=True)
+class Step:
+    action: str                 # key into the actions mapping given to run_plan()
+    args: Tuple = ()
+    ready: Optional[str] = None  # readiness condition checked after the action
+    ready_arg: str = ""
+    after: Tuple[int, ...] = ()  # indices of steps that must finish first
+
+
+@dataclass(frozen=True)
+class Plan:
+    template: str
+    steps: Tuple[Step, ...]
+
+
+@dataclass
+class StepTiming:
+    action: str
+    seconds: float
+    ready: str = ""
+
+
+@dataclass
+class MacroTemplate:
+    name: str
+    pattern: re.Pattern
+    build: Callable[..., List[Step]]
+    examples: List[str] = field(default_factory=list)
+
+
+class MacroRegistry:
+    """
+    Parameterized macro templates. A command is matched against the templates once and
+    the resulting Plan is cached, so repeated commands skip parsing entirely.
+    """
+
+    def __init__(self):
+        self.templates: List[MacroTemplate] = []
+
+    def template(self, pattern: str, *examples: str):
+        def deco(build):
+            self.templates.append(MacroTemplate(build.__name__, re.compile(pattern, re.IGNORECASE), build, list(examples)))
+            self.compile.cache_clear()
+            return build
+        return deco
+
+    @functools.lru_cache(maxsize=256)
+    def compile(self, command: str) -> Optional[Plan]:
+        text = " ".join(command.strip().rstrip(".!").split())
+        for tpl in self.templates:
+            m = tpl.pattern.fullmatch(text)
+            if m:
+                params = {k: v.strip() for k, v in m.groupdict().items() if v}
+                return Plan(tpl.name, tuple(tpl.build(**params)))
+        return None
+
+
+macros = MacroRegistry()
+
+
+# ========================= TEMPLATES ==========================
+
+def _open(app: str, after: Tuple[int, ...] = ()) -> Step:
+    return Step("open_app", (app.lower(),), ready="app", ready_arg=app.lower(), after=after)
+
+
+@macros.template(r"open (?P<app>[\w ]+?) and (?:write|type) (?P<text>.+)",
+                 "open notepad and write hello world", "open cmd and type ipconfig")
+def open_and_type(app: str, text: str) -> List[Step]:
+    return [_open(app), Step("type_text", (text,), after=(0,))]
+
+
+@macros.template(r"open (?P<app>[\w ]+?) and run (?P<text>.+)", "open cmd and run ipconfig")
+def open_and_run(app: str, text: str) -> List[Step]:
+    return [_open(app), Step("type_text", (text,), after=(0,)), Step("press_key", ("enter",), after=(1,))]
+
+
+@macros.template(r"open (?P<app>chrome|browser) and search(?: for)? (?P<query>.+)", "open chrome and search AI news")
+def browser_search(app: str, query: str) -> List[Step]:
+    return [
+        Step("open_app", ("chrome",), ready="app", ready_arg="chrome"),
+        Step("type_text", (query,), after=(0,)),
+        Step("press_key", ("enter",), after=(1,), ready="stable"),
+    ]
+
+
+@macros.template(r"open (?P<apps>[\w ]+?(?:,| and ) ?[\w ,]+)", "open notepad and calculator")
+def open_many(apps: str) -> List[Step]:
+    # No dependencies between them, so the apps launch concurrently
+    names = [a.strip() for a in re.split(r",| and ", apps) if a.strip()]
+    return [_open(name) for name in names]
+
+
+# ========================= READINESS ==========================
+
+def _window_titles() -> List[str]:
+    try:
+        if os.name == "nt":
+            import pygetwindow
+            return [t for t in pygetwindow.getAllTitles() if t]
+        if shutil.which("wmctrl"):
+            out = subprocess.run(["wmctrl", "-l"], capture_output=True, text=True, timeout=1).stdout
+            return [line.split(None, 3)[-1] for line in out.splitlines() if line.strip()]
+    except Exception as e:
+        logger.debug(f"[Macro] Window listing failed: {e}")
+    return []
+
+
+def _process_names() -> List[str]:
+    try:
+        import psutil
+        return [(p.info.get("name") or "").lower() for p in psutil.process_iter(["name"])]
+    except Exception:
+        return []
+
+
+def _can_list_windows() -> bool:
+    return os.name == "nt" or bool(shutil.which("wmctrl"))
+
+
+async def _poll(check: Callable[[], bool], timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if await asyncio.to_thread(check):
+            return True
+        await asyncio.sleep(_POLL)
+    return False
+
+
+async def wait_ready(kind: str, arg: str = "", timeout: float = READY_TIMEOUT) -> str:
+    """
+    Waits for a readiness condition and returns how it was satisfied:
+      "app":     a window whose title contains the app name (falls back to a running process,
+                 then to the screen going stable when neither can be observed),
+      "window":  a window title containing `arg`,
+      "process": a process whose name contains `arg`,
+      "stable":  the screen stops changing.
+    """
+    title, proc = APP_SIGNATURES.get(arg, (arg, arg))
+    if kind == "app":
+        if _can_list_windows():
+            kind, arg = "window", title
+        elif _process_names():
+            kind, arg = "process", proc
+        else:
+            kind = "stable"
+
+    if kind == "window":
+        ok = await _poll(lambda: any(arg in t.lower() for t in _window_titles()), timeout)
+    elif kind == "process":
+        ok = await _poll(lambda: any(arg in n for n in _process_names()), timeout)
+    else:
+        result = await wait_for_screen_state("stable", timeout=timeout, stable_for=0.5)
+        ok = result.met
+    if not ok:
+        logger.warning(f"[Macro] Readiness '{kind}:{arg}' not reached within {timeout}s, continuing")
+    return f"{kind}{'' if ok else ' (timeout)'}"
+
+
+# ========================= EXECUTION ==========================
+
+Actions = Dict[str, Callable[..., Awaitable[str]]]
+
+
+async def run_plan(plan: Plan, actions: Actions) -> List[StepTiming]:
+    """
+    Runs each step once the steps it depends on are done; independent steps run concurrently.
+    Actions signal failure by raising; the first failure cancels the remaining steps and is
+    re-raised as RuntimeError.
+    """
+    timings: List[Optional[StepTiming]] = [None] * len(plan.steps)
+    done: Dict[int, asyncio.Event] = {i: asyncio.Event() for i in range(len(plan.steps))}
+
+    async def run_step(i: int, step: Step):
+        for dep in step.after:
+            await done[dep].wait()
+        started = time.perf_counter()
+        try:
+            await actions[step.action](*step.args)
+            # A failing readiness probe (X error, psutil missing) fails the step like its action
+            ready = await wait_ready(step.ready, step.ready_arg) if step.ready else ""
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"{step.action}: {e}") from e
+        timings[i] = StepTiming(step.action, time.perf_counter() - started, ready)
+        done[i].set()
+
+    tasks = [asyncio.ensure_future(run_step(i, s)) for i, s in enumerate(plan.steps)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Steps waiting on a failed dependency would otherwise wait forever
+        for task in tasks:
+            task.cancel()
+        raise
+    return [t for t in timings if t]
+
+
+def format_timings(timings: List[StepTiming]) -> str:
+    return ", ".join(f"{t.action} {t.seconds:.2f}s" + (f" [{t.ready}]" if t.ready else "") for t in timings)
@@ -0,0 +1,313 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from hero_tools import ToolCall
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.getenv("HERO_METRICS_PORT", "0"))  # 0 = no endpoint
+METRICS_DIR = os.getenv("HERO_METRICS_DIR", "")
+# A single on-loop step longer than this is reported as a stall
+STALL_THRESHOLD = float(os.getenv("HERO_STALL_MS", "100")) / 1000
+LAG_INTERVAL = 0.25
+_PORT_ATTEMPTS = 32
+
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self) -> "Histogram":
+        h = Histogram(self.buckets)
+        h.counts, h.sum, h.count = list(self.counts), self.sum, self.count
+        return h
+
+    def minus(self, earlier: "Histogram") -> "Histogram":
+        """Observations made since `earlier`, a copy of this histogram taken before."""
+        h = Histogram(self.buckets)
+        h.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+        h.sum, h.count = self.sum - earlier.sum, self.count - earlier.count
+        return h
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound below which `q` of the observations fall."""
+        if not self.count:
+            return 0.0
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= q * self.count:
+                return bound
+        return float("inf")
+
+
+# name -> (help, buckets)
+HISTOGRAMS = {
+    "hero_tool_duration_seconds": ("Tool wall time", TIME_BUCKETS),
+    "hero_tool_loop_blocked_seconds": ("Time the tool held the event loop", TIME_BUCKETS),
+    "hero_tool_cpu_seconds": ("CPU time the tool used on the event loop thread", TIME_BUCKETS),
+    "hero_tool_output_bytes": ("Size of the tool output returned to the model", SIZE_BUCKETS),
+    "hero_event_loop_lag_seconds": ("Event loop scheduling lag", TIME_BUCKETS),
+}
+
+
+class ToolMetrics:
+    """
+    In-memory per-tool histograms and counters, readable from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[Tuple[str, str], Histogram] = {}
+        self.calls: Dict[Tuple[str, str], int] = defaultdict(int)  # (tool, outcome)
+        self.stalls: Dict[str, int] = defaultdict(int)
+        self.active: Counter = Counter()  # tools currently running
+        self.started = time.time()
+
+    def observe(self, metric: str, tool: str, value: float) -> None:
+        with self._lock:
+            hist = self._hist.get((metric, tool))
+            if hist is None:
+                hist = self._hist[(metric, tool)] = Histogram(HISTOGRAMS[metric][1])
+            hist.observe(value)
+
+    def count(self, tool: str, outcome: str) -> None:
+        with self._lock:
+            self.calls[(tool, outcome)] += 1
+
+    def stall(self, tool: str, seconds: float) -> None:
+        with self._lock:
+            self.stalls[tool] += 1
+        logger.warning(f"[Metrics] Event loop blocked {seconds * 1000:.0f}ms by {tool}")
+
+    def prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for metric, (help_text, _) in HISTOGRAMS.items():
+                series = [(tool, h) for (m, tool), h in sorted(self._hist.items()) if m == metric]
+                if not series:
+                    continue
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for tool, h in series:
+                    label = f'tool="{tool}"' if tool else ""
+                    sep = "," if label else ""
+                    cumulative = 0
+                    for bound, n in zip(h.buckets + (float("inf"),), h.counts):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{metric}_bucket{{{label}{sep}le="{le}"}} {cumulative}')
+                    lines.append(f"{metric}_sum{{{label}}} {h.sum}")
+                    lines.append(f"{metric}_count{{{label}}} {h.count}")
+            lines += ["# HELP hero_tool_calls_total Tool calls by outcome (ok or exception class)",
+                      "# TYPE hero_tool_calls_total counter"]
+            lines += [f'hero_tool_calls_total{{tool="{t}",outcome="{o}"}} {n}' for (t, o), n in sorted(self.calls.items())]
+            lines += ["# HELP hero_event_loop_stalls_total Event loop stalls by the tool that caused them",
+                      "# TYPE hero_event_loop_stalls_total counter"]
+            lines += [f'hero_event_loop_stalls_total{{tool="{t}"}} {n}' for t, n in sorted(self.stalls.items())]
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Copy of the counters now; summary(since=...) then covers only what happened after it.
+        The metrics live as long as the (prewarmed, reused) process, so a job takes one at start.
+        """
+        with self._lock:
+            return {"at": time.time(), "hist": {k: h.copy() for k, h in self._hist.items()},
+                    "calls": dict(self.calls), "stalls": dict(self.stalls)}
+
+    def summary(self, since: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        tools: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"calls": 0, "errors": {}})
+        with self._lock:
+            hist = {k: h.copy() for k, h in self._hist.items()}
+            calls, stalls = dict(self.calls), dict(self.stalls)
+        if since is not None:
+            hist = {k: h.minus(since["hist"][k]) if k in since["hist"] else h for k, h in hist.items()}
+            hist = {k: h for k, h in hist.items() if h.count}
+            calls = {k: n - since["calls"].get(k, 0) for k, n in calls.items() if n > since["calls"].get(k, 0)}
+            stalls = {k: n - since["stalls"].get(k, 0) for k, n in stalls.items() if n > since["stalls"].get(k, 0)}
+        for (tool, outcome), n in calls.items():
+            tools[tool]["calls"] += n
+            if outcome != "ok":
+                tools[tool]["errors"][outcome] = n
+        for (metric, tool), h in hist.items():
+            if not tool:
+                continue
+            key = metric.replace("hero_tool_", "")
+            tools[tool][key] = {"avg": round(h.sum / h.count, 4), "p50": h.quantile(0.5),
+                                "p95": h.quantile(0.95), "max_bucket": h.quantile(1.0)}
+        for tool, n in stalls.items():
+            tools[tool]["stalls"] = n
+        lag = hist.get(("hero_event_loop_lag_seconds", ""))
+        return {
+            "since": since["at"] if since is not None else self.started,
+            "tools": dict(tools),
+            "loop_lag": {"p95": lag.quantile(0.95), "max_bucket": lag.quantile(1.0)} if lag else {},
+        }
+
+
+metrics = ToolMetrics()
+
+
+class _Stepper:
+    """
+    Drives a coroutine one step at a time, timing each step: the time a step takes is
+    time the event loop could do nothing else.
+    """
+
+    def __init__(self, coro, tool: str):
+        self.coro = coro
+        self.tool = tool
+        self.blocked = 0.0
+        self.cpu = 0.0
+
+    def _account(self, wall: float, cpu: float) -> None:
+        self.blocked += wall
+        self.cpu += cpu
+        if wall > STALL_THRESHOLD:
+            metrics.stall(self.tool, wall)
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            started, cpu = time.perf_counter(), time.thread_time()
+            try:
+                if error is not None:
+                    yielded = self.coro.throw(error)
+                else:
+                    yielded = self.coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._account(time.perf_counter() - started, time.thread_time() - cpu)
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:  # cancellation and errors thrown in by the task
+                value, error = None, e
+
+
+async def instrument(name: str, arguments: Dict[str, Any], call: ToolCall) -> Any:
+    """
+    Tool middleware: wall time, on-loop blocked time, on-loop CPU time, output size and outcome.
+    Work a tool pushes to threads (asyncio.to_thread, the OCR pool, the input worker) only shows
+    up in its wall time.
+    """
+    stepper = _Stepper(call(), name)
+    metrics.active[name] += 1
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        result = await stepper
+    except BaseException as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        metrics.active[name] -= 1
+        metrics.observe("hero_tool_duration_seconds", name, time.perf_counter() - started)
+        metrics.observe("hero_tool_loop_blocked_seconds", name, stepper.blocked)
+        metrics.observe("hero_tool_cpu_seconds", name, stepper.cpu)
+        metrics.count(name, outcome)
+    metrics.observe("hero_tool_output_bytes", name, len(str(result).encode()))
+    return result
+
+
+async def watch_loop(interval: float = LAG_INTERVAL) -> None:
+    """
+    Measures event loop lag; a stall not caught inside a tool step is reported with the tools
+    that were running at the time.
+    """
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - expected)
+        metrics.observe("hero_event_loop_lag_seconds", "", lag)
+        if lag > STALL_THRESHOLD:
+            running = ", ".join(sorted(t for t, n in metrics.active.items() if n > 0)) or "no tool running"
+            logger.warning(f"[Metrics] Event loop lagged {lag * 1000:.0f}ms ({running})")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, kind = json.dumps(metrics.summary()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, kind = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def serve(port: int = METRICS_PORT) -> Optional[int]:
+    """
+    Serves /metrics (Prometheus text) and /metrics.json on 127.0.0.1 from a background thread,
+    so scrapes still work while the event loop is stalled. Each job process takes the next
+    free port from `port`. Returns the bound port, or None when disabled.
+    """
+    global _server
+    if _server is not None:
+        return _server.server_address[1]
+    if not port:
+        return None
+    for candidate in range(port, port + _PORT_ATTEMPTS):
+        try:
+            _server = ThreadingHTTPServer(("127.0.0.1", candidate), _Handler)
+            break
+        except OSError:
+            continue
+    else:
+        logger.warning(f"[Metrics] No free port in {port}-{port + _PORT_ATTEMPTS - 1}, endpoint disabled")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="hero-metrics", daemon=True).start()
+    logger.info(f"[Metrics] Serving http://127.0.0.1:{candidate}/metrics")
+    return candidate
+
+
+def write_summary(session: str, since: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Logs the JSON summary at the end of a session and saves it under HERO_METRICS_DIR if set.
+    `since` is the metrics.snapshot() taken when the session started.
+    """
+    summary = metrics.summary(since)
+    text = json.dumps(summary)
+    logger.info(f"[Metrics] Session {session}: {text}")
+    if METRICS_DIR:
+        with contextlib.suppress(OSError):
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            with open(os.path.join(METRICS_DIR, f"{session}.json"), "w") as f:
+                json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OCR_LANG = os.getenv("HERO_OCR_LANG", "eng")
+OCR_MAX_QUEUE = int(os.getenv("HERO_OCR_MAX_QUEUE", "8"))
+OCR_TIMEOUT = float(os.getenv("HERO_OCR_TIMEOUT", "30"))  # queue wait plus recognition, per call
+_WINDOWS_TESSERACT = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+
+def _default_workers() -> int:
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    # Leave a core for the event loop and audio pipeline
+    return max(1, min(4, cores - 1))
+
+
+OCR_WORKERS = int(os.getenv("HERO_OCR_WORKERS", "0")) or _default_workers()
+
+
+def tesseract_cmd() -> Optional[str]:
+    """
+    Tesseract binary from TESSERACT_CMD, then PATH, then the default Windows install location.
+    """
+    cmd = os.getenv("TESSERACT_CMD") or shutil.which("tesseract")
+    if not cmd and os.name == "nt" and os.path.exists(_WINDOWS_TESSERACT):
+        cmd = _WINDOWS_TESSERACT
+    return cmd
+
+
+@dataclass
+class OcrWord:
+    text: str
+    conf: float
+    box: Tuple[int, int, int, int]  # left, top, right, bottom in image pixels
+    line: tuple  # words sharing this key sit on the same text line
+
+
+class TesserocrEngine:
+    """
+    Long-lived tesseract instance through the C API (tesserocr): language models are
+    loaded once and the GIL is released while recognizing.
+    """
+
+    def __init__(self, lang: str = OCR_LANG):
+        from tesserocr import PyTessBaseAPI
+        self.api = PyTessBaseAPI(lang=lang)
+
+    def image_to_string(self, image) -> str:
+        self.api.SetImage(image)
+        return self.api.GetUTF8Text()
+
+    def image_to_data(self, image) -> List[OcrWord]:
+        from tesserocr import RIL, iterate_level
+        self.api.SetImage(image)
+        self.api.Recognize()
+        words, line = [], 0
+        for item in iterate_level(self.api.GetIterator(), RIL.WORD):
+            if item.IsAtBeginningOf(RIL.TEXTLINE):
+                line += 1
+            text = item.GetUTF8Text(RIL.WORD)
+            box = item.BoundingBox(RIL.WORD)
+            if text and text.strip() and box:
+                words.append(OcrWord(text.strip(), item.Confidence(RIL.WORD), tuple(box), (line,)))
+        return words
+
+    def close(self) -> None:
+        self.api.End()
+
+
+class PytesseractEngine:
+    """
+    Fallback when tesserocr is not installed: one tesseract process per call.
+    """
+
+    def __init__(self, lang: str = OCR_LANG):
+        import pytesseract
+        cmd = tesseract_cmd()
+        if cmd:
+            pytesseract.pytesseract.tesseract_cmd = cmd
+        self.pytesseract = pytesseract
+        self.lang = lang
+
+    def image_to_string(self, image) -> str:
+        return self.pytesseract.image_to_string(image, lang=self.lang)
+
+    def image_to_data(self, image) -> List[OcrWord]:
+        data = self.pytesseract.image_to_data(image, lang=self.lang, output_type=self.pytesseract.Output.DICT)
+        words = []
+        for i, text in enumerate(data["text"]):
+            if not text or not text.strip():
+                continue
+            left, top = data["left"][i], data["top"][i]
+            box = (left, top, left + data["width"][i], top + data["height"][i])
+            line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            words.append(OcrWord(text.strip(), float(data["conf"][i]), box, line))
+        return words
+
+    def close(self) -> None:
+        pass
+
+
+def make_engine():
+    try:
+        return TesserocrEngine()
+    except ImportError:
+        return PytesseractEngine()
+    except RuntimeError as e:
+        # tesserocr is installed but could not load its language data
+        logger.warning(f"[OCR] tesserocr unavailable ({e}), falling back to pytesseract")
+        return PytesseractEngine()
+
+
+class OcrPool:
+    """
+    Fixed set of worker threads, each owning a warm OCR engine. Coroutines submit jobs with
+    `await pool.run(...)`; once `max_queue` jobs are waiting, further submitters wait too
+    (backpressure) instead of piling work up.
+    """
+
+    def __init__(self, workers: int = OCR_WORKERS, max_queue: int = OCR_MAX_QUEUE, engine_factory=make_engine,
+                 timeout: float = OCR_TIMEOUT):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.engine_factory = engine_factory
+        self.timeout = timeout
+        self.error: Optional[BaseException] = None  # set once no worker could create an engine
+        self._failed = 0
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._threads = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._busy = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    def start(self) -> None:
+        """
+        Spawns the worker threads (engines are created inside them). Safe to call repeatedly.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"hero-ocr-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        logger.info(f"[OCR] Pool started with {self.workers} worker(s)")
+
+    def _worker(self) -> None:
+        try:
+            engine = self.engine_factory()
+        except Exception as e:
+            logger.exception("[OCR] Could not create an OCR engine")
+            with self._lock:
+                self._failed += 1
+                last = self._failed == self.workers
+                if last:
+                    self.error = e
+            if last:
+                self._fail_jobs(e)
+            return
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                engine.close()
+                return
+            method, args, fut, queued_at = job
+            if not fut.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            with self._lock:
+                self._busy += 1
+            try:
+                fut.set_result(getattr(engine, method)(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._busy -= 1
+                    self.completed += 1
+                    self.total_wait += started - queued_at
+                    self.total_run += finished - started
+
+    def _fail_jobs(self, error: BaseException) -> None:
+        # No worker has an engine: what is queued now or later fails instead of waiting forever
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            fut = job[2]
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(RuntimeError(f"OCR engine unavailable: {error}"))
+
+    async def run(self, method: str, *args):
+        """
+        Runs `engine.<method>(*args)` on a pool thread and returns its result. Raises
+        RuntimeError when no OCR engine could be created and asyncio.TimeoutError when the
+        job doesn't finish within `timeout` seconds.
+        """
+        self.start()
+        if self.error is not None:
+            raise RuntimeError(f"OCR engine unavailable: {self.error}")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        async with self._slots:
+            fut: Future = Future()
+            self._jobs.put((method, args, fut, time.perf_counter()))
+            # On timeout the job is cancelled; a worker skips it if it hasn't started yet
+            return await asyncio.wait_for(asyncio.wrap_future(fut), self.timeout)
+
+    async def image_to_string(self, image) -> str:
+        return await self.run("image_to_string", image)
+
+    async def image_to_data(self, image) -> List[OcrWord]:
+        return await self.run("image_to_data", image)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._jobs.qsize()
+
+    def stats(self) -> dict:
+        done = self.completed or 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "busy": self._busy,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait / done * 1000, 1),
+            "avg_run_ms": round(self.total_run / done * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+
+
+ocr_pool = OcrPool()
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from hero_ocr import OcrPool, ocr_pool
+
+logger = logging.getLogger(__name__)
+
+TILE_HEIGHT = int(os.getenv("HERO_OCR_TILE_HEIGHT", "160"))
+# Bands are split into up to this many columns, wherever a blank vertical gap allows it
+TILE_COLS = int(os.getenv("HERO_OCR_TILE_COLS", "4"))
+TILE_CACHE_SIZE = int(os.getenv("HERO_OCR_TILE_CACHE_SIZE", "4096"))
+
+# Cuts are moved to the nearest blank pixel row within this distance so text lines aren't split
+_SNAP = 24
+_BLANK_RANGE = 12
+# A column cut needs a blank gap at least this wide (wider than letter spacing) across the
+# whole band, so no word is split; bands without one stay whole
+_MIN_GAP = 16
+
+Box = Tuple[int, int, int, int]
+
+
+def _gray(image) -> np.ndarray:
+    return np.asarray(image.convert("L") if image.mode != "L" else image)
+
+
+def _blank(pixels: np.ndarray, axis: int) -> np.ndarray:
+    """Per row (axis=1) or column (axis=0): whether it is a flat run of one colour."""
+    return (pixels.max(axis=axis).astype(np.int16) - pixels.min(axis=axis)) < _BLANK_RANGE
+
+
+def _snap(blank: np.ndarray, target: int, lo: int, hi: int) -> int:
+    for offset in range(_SNAP + 1):
+        for y in (target - offset, target + offset):
+            if lo < y < hi and blank[y]:
+                return y
+    return target
+
+
+def band_cuts(gray, tile_height: int = TILE_HEIGHT) -> List[int]:
+    """
+    Row positions that split the image into bands of ~tile_height, snapped to blank rows.
+    """
+    pixels = gray if isinstance(gray, np.ndarray) else _gray(gray)
+    height = pixels.shape[0]
+    blank = _blank(pixels, axis=1)
+    cuts = [0]
+    while cuts[-1] + tile_height < height:
+        cuts.append(_snap(blank, cuts[-1] + tile_height, cuts[-1], height))
+    cuts.append(height)
+    return cuts
+
+
+def column_cuts(band: np.ndarray, cols: int = TILE_COLS) -> List[int]:
+    """
+    Column positions splitting a band into up to `cols` parts, each at the middle of a blank
+    vertical gap near the even split; a target with no gap nearby is dropped.
+    """
+    width = band.shape[1]
+    cuts = [0]
+    if cols > 1:
+        blank = _blank(band, axis=0)
+        # Columns that sit in the middle of a blank run of at least _MIN_GAP pixels
+        half = _MIN_GAP // 2
+        run = np.convolve(blank.astype(np.int32), np.ones(_MIN_GAP, dtype=np.int32), mode="same")
+        usable = run >= _MIN_GAP
+        usable[:half] = usable[width - half:] = False
+        for c in range(1, cols):
+            target = round(width * c / cols)
+            cut = _snap(usable, target, cuts[-1], width)
+            if usable[cut] and cut > cuts[-1]:
+                cuts.append(cut)
+    cuts.append(width)
+    return cuts
+
+
+def split_tiles(image, tile_height: int = TILE_HEIGHT, cols: int = TILE_COLS) -> List[Box]:
+    """
+    Tile boxes in reading order (top-to-bottom bands, left-to-right within a band).
+    """
+    return _split(_gray(image), tile_height, cols)
+
+
+def _split(pixels: np.ndarray, tile_height: int, cols: int) -> List[Box]:
+    boxes = []
+    rows = band_cuts(pixels, tile_height)
+    for top, bottom in zip(rows, rows[1:]):
+        edges = column_cuts(pixels[top:bottom], cols)
+        boxes.extend((left, top, right, bottom) for left, right in zip(edges, edges[1:]))
+    return boxes
+
+
+class TileOcrCache:
+    """
+    Incremental OCR: the capture is split into tiles, each tile is hashed and only tiles
+    whose hash has not been seen before are sent to the OCR pool. Cached and fresh text is
+    stitched back in reading order. The cache is content-addressed, so unchanged tiles hit
+    regardless of which call or region produced them.
+    """
+
+    def __init__(self, pool: OcrPool = ocr_pool, tile_height: int = TILE_HEIGHT, cols: int = TILE_COLS,
+                 max_entries: int = TILE_CACHE_SIZE):
+        self.pool = pool
+        self.tile_height = tile_height
+        self.cols = cols
+        self.max_entries = max_entries
+        self._texts: "OrderedDict[bytes, str]" = OrderedDict()
+        self.tiles_seen = 0
+        self.tiles_ocred = 0
+
+    @staticmethod
+    def tile_hash(pixels: np.ndarray) -> bytes:
+        return hashlib.blake2b(np.ascontiguousarray(pixels).tobytes(), digest_size=16,
+                               person=str(pixels.shape).encode()[:16]).digest()
+
+    def _tiles(self, image) -> Tuple[List[Box], List[bytes]]:
+        # Tiling and hashing a full frame is tens of ms of CPU, kept off the event loop
+        pixels = _gray(image)
+        boxes = _split(pixels, self.tile_height, self.cols)
+        return boxes, [self.tile_hash(pixels[top:bottom, left:right]) for left, top, right, bottom in boxes]
+
+    async def read(self, image) -> str:
+        started = time.perf_counter()
+        boxes, hashes = await asyncio.to_thread(self._tiles, image)
+
+        missing: Dict[bytes, Box] = {}
+        for h, box in zip(hashes, boxes):
+            if h in self._texts:
+                self._texts.move_to_end(h)
+            elif h not in missing:
+                missing[h] = box
+
+        if missing:
+            tiles = await asyncio.to_thread(lambda: [image.crop(box) for box in missing.values()])
+            texts = await asyncio.gather(*(self.pool.image_to_string(t) for t in tiles))
+            for h, text in zip(missing, texts):
+                self._texts[h] = text.strip()
+            while len(self._texts) > self.max_entries:
+                self._texts.popitem(last=False)
+
+        self.tiles_seen += len(boxes)
+        self.tiles_ocred += len(missing)
+        logger.info(
+            f"[OCR Tiles] {len(missing)}/{len(boxes)} tiles re-read in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return "\n".join(t for t in (self._texts.get(h, "") for h in hashes) if t)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._texts),
+            "tiles_seen": self.tiles_seen,
+            "tiles_ocred": self.tiles_ocred,
+            "reuse_rate": round(1 - self.tiles_ocred / self.tiles_seen, 3) if self.tiles_seen else 0.0,
+        }
+
+
+tile_ocr = TileOcrCache()
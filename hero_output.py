@@ -0,0 +1,176 @@
+import itertools
+import logging
+import os
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List
+
+from livekit.agents import function_tool
+from hero_search_cache import STOPWORDS, tokenize
+from hero_tools import ToolCall
+
+logger = logging.getLogger(__name__)
+
+# Rough token estimate; good enough to keep outputs inside a budget without a tokenizer.
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = int(os.getenv("HERO_TOOL_TOKEN_BUDGET", "300"))
+TOOL_TOKEN_BUDGETS = {
+    "search_internet": 400,
+    "search_tool": 400,
+    "read_screen": 250,
+    "get_system_info": 250,
+    "list_folder_items": 300,
+    "find_file": 400,
+}
+_SIDE_STORE_SIZE = 64
+
+# Arguments whose text describes what the model is looking for
+_QUERY_ARGS = ("query", "text", "command", "path", "name_or_path", "region", "name")
+
+_side_store: "OrderedDict[str, List[str]]" = OrderedDict()
+_refs = itertools.count(1)
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_lines(text: str) -> List[str]:
+    """
+    Collapses whitespace, drops blank lines and repeated lines.
+    """
+    lines, seen = [], set()
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        key = line.lower()
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _fit(lines: List[str], budget_chars: int) -> List[str]:
+    kept, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > budget_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def compact(text: str, query: str = "", budget: int = DEFAULT_TOKEN_BUDGET):
+    """
+    Returns (compacted text, full line list or None when nothing was cut). The first line
+    (usually the tool's own header) is always kept; the rest are picked by relevance to
+    `query` and re-emitted in their original order.
+    """
+    lines = normalize_lines(text)
+    budget_chars = budget * CHARS_PER_TOKEN
+    if sum(len(l) + 1 for l in lines) <= budget_chars:
+        return "\n".join(lines), None
+
+    # The header is kept, but never at more than the whole budget
+    head, body = [lines[0][:budget_chars]], lines[1:]
+    terms = {t for t in tokenize(query) if t not in STOPWORDS}
+    if terms:
+        scored = sorted(
+            range(len(body)),
+            key=lambda i: (-len(terms.intersection(tokenize(body[i]))), i),
+        )
+        picked = set()
+        used = sum(len(l) + 1 for l in head)
+        for i in scored:
+            if used + len(body[i]) + 1 > budget_chars:
+                continue
+            picked.add(i)
+            used += len(body[i]) + 1
+        kept = head + [body[i] for i in sorted(picked)]
+    else:
+        kept = _fit(lines, budget_chars)
+
+    if not kept:
+        # One enormous line: hard-cut it
+        kept = [lines[0][:budget_chars]]
+    return "\n".join(kept), lines
+
+
+def _store(lines: List[str]) -> str:
+    ref = f"r{next(_refs)}"
+    _side_store[ref] = lines
+    if len(_side_store) > _SIDE_STORE_SIZE:
+        _side_store.popitem(last=False)
+    return ref
+
+
+async def budget_output(name: str, arguments: Dict[str, Any], call: ToolCall) -> Any:
+    """
+    Tool middleware: compacts string outputs to the tool's token budget and keeps the full
+    payload in the side store for more_output().
+    """
+    result = await call()
+    if not isinstance(result, str) or name == "more_output":
+        return result
+
+    budget = TOOL_TOKEN_BUDGETS.get(name, DEFAULT_TOKEN_BUDGET)
+    query = " ".join(str(arguments[a]) for a in _QUERY_ARGS if isinstance(arguments.get(a), str))
+    compacted, full = compact(result, query, budget)
+    if full is not None:
+        shown = set(compacted.splitlines())
+        omitted = sum(1 for line in full if line not in shown)
+        ref = _store(full)
+        compacted += f"\n[{omitted} more lines omitted; call more_output(ref='{ref}') to read them]"
+
+    stats = _stats[name]
+    stats["calls"] += 1
+    stats["bytes_in"] += len(result.encode())
+    stats["bytes_out"] += len(compacted.encode())
+    stats["tokens_in"] += estimate_tokens(result)
+    stats["tokens_out"] += estimate_tokens(compacted)
+    if len(compacted) < len(result):
+        logger.info(
+            f"[Output] {name}: {len(result)} -> {len(compacted)} chars "
+            f"(~{estimate_tokens(result)} -> {estimate_tokens(compacted)} tokens)"
+        )
+    return compacted
+
+
+def output_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Per-tool byte/token totals before and after compaction.
+    """
+    return {
+        name: dict(s, bytes_saved=s["bytes_in"] - s["bytes_out"], tokens_saved=s["tokens_in"] - s["tokens_out"])
+        for name, s in _stats.items()
+    }
+
+
+@function_tool()
+async def more_output(ref: str, page: int = 1) -> str:
+    """
+    Returns the full text of a tool output that was shortened, one page at a time.
+    `ref` is the id mentioned in the shortened output, page starts at 1.
+    """
+    lines = _side_store.get(ref)
+    if lines is None:
+        return f"No stored output for {ref} (it may have expired)."
+
+    budget_chars = DEFAULT_TOKEN_BUDGET * CHARS_PER_TOKEN
+    pages, current = [], []
+    used = 0
+    # Lines longer than a page are split over several pages rather than cut
+    chunks = (line[i:i + budget_chars] for line in lines for i in range(0, len(line), budget_chars))
+    for line in chunks:
+        if current and used + len(line) + 1 > budget_chars:
+            pages.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += len(line) + 1
+    if current:
+        pages.append(current)
+
+    if page < 1 or page > len(pages):
+        return f"Output {ref} has {len(pages)} page(s)."
+    footer = f"\n[page {page}/{len(pages)}]" if len(pages) > 1 else ""
+    return "\n".join(pages[page - 1]) + footer
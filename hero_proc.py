@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# ⚙️ SETTINGS (override through .env)
+# -------------------------------------------------
+PROC_CONCURRENCY = int(os.getenv("HERO_PROC_CONCURRENCY", "4"))
+PROC_TIMEOUT = float(os.getenv("HERO_PROC_TIMEOUT", "15"))
+PROC_MAX_OUTPUT = int(os.getenv("HERO_PROC_MAX_OUTPUT", str(64 * 1024)))
+
+_POSIX = os.name != "nt"
+_CHUNK = 16 * 1024
+
+Command = Union[str, List[str]]  # a string runs through the shell
+
+
+@dataclass
+class ProcResult:
+    command: str
+    returncode: Optional[int]  # None when the command could not be started or was killed
+    stdout: str
+    stderr: str
+    elapsed_ms: float
+    timed_out: bool = False
+    truncated: bool = False  # output went past max_output and was cut
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+_limits: "dict[asyncio.AbstractEventLoop, asyncio.Semaphore]" = {}
+
+
+def _limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _limits.get(loop)
+    if sem is None:
+        sem = _limits[loop] = asyncio.Semaphore(PROC_CONCURRENCY)
+    return sem
+
+
+def _label(cmd: Command) -> str:
+    return cmd if isinstance(cmd, str) else subprocess.list2cmdline(cmd)
+
+
+async def _spawn(cmd: Command, **kwargs) -> asyncio.subprocess.Process:
+    # Own process group on POSIX, so a timeout kills whatever the command started too
+    if _POSIX:
+        kwargs["start_new_session"] = True
+    if isinstance(cmd, str):
+        return await asyncio.create_subprocess_shell(cmd, **kwargs)
+    return await asyncio.create_subprocess_exec(*cmd, **kwargs)
+
+
+async def _drain(stream: asyncio.StreamReader, buf: bytearray, cap: int) -> bool:
+    """Reads the stream to EOF keeping the first `cap` bytes; returns whether any were dropped."""
+    dropped = False
+    while True:
+        chunk = await stream.read(_CHUNK)
+        if not chunk:
+            return dropped
+        room = cap - len(buf)
+        if room > 0:
+            buf += chunk[:room]
+        dropped = dropped or len(chunk) > room
+
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    try:
+        if _POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+async def run(cmd: Command, timeout: Optional[float] = None, max_output: Optional[int] = None) -> ProcResult:
+    """
+    Runs a command to completion without blocking the event loop, at most PROC_CONCURRENCY
+    at a time. stdout and stderr are read as they are produced, keeping the first
+    `max_output` bytes of each; a command still running after `timeout` seconds is killed
+    along with its children. Never raises for the command's own failures.
+    """
+    timeout = PROC_TIMEOUT if timeout is None else timeout
+    cap = PROC_MAX_OUTPUT if max_output is None else max_output
+    label = _label(cmd)
+    out, err = bytearray(), bytearray()
+    returncode, timed_out, truncated = None, False, False
+    async with _limit():
+        started = time.perf_counter()
+        try:
+            proc = await _spawn(cmd, stdin=asyncio.subprocess.DEVNULL,
+                                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        except OSError as e:
+            elapsed = (time.perf_counter() - started) * 1000
+            logger.warning(f"[proc] {label}: could not start ({e})")
+            return ProcResult(label, None, "", str(e), elapsed)
+
+        async def finish() -> Tuple[bool, int]:
+            dropped = await asyncio.gather(_drain(proc.stdout, out, cap), _drain(proc.stderr, err, cap))
+            # A command can close its output and keep running: the wait is under the deadline too
+            return any(dropped), await proc.wait()
+
+        try:
+            truncated, returncode = await asyncio.wait_for(finish(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            _kill(proc)
+            await proc.wait()
+        except asyncio.CancelledError:
+            _kill(proc)
+            raise
+        elapsed = (time.perf_counter() - started) * 1000
+
+    result = ProcResult(label, returncode, out.decode(errors="replace"), err.decode(errors="replace"),
+                        elapsed, timed_out, truncated)
+    logger.info(f"[proc] {label}: " + ("killed after timeout" if timed_out else f"rc={returncode}")
+                + f" in {elapsed:.0f}ms, {len(out)}B out, {len(err)}B err" + (" (truncated)" if truncated else ""))
+    if result.stdout:
+        logger.debug(f"[proc] stdout: {result.stdout.strip()}")
+    if result.stderr:
+        logger.debug(f"[proc] stderr: {result.stderr.strip()}")
+    return result
+
+
+async def launch(cmd: Command) -> int:
+    """
+    Starts a command (typically an app) and returns its pid straight away; its output is
+    discarded. Raises OSError if it cannot be started.
+    """
+    started = time.perf_counter()
+    # A plain Popen rather than an asyncio process: nothing stays tied to this job's event
+    # loop, and the subprocess module reaps the app once it exits (on a later spawn)
+    proc = await asyncio.to_thread(
+        subprocess.Popen, cmd, shell=isinstance(cmd, str), stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=_POSIX)
+    logger.info(f"[proc] Launched {_label(cmd)} (pid {proc.pid}) in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return proc.pid
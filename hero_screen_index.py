@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from hero_capture import Frame, get_pipeline
+from hero_ocr import OcrPool, ocr_pool
+
+logger = logging.getLogger(__name__)
+
+MATCH_THRESHOLD = float(os.getenv("HERO_FIND_TEXT_THRESHOLD", "0.6"))
+MIN_WORD_CONF = float(os.getenv("HERO_FIND_TEXT_MIN_CONF", "30"))
+_CACHED_REGIONS = 8
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass
+class TextItem:
+    text: str
+    box: Box  # screen coordinates: left, top, right, bottom
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return (self.box[0] + self.box[2]) // 2, (self.box[1] + self.box[3]) // 2
+
+
+@dataclass
+class Match:
+    item: TextItem
+    score: float
+
+
+def _union(boxes: List[Box]) -> Box:
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+class ScreenIndex:
+    """
+    Words of one OCR pass in screen coordinates, grouped into lines in reading order so a
+    label is matched against runs of neighbouring words.
+    """
+
+    def __init__(self, words: List[TextItem], lines: List[List[TextItem]]):
+        self.words = words
+        self.lines = lines
+
+    @classmethod
+    def from_ocr(cls, frame: Frame, ocr_words) -> "ScreenIndex":
+        by_line: Dict[tuple, List[TextItem]] = defaultdict(list)
+        words = []
+        for w in ocr_words:
+            if w.conf >= 0 and w.conf < MIN_WORD_CONF:
+                continue
+            x1, y1 = frame.to_screen(w.box[0], w.box[1])
+            x2, y2 = frame.to_screen(w.box[2], w.box[3])
+            item = TextItem(w.text, (x1, y1, x2, y2))
+            words.append(item)
+            by_line[w.line].append(item)
+        lines = [sorted(items, key=lambda i: i.box[0]) for items in by_line.values()]
+        lines.sort(key=lambda line: (line[0].box[1], line[0].box[0]))
+        return cls(words, lines)
+
+    def find(self, label: str, limit: int = 3) -> List[Match]:
+        """
+        Fuzzy-matches `label` against every run of consecutive words on a line whose length is
+        close to the label's, so "Save as" finds the "Save As..." menu entry.
+        """
+        target = " ".join(label.lower().split())
+        n = max(1, len(target.split()))
+        matches = []
+        for line in self.lines:
+            for size in range(max(1, n - 1), n + 2):
+                for start in range(0, max(1, len(line) - size + 1)):
+                    span = line[start:start + size]
+                    if not span:
+                        continue
+                    text = " ".join(w.text for w in span)
+                    score = SequenceMatcher(None, target, text.lower().strip(".:…")).ratio()
+                    if score >= MATCH_THRESHOLD:
+                        matches.append(Match(TextItem(text, _union([w.box for w in span])), score))
+        matches.sort(key=lambda m: (-m.score, m.item.box[1], m.item.box[0]))
+        seen, best = set(), []
+        for m in matches:
+            if m.item.box in seen:
+                continue
+            seen.add(m.item.box)
+            best.append(m)
+            if len(best) >= limit:
+                break
+        return best
+
+
+class ScreenIndexCache:
+    """
+    Keeps the last index per region and reuses it while the captured frame hashes the same.
+    """
+
+    def __init__(self, pool: OcrPool = ocr_pool):
+        self.pool = pool
+        self._by_region: Dict[str, Tuple[bytes, ScreenIndex]] = {}
+        self.hits = 0
+        self.builds = 0
+
+    @staticmethod
+    def _capture(region: str) -> Tuple[Frame, bytes]:
+        # Blocking: hashing a 4K frame takes milliseconds, so it happens in the capture thread
+        frame = get_pipeline().capture(region)
+        return frame, hashlib.blake2b(frame.pixels.tobytes(), digest_size=16).digest()
+
+    async def get(self, region: str = "full") -> ScreenIndex:
+        frame, digest = await asyncio.to_thread(self._capture, region)
+        cached = self._by_region.get(region)
+        if cached and cached[0] == digest:
+            self.hits += 1
+            return cached[1]
+
+        started = time.perf_counter()
+        index = ScreenIndex.from_ocr(frame, await self.pool.image_to_data(frame.to_image()))
+        self.builds += 1
+        self._by_region.pop(region, None)
+        self._by_region[region] = (digest, index)
+        if len(self._by_region) > _CACHED_REGIONS:
+            self._by_region.pop(next(iter(self._by_region)))
+        logger.info(f"[Screen Index] {len(index.words)} words indexed in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return index
+
+    def invalidate(self) -> None:
+        self._by_region.clear()
+
+
+screen_index = ScreenIndexCache()
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from hero_capture import dhash, get_pipeline, hamming
+from hero_ocr_tiles import tile_ocr
+
+logger = logging.getLogger(__name__)
+
+WAIT_FPS = float(os.getenv("HERO_WAIT_FPS", "4"))
+WAIT_MAX_TIMEOUT = float(os.getenv("HERO_WAIT_MAX_TIMEOUT", "60"))
+# Bits (of 256) that must flip before a frame counts as changed; absorbs cursor blink/clock ticks
+CHANGE_BITS = int(os.getenv("HERO_WAIT_CHANGE_BITS", "6"))
+
+
+@dataclass
+class WaitResult:
+    met: bool
+    reason: str
+    waited: float
+    frames: int
+    ocr_calls: int
+    text: str = ""
+
+
+async def wait_for_screen_state(until: str = "change", text: str = "", region: str = "full",
+                                timeout: float = 10.0, fps: float = WAIT_FPS, stable_for: float = 1.0,
+                                baseline: Optional[int] = None) -> WaitResult:
+    """
+    Polls cheap difference hashes of `region` until:
+      - "change": the region differs from `baseline` (a screen_hash taken before the action
+        being waited on), or else from the first frame,
+      - "stable": nothing changed for `stable_for` seconds,
+      - "text":   OCR of the region contains `text` (OCR only runs on frames that changed).
+    Returns when the condition holds or `timeout` expires, even mid-capture or mid-OCR.
+    Raises ValueError for an unknown region or an empty `text` with until="text".
+    """
+    target = " ".join(text.lower().split())
+    if until == "text" and not target:
+        raise ValueError("until='text' needs the text to wait for")
+    pipeline = get_pipeline()
+    timeout = min(max(0.0, timeout), WAIT_MAX_TIMEOUT)
+    interval = 1.0 / max(0.5, min(fps, 30.0))
+    started = time.perf_counter()
+    deadline = started + timeout
+    state = {"frames": 0, "ocr_calls": 0}
+
+    async def poll() -> WaitResult:
+        nonlocal baseline
+        previous: Optional[int] = None
+        last_ocr_hash: Optional[int] = None
+        last_change = started
+
+        while True:
+            tick = time.perf_counter()
+            thumb = await asyncio.to_thread(pipeline.thumbnail, region)
+            current = dhash(thumb)
+            state["frames"] += 1
+
+            if baseline is None:
+                baseline = current
+            if previous is None:
+                previous = current
+            changed = hamming(previous, current) > CHANGE_BITS
+            if changed:
+                last_change = tick
+            previous = current
+
+            if until == "change" and hamming(baseline, current) > CHANGE_BITS:
+                return WaitResult(True, "changed", tick - started, state["frames"], state["ocr_calls"])
+            if until == "stable" and tick - last_change >= stable_for:
+                return WaitResult(True, "stable", tick - started, state["frames"], state["ocr_calls"])
+            if until == "text" and (last_ocr_hash is None or hamming(last_ocr_hash, current) > CHANGE_BITS):
+                frame = await asyncio.to_thread(pipeline.capture, region)
+                seen = await tile_ocr.read(frame.to_image())
+                state["ocr_calls"] += 1
+                last_ocr_hash = current
+                if target in " ".join(seen.lower().split()):
+                    return WaitResult(True, "text found", time.perf_counter() - started,
+                                      state["frames"], state["ocr_calls"], seen)
+
+            now = time.perf_counter()
+            await asyncio.sleep(max(0.0, interval - (now - tick)))
+
+    try:
+        # A slow grab or OCR pass can't run past the deadline
+        return await asyncio.wait_for(poll(), timeout)
+    except asyncio.TimeoutError:
+        return WaitResult(False, "timeout", time.perf_counter() - started, state["frames"], state["ocr_calls"])
+
+
+def screen_hash(region: str = "full") -> int:
+    """
+    Blocking: difference hash of the region now, the `baseline` for a later "change" wait.
+    """
+    return dhash(get_pipeline().thumbnail(region))
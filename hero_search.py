@@ -1,77 +1,118 @@
 import os
-from duckduckgo_search import DDGS
-import requests
+import asyncio
+from dataclasses import asdict
+from typing import List, Optional
+import aiohttp
 import logging
 from livekit.agents import function_tool
-from dotenv import load_dotenv
+from hero_deep_search import deep_passages
+from hero_http import get_json, run_blocking, track_requests
+from hero_search_cache import search_cache
+from hero_search_router import SearchBackend, SearchResult, SearchRouter
 
-# Load environment variables
-load_dotenv()
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s: %(message)s",
-)
 
-@function_tool
-def search_tool(query: str) -> str:
+class GoogleCSEBackend(SearchBackend):
     """
-    Fallback search using DuckDuckGo (free, no API key needed).
+    Google Custom Search API. Requires GOOGLE_SEARCH_API_KEY and SEARCH_ENGINE_ID in .env.
     """
-    try:
+
+    name = "google"
+    label = "Google"
+
+    def available(self) -> bool:
+        return bool(os.getenv("GOOGLE_SEARCH_API_KEY") and os.getenv("SEARCH_ENGINE_ID"))
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        params = {
+            "key": os.getenv("GOOGLE_SEARCH_API_KEY"),
+            "cx": os.getenv("SEARCH_ENGINE_ID"),
+            "q": query,
+            "num": max_results,
+        }
+        data = await get_json(GOOGLE_CSE_URL, params=params)
+        return [
+            SearchResult(item["title"], item.get("snippet", "No description"), item.get("link", ""))
+            for item in data.get("items", [])[:max_results]
+        ]
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """
+    DuckDuckGo through the DDGS library (free, no API key needed).
+    """
+
+    name = "duckduckgo"
+    label = "Internet"
+
+    @staticmethod
+    def _text(query: str, max_results: int):
+        # Imported on first use; hero_startup.warm_up() usually has it loaded already
+        from duckduckgo_search import DDGS
         with DDGS() as ddgs:
-            results = ddgs.text(query, max_results=3)
-        if results:
-            summary = "\n".join([f"{r['title']}: {r['body']}" for r in results])
-            return f"Internet search results for '{query}':\n{summary}"
-        else:
+            return ddgs.text(query, max_results=max_results)
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        # DDGS is a blocking client, keep it off the event loop
+        results = await run_blocking("duckduckgo.com", self._text, query, max_results)
+        return [SearchResult(r["title"], r["body"], r.get("href", "")) for r in results or []]
+
+
+search_router = SearchRouter([GoogleCSEBackend(), DuckDuckGoBackend()])
+
+
+async def _fetch(query: str, prefer: str, deep: bool) -> Optional[dict]:
+    backend, results = await search_router.search(query, max_results=3, prefer=prefer)
+    if not results:
+        return None
+    logging.info(f"✅ {backend.name} search successful for '{query}'")
+    answer = {"label": backend.label, "results": [asdict(r) for r in results]}
+    if deep:
+        passages = await deep_passages(query, results)
+        answer["passages"] = [{"source": p.source, "text": p.text} for p in passages]
+    return answer
+
+
+async def _routed_search(query: str, prefer: str, deep: bool = False) -> str:
+    try:
+        with track_requests("Search Tool"):
+            # Near-identical queries (case, punctuation, filler words) share one cached answer;
+            # each backend keeps its own, they return different results
+            answer = await search_cache.get_or_fetch(
+                query, lambda: _fetch(query, prefer, deep), variant=prefer + ("+deep" if deep else "")
+            )
+        if not answer:
             return "No relevant results found online."
+        if answer.get("passages"):
+            passages = "\n".join([f"[{p['source']}] {p['text']}" for p in answer["passages"]])
+            return f"{answer['label']} deep search for '{query}', most relevant passages:\n{passages}"
+        summary = "\n".join([f"{r['title']}: {r['snippet']}" for r in answer["results"]])
+        return f"{answer['label']} search results for '{query}':\n{summary}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"Search network error: {e}")
+        return f"Search failed: {e}"
     except Exception as e:
         logging.error(f"Search tool error: {e}")
         return f"Search failed: {e}"
 
+
 @function_tool
-def search_internet(query: str) -> str:
+async def search_tool(query: str, deep: bool = False) -> str:
     """
-    Primary search using Google Custom Search API.
-    Requires GOOGLE_SEARCH_API_KEY and SEARCH_ENGINE_ID in .env.
+    Fallback search using DuckDuckGo (free, no API key needed).
+    Set deep=True to read the top result pages and get the most relevant passages instead of snippets.
     """
-    api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
-    search_engine_id = os.getenv("SEARCH_ENGINE_ID")
-    
-    if not api_key or not search_engine_id:
-        logging.error("Google API key or search engine ID missing. Falling back to DuckDuckGo.")
-        return search_tool(query)  # Fallback
-    
-    url = "https://www.googleapis.com/customsearch/v1"
-    params = {
-        "key": api_key,
-        "cx": search_engine_id,
-        "q": query,
-        "num": 3,  # Limit to 3 results
-    }
-
-    logging.info(f"🔍 Searching Google for: {query}")
+    return await _routed_search(query, prefer=DuckDuckGoBackend.name, deep=deep)
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        results = data.get("items", [])
-        if not results:
-            logging.warning("No Google search results found. Falling back to DuckDuckGo.")
-            return search_tool(query)
-
-        # Extract and summarize top results
-        summary = "\n".join([f"{item['title']}: {item.get('snippet', 'No description')}" for item in results[:3]])
-        logging.info(f"✅ Google search successful for '{query}'")
-        return f"Google search results for '{query}':\n{summary}"
-
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Google search network error: {e}. Falling back to DuckDuckGo.")
-        return search_tool(query)
-    except Exception as e:
-        logging.error(f"Google search unexpected error: {e}. Falling back to DuckDuckGo.")
-        return search_tool(query)
\ No newline at end of file
+
+@function_tool
+async def search_internet(query: str, deep: bool = False) -> str:
+    """
+    Primary search using Google Custom Search API, hedged with DuckDuckGo when Google is slow or failing.
+    Set deep=True to read the top result pages and get the most relevant passages instead of snippets,
+    use it when snippets alone won't answer the question.
+    Requires GOOGLE_SEARCH_API_KEY and SEARCH_ENGINE_ID in .env.
+    """
+    logging.info(f"🔍 Searching for: {query}")
+    return await _routed_search(query, prefer=GoogleCSEBackend.name, deep=deep)
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from hero_cache import SqliteCache, cache_path
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_TTL = float(os.getenv("HERO_SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("HERO_SEARCH_CACHE_MAX_BYTES", str(2 * 1024 * 1024)))
+SEARCH_CACHE_PERSIST = os.getenv("HERO_SEARCH_CACHE_PERSIST", "0").lower() in ("1", "true", "yes")
+
+# Words that don't change what the user is looking for ("search the latest AI news please")
+STOPWORDS = frozenset("""
+a an the of for in on at to and or is are was were be what whats who how when where which
+me my i you your please search find tell about show latest current today now some any
+""".split())
+
+# Stopwords for relevance scoring that still change the question, so they stay in cache
+# keys: "when/where was einstein born", "flights from delhi to mumbai"
+KEY_WORDS = frozenset("what whats who how when where which from to".split())
+
+_TOKEN_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.split(text.lower()) if t]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used as cache key: lower-cased, punctuation and filler words dropped,
+    repeated tokens removed. Word order is kept, it can change the answer.
+    """
+    tokens = tokenize(query)
+    meaningful = [t for t in tokens if t not in STOPWORDS or t in KEY_WORDS]
+    return " ".join(dict.fromkeys(meaningful or tokens))
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """
+    TTL + byte-bounded LRU cache of search results keyed by normalized query, with
+    optional SQLite persistence and single-flight coalescing of identical in-flight queries.
+    """
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+                 persist: bool = SEARCH_CACHE_PERSIST):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict = {}
+        self._disk = SqliteCache(cache_path("search.sqlite3"), "search_results", ttl=ttl) if persist else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, size = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key: str, value: Any) -> None:
+        if key in self._entries:
+            self._drop(key)
+        size = _sizeof(value) + _sizeof(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    async def get_or_fetch(self, query: str, fetch: Callable[[], Awaitable[Any]], variant: str = "") -> Any:
+        """
+        Returns the cached value for the query or awaits `fetch()` once for all concurrent
+        callers. `variant` separates answers of a different shape for the same query.
+        Falsy results (nothing found) are not cached.
+        """
+        key = normalize_query(query)
+        if variant:
+            key = f"{variant}|{key}"
+
+        value = self._get_memory(key)
+        if value is not None:
+            self.hits += 1
+            logger.info(f"[Search Cache] Hit for '{query}' (key='{key}')")
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # The lookup runs detached, so a cancelled first caller doesn't cancel it for the rest
+            task = asyncio.get_running_loop().create_task(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(self._settled)
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await self._disk.aget(key) if self._disk else None
+            if value is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                value = await fetch()
+                if value and self._disk:
+                    await self._disk.aset(key, value)
+            if value:
+                self._put_memory(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _settled(task: "asyncio.Task") -> None:
+        # Every caller may have been cancelled; make sure an unobserved failure doesn't warn
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+        }
+
+
+search_cache = QueryCache()
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A backend is hedged once it has been running longer than its own p90 latency
+# (clamped to these bounds; HEDGE_DEFAULT is used until enough samples exist).
+HEDGE_MIN = float(os.getenv("HERO_SEARCH_HEDGE_MIN", "0.25"))
+HEDGE_MAX = float(os.getenv("HERO_SEARCH_HEDGE_MAX", "3"))
+HEDGE_DEFAULT = float(os.getenv("HERO_SEARCH_HEDGE_DEFAULT", "1.5"))
+BREAKER_FAILURES = int(os.getenv("HERO_SEARCH_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.getenv("HERO_SEARCH_BREAKER_COOLDOWN", "30"))
+SEARCH_DEADLINE = float(os.getenv("HERO_SEARCH_DEADLINE", "8"))
+
+_WINDOW = 50
+_MIN_SAMPLES = 5
+
+
+@dataclass
+class SearchResult:
+    title: str
+    snippet: str
+    url: str = ""
+
+
+class SearchBackend:
+    """
+    Interface for a search provider. Subclasses set `name`/`label` and implement `search()`;
+    raising or returning [] makes the router move on to the next backend.
+    """
+
+    name = "backend"
+    label = "Internet"
+
+    def available(self) -> bool:
+        return True
+
+    async def search(self, query: str, max_results: int) -> List[SearchResult]:
+        raise NotImplementedError
+
+
+class BackendProfile:
+    """
+    Rolling latency/error window for one backend plus its circuit breaker.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: deque = deque(maxlen=_WINDOW)
+        self.outcomes: deque = deque(maxlen=_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self.latencies) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def hedge_delay(self) -> float:
+        p90 = self.percentile(0.9)
+        return HEDGE_DEFAULT if p90 is None else min(HEDGE_MAX, max(HEDGE_MIN, p90))
+
+    def error_rate(self) -> float:
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def is_open(self) -> bool:
+        # After the cooldown the breaker is half-open: one request goes through and decides
+        return time.monotonic() < self.open_until
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= BREAKER_FAILURES:
+            self.open_until = time.monotonic() + BREAKER_COOLDOWN
+            logger.warning(f"[Search Router] Circuit open for {self.name} ({self.consecutive_failures} failures in a row)")
+
+    def snapshot(self) -> dict:
+        return {
+            "p50_ms": round((self.percentile(0.5) or 0) * 1000),
+            "p90_ms": round((self.percentile(0.9) or 0) * 1000),
+            "error_rate": round(self.error_rate(), 3),
+            "circuit_open": self.is_open(),
+        }
+
+
+class SearchRouter:
+    """
+    Runs a query against the best backend and hedges to the next one when it is slower
+    than its p90, fails or comes back empty. The first non-empty answer wins and the
+    remaining requests are cancelled.
+    """
+
+    def __init__(self, backends: Sequence[SearchBackend]):
+        self.backends = list(backends)
+        self.profiles = {b.name: BackendProfile(b.name) for b in self.backends}
+
+    def register(self, backend: SearchBackend) -> None:
+        self.backends.append(backend)
+        self.profiles[backend.name] = BackendProfile(backend.name)
+
+    def _ranked(self, prefer: Optional[str]) -> List[SearchBackend]:
+        usable = [b for b in self.backends if b.available() and not self.profiles[b.name].is_open()]
+
+        def score(b: SearchBackend):
+            prof = self.profiles[b.name]
+            return (b.name != prefer, prof.error_rate() > 0.5, prof.percentile(0.5) or HEDGE_DEFAULT)
+
+        return sorted(usable, key=score)
+
+    async def _run(self, backend: SearchBackend, query: str, max_results: int) -> List[SearchResult]:
+        prof = self.profiles[backend.name]
+        started = time.perf_counter()
+        try:
+            results = await backend.search(query, max_results)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            prof.record_failure()
+            logger.error(f"[Search Router] {backend.name} failed: {e}")
+            raise
+        elapsed = time.perf_counter() - started
+        prof.record_success(elapsed)
+        logger.info(f"[Search Router] {backend.name} answered in {elapsed * 1000:.0f}ms ({len(results)} results)")
+        return results
+
+    async def search(self, query: str, max_results: int = 3, prefer: Optional[str] = None,
+                     deadline: float = SEARCH_DEADLINE) -> Tuple[Optional[SearchBackend], List[SearchResult]]:
+        """
+        Returns (winning backend, results), or (None, []) when every backend failed or was empty.
+        """
+        queue = self._ranked(prefer)
+        if not queue:
+            logger.error("[Search Router] No search backend available")
+            return None, []
+
+        running = {}
+        start_next = False
+        give_up_at = time.monotonic() + deadline
+        try:
+            while queue or running:
+                if queue and (not running or start_next or not self._hedge_pending(running)):
+                    start_next = False
+                    backend = queue.pop(0)
+                    task = asyncio.ensure_future(self._run(backend, query, max_results))
+                    running[task] = (backend, time.monotonic())
+
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"[Search Router] Deadline of {deadline}s reached for '{query}'")
+                    return None, []
+                # Wake up either when something finishes or when the next hedge is due
+                wait_for = min(remaining, self._next_hedge_in(running)) if queue else remaining
+                done, _ = await asyncio.wait(running, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    backend, _ = running.pop(task)
+                    if not task.cancelled() and task.exception() is None and task.result():
+                        return backend, task.result()
+                    start_next = True  # failed or empty: don't wait for the hedge delay
+            return None, []
+        finally:
+            for task in running:
+                task.cancel()
+
+    def _hedge_pending(self, running: dict) -> bool:
+        return self._next_hedge_in(running) > 0
+
+    def _next_hedge_in(self, running: dict) -> float:
+        # The newest in-flight request decides when the next backend gets started
+        backend, started = max(running.values(), key=lambda item: item[1])
+        return max(0.0, started + self.profiles[backend.name].hedge_delay() - time.monotonic())
+
+    def stats(self) -> dict:
+        return {name: prof.snapshot() for name, prof in self.profiles.items()}
@@ -0,0 +1,76 @@
+import contextlib
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Heavy optional dependencies the tools import on first use; warm_up() loads them early
+WARM_MODULES = ("pyautogui", "PIL.Image", "pytesseract", "duckduckgo_search", "psutil")
+WARMUP_ENABLED = os.getenv("HERO_WARMUP", "1") != "0"
+
+
+class StartupReport:
+    """
+    Wall time per startup phase (imports, env loading, warm-up) so cold-start regressions
+    show up in the worker log instead of as a slow first answer.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases.append((name, seconds))
+
+    def since_start(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self.phases}
+
+    def summary(self) -> str:
+        parts = [f"{name} {ms:.0f}ms" for name, ms in self.as_dict().items()]
+        return " | ".join(parts + [f"total {self.since_start():.2f}s"])
+
+    def log(self) -> None:
+        logger.info(f"[Startup] {self.summary()}")
+
+
+startup = StartupReport()
+
+
+def _warm(modules) -> None:
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            # e.g. pyautogui without a display; the tool reports it when actually used
+            logger.debug(f"[Startup] Warm-up of {name} skipped: {e}")
+            continue
+        startup.record(f"warm:{name}", time.perf_counter() - started)
+
+
+def warm_up(modules=WARM_MODULES) -> threading.Thread:
+    """
+    Imports the lazily loaded tool dependencies on a background thread, so the first tool call
+    doesn't pay for them and the worker doesn't wait for them before taking a job.
+    """
+    thread = threading.Thread(target=_warm, args=(modules if WARMUP_ENABLED else (),), name="hero-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,288 @@
+import asyncio
+import functools
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from hero_input import input_worker
+
+logger = logging.getLogger(__name__)
+
+# Texts at least this long go through the clipboard when it is available
+PASTE_MIN_CHARS = int(os.getenv("HERO_PASTE_MIN_CHARS", "40"))
+# Time the target app gets to read the clipboard before the previous contents are restored
+PASTE_SETTLE = float(os.getenv("HERO_PASTE_SETTLE", "0.15"))
+KEY_BATCH_CHARS = 256
+
+@functools.lru_cache(maxsize=1)
+def _typeable_chars() -> frozenset:
+    import pyautogui
+    return frozenset(pyautogui.KEYBOARD_KEYS) | {"\n", "\t"}
+
+
+def typeable(text: str) -> bool:
+    """True if pyautogui can produce every character with plain key presses (ASCII only)."""
+    chars = _typeable_chars()
+    return all(c in chars for c in text)
+
+
+class PartialInjection(Exception):
+    """
+    A backend failed after some of the text may have reached the window. `done` is how many
+    characters certainly went through (another backend can type the rest), or None when
+    that is unknown and retrying could type text twice.
+    """
+
+    def __init__(self, done: Optional[int], cause: BaseException):
+        super().__init__(f"{cause} (after {done if done is not None else 'an unknown number of'} chars)")
+        self.done = done
+
+
+class TextBackend:
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, text: str) -> bool:
+        return True
+
+    def inject(self, text: str, interval: float = 0.0) -> None:
+        """
+        Blocking; always called on the input worker thread. Raises PartialInjection once
+        anything may have been typed; any other exception means nothing was.
+        """
+        raise NotImplementedError
+
+
+class ClipboardBackend(TextBackend):
+    """
+    Copies the text and sends the paste shortcut: constant time for any length and any script.
+    The previous clipboard contents are put back afterwards.
+    """
+    name = "paste"
+
+    def __init__(self):
+        self._clip = None
+
+    def _pyperclip(self):
+        if self._clip is None:
+            try:
+                import pyperclip
+                pyperclip.paste()  # raises if no copy/paste mechanism exists
+                self._clip = pyperclip
+            except Exception as e:
+                logger.debug(f"[Text Input] Clipboard unavailable: {e}")
+                self._clip = False
+        return self._clip
+
+    def available(self) -> bool:
+        return bool(self._pyperclip())
+
+    def inject(self, text: str, interval: float = 0.0) -> None:
+        import pyautogui
+        clip = self._pyperclip()
+        try:
+            saved = clip.paste()
+        except Exception:
+            saved = None
+        clip.copy(text)
+        try:
+            pyautogui.hotkey("command" if sys.platform == "darwin" else "ctrl", "v", _pause=False)
+            time.sleep(PASTE_SETTLE)
+        except Exception as e:
+            # The paste may or may not have happened
+            raise PartialInjection(None, e) from e
+        finally:
+            if saved is not None:
+                try:
+                    clip.copy(saved)
+                except Exception as e:
+                    logger.warning(f"[Text Input] Could not restore the clipboard: {e}")
+
+
+class SendInputBackend(TextBackend):
+    """
+    Windows: KEYEVENTF_UNICODE key events submitted in batches with one SendInput call each,
+    so any BMP/UTF-16 text is typed without a per-character round trip.
+    """
+    name = "keys"
+
+    def __init__(self):
+        self._api = None
+
+    def available(self) -> bool:
+        return os.name == "nt"
+
+    def _build(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class _UNION(ctypes.Union):
+            # MOUSEINPUT is the largest member; it sets sizeof(INPUT) to what SendInput expects
+            _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [("type", wintypes.DWORD), ("u", _UNION)]
+
+        send = ctypes.windll.user32.SendInput
+        send.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+        self._api = (INPUT, send, ctypes.sizeof(INPUT))
+
+    def _events(self, text: str):
+        INPUT_KEYBOARD, KEYEVENTF_KEYUP, KEYEVENTF_UNICODE = 1, 0x0002, 0x0004
+        VK = {"\n": 0x0D, "\t": 0x09}
+        INPUT = self._api[0]
+        events = []
+        units = text.replace("\r\n", "\n").encode("utf-16-le")
+        for i in range(0, len(units), 2):
+            code = int.from_bytes(units[i:i + 2], "little")
+            char = chr(code)
+            for up in (0, KEYEVENTF_KEYUP):
+                ev = INPUT(type=INPUT_KEYBOARD)
+                if char in VK:
+                    ev.u.ki.wVk, ev.u.ki.dwFlags = VK[char], up
+                else:
+                    ev.u.ki.wScan, ev.u.ki.dwFlags = code, KEYEVENTF_UNICODE | up
+                events.append(ev)
+        return events
+
+    def inject(self, text: str, interval: float = 0.0) -> None:
+        if self._api is None:
+            self._build()
+        INPUT, send, size = self._api
+        events = self._events(text)
+        step = KEY_BATCH_CHARS * 2
+        for i in range(0, len(events), step):
+            batch = events[i:i + step]
+            sent = send(len(batch), (INPUT * len(batch))(*batch), size)
+            if sent != len(batch):
+                error = OSError(f"SendInput accepted {sent}/{len(batch)} events (blocked by UIPI?)")
+                if i or sent:
+                    raise PartialInjection(None, error)
+                raise error
+
+
+class XdotoolBackend(TextBackend):
+    """
+    X11: `xdotool type` sends the whole string as one batch of XTest events and maps
+    non-ASCII characters to spare keycodes itself.
+    """
+    name = "keys"
+
+    def available(self) -> bool:
+        return sys.platform.startswith("linux") and bool(os.getenv("DISPLAY")) and bool(shutil.which("xdotool"))
+
+    def inject(self, text: str, interval: float = 0.0) -> None:
+        delay = str(int(interval * 1000))
+        for i in range(0, len(text), KEY_BATCH_CHARS):
+            try:
+                subprocess.run(["xdotool", "type", "--clearmodifiers", "--delay", delay, "--",
+                                text[i:i + KEY_BATCH_CHARS]], check=True, timeout=30)
+            except subprocess.CalledProcessError as e:
+                # xdotool failed before typing this chunk (no display, bad keysym); earlier ones went through
+                if i:
+                    raise PartialInjection(i, e) from e
+                raise
+            except subprocess.TimeoutExpired as e:
+                raise PartialInjection(None, e) from e
+
+
+class PerCharBackend(TextBackend):
+    """pyautogui.typewrite: one key press per character. ASCII only, but works everywhere."""
+    name = "chars"
+
+    def available(self) -> bool:
+        try:
+            _typeable_chars()
+        except Exception:  # pyautogui missing or no display to talk to
+            return False
+        return True
+
+    def supports(self, text: str) -> bool:
+        return typeable(text)
+
+    def inject(self, text: str, interval: float = 0.0) -> None:
+        import pyautogui
+        for i, char in enumerate(text):
+            try:
+                pyautogui.typewrite(char, _pause=False)
+            except Exception as e:
+                if i:
+                    raise PartialInjection(i, e) from e
+                raise
+            if interval:
+                time.sleep(interval)
+
+
+class TextInjector:
+    """
+    Picks the fastest backend that can produce `text` correctly: the clipboard for long text,
+    native key batches for short text, per-character typing as the last resort. Non-ASCII
+    text skips per-character typing since pyautogui can't produce it.
+    """
+
+    def __init__(self, backends: Optional[List[TextBackend]] = None):
+        if backends is None:
+            native = SendInputBackend() if os.name == "nt" else XdotoolBackend()
+            backends = [ClipboardBackend(), native, PerCharBackend()]
+        self.backends: Dict[str, TextBackend] = {b.name: b for b in backends}
+        self.used: Dict[str, int] = {}
+
+    def candidates(self, text: str, method: str = "auto") -> List[TextBackend]:
+        if method != "auto":
+            order = [method]
+        elif len(text) >= PASTE_MIN_CHARS:
+            order = ["paste", "keys", "chars"]
+        else:
+            order = ["keys", "chars", "paste"]
+        return [b for b in (self.backends.get(n) for n in order)
+                if b is not None and b.available() and b.supports(text)]
+
+    async def type(self, text: str, method: str = "auto", interval: float = 0.0) -> str:
+        """
+        Types `text` into the focused window and returns the backend name used. `interval` only
+        applies to per-character typing. Raises ValueError if no backend can produce the text.
+        """
+        if not text:
+            return "none"
+        # Probing backends can import pyautogui or touch the clipboard: not on the event loop
+        options = await asyncio.to_thread(self.candidates, text, method)
+        if not options:
+            raise ValueError(f"no text input method '{method}' available for this text")
+        last_error = None
+        done = 0  # characters already typed; a fallback backend only types the rest
+        for backend in options:
+            started = time.perf_counter()
+            try:
+                await input_worker.call(f"text:{backend.name}", backend.inject, text[done:], interval)
+            except PartialInjection as e:
+                logger.warning(f"[Text Input] {backend.name} failed: {e}")
+                if e.done is None:
+                    raise ValueError(f"text input failed partway through: {e}") from e
+                done += e.done
+                last_error = e
+                continue
+            except Exception as e:
+                logger.warning(f"[Text Input] {backend.name} failed: {e}")
+                last_error = e
+                continue
+            self.used[backend.name] = self.used.get(backend.name, 0) + 1
+            logger.debug(f"[Text Input] {len(text) - done} chars via {backend.name} in {time.perf_counter() - started:.3f}s")
+            return backend.name
+        raise ValueError(f"text input failed: {last_error}")
+
+
+text_input = TextInjector()
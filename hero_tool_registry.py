@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from livekit.agents import function_tool
+
+from hero_output import estimate_tokens
+from hero_tools import tool_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "full"
+
+
+@dataclass
+class ToolGroup:
+    name: str
+    description: str
+    tools: List = field(default_factory=list)
+
+
+class ToolRegistry:
+    """
+    Tools grouped by capability, plus named profiles (sets of groups). A session only
+    registers the groups of its profile, so the realtime model gets a smaller tool schema;
+    the rest can be switched on mid-session through the enable_capability tool.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, ToolGroup] = {}
+        self.profiles: Dict[str, List[str]] = {}
+        self.always: List = []
+
+    def group(self, name: str, description: str, tools: Sequence) -> None:
+        self.groups[name] = ToolGroup(name, description, list(tools))
+
+    def profile(self, name: str, *groups: str) -> None:
+        unknown = [g for g in groups if g not in self.groups]
+        if unknown:
+            raise ValueError(f"profile '{name}' uses unknown groups: {', '.join(unknown)}")
+        self.profiles[name] = list(groups)
+
+    def select(self, metadata: Optional[str] = None) -> List[str]:
+        """
+        Group names for a session. Job metadata (JSON with "tool_profile" and/or
+        "capabilities") wins over HERO_TOOL_PROFILE; unknown names fall back to the default.
+        """
+        profile, extra = os.getenv("HERO_TOOL_PROFILE", DEFAULT_PROFILE), []
+        if metadata:
+            try:
+                meta = json.loads(metadata)
+            except ValueError:
+                meta = None
+            if isinstance(meta, dict):
+                profile = meta.get("tool_profile", profile)
+                extra = [c for c in meta.get("capabilities", []) if c in self.groups]
+        if profile not in self.profiles:
+            logger.warning(f"[Tools] Unknown tool profile '{profile}', using '{DEFAULT_PROFILE}'")
+            profile = DEFAULT_PROFILE
+        return self.profiles[profile] + [g for g in extra if g not in self.profiles[profile]]
+
+    def tools_for(self, groups: Sequence[str]) -> List:
+        tools, seen = [], set()
+        for tool in [t for g in groups for t in self.groups[g].tools] + self.always:
+            name = tool_name(tool)
+            if name not in seen:
+                seen.add(name)
+                tools.append(tool)
+        return tools
+
+    def capability_tool(self, agent, active: List[str]):
+        """
+        enable_capability for `agent`, listing only the groups it doesn't have yet.
+        """
+        offered = [g for g in self.groups if g not in active]
+        description = (
+            "Turns on another set of tools for the rest of this session when the user asks for "
+            "something the current tools can't do. capability: "
+            + "; ".join(f"{g} ({self.groups[g].description})" for g in offered)
+        )
+
+        @function_tool(name="enable_capability", description=description)
+        async def enable_capability(capability: str) -> str:
+            name = capability.strip().lower()
+            if name in active:
+                return f"'{name}' is already enabled"
+            if name not in self.groups:
+                return f"Unknown capability '{capability}'. Available: {', '.join(offered)}"
+            present = {tool_name(t) for t in agent.tools}
+            added = [t for t in self.groups[name].tools if tool_name(t) not in present]
+            await agent.update_tools(list(agent.tools) + added)
+            active.append(name)
+            logger.info(f"[Tools] Enabled '{name}' (+{len(added)} tools)")
+            return f"Enabled {name}: {', '.join(tool_name(t) for t in added)}"
+
+        return enable_capability
+
+    @staticmethod
+    def schema_size(tools: Sequence) -> Dict[str, int]:
+        """
+        Size of the tool declarations sent to the model, as JSON bytes and estimated tokens.
+        """
+        from livekit.agents.llm.utils import build_legacy_openai_schema
+
+        text = json.dumps([build_legacy_openai_schema(t, internally_tagged=True) for t in tools])
+        return {"tools": len(tools), "bytes": len(text), "tokens": estimate_tokens(text)}
+
+    def report(self) -> str:
+        rows = []
+        for name, groups in self.profiles.items():
+            size = self.schema_size(self.tools_for(groups))
+            rows.append(f"{name}: {size['tools']} tools, {size['bytes'] / 1024:.1f} KB (~{size['tokens']} tokens)")
+        return "[Tools] Schema per profile | " + " | ".join(rows)
+
+
+tool_registry = ToolRegistry()
@@ -0,0 +1,70 @@
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+# A middleware receives the tool name, its bound arguments and a zero-arg coroutine
+# function that runs the tool (or the next middleware), and returns the tool output.
+ToolCall = Callable[[], Awaitable[Any]]
+Middleware = Callable[[str, Dict[str, Any], ToolCall], Awaitable[Any]]
+
+
+def tool_name(tool) -> str:
+    info = getattr(tool, "__livekit_tool_info", None)
+    return getattr(info, "name", None) or tool.__name__
+
+
+def _as_tool(original, fn):
+    # livekit-agents >= 1.2 wraps tools in FunctionTool objects; rebuild one around the
+    # wrapper so the agent sees a first-class tool. Older versions use plain functions
+    # carrying the tool info attribute, which functools.wraps already copied.
+    info = getattr(original, "info", None)
+    if info is not None and hasattr(original, "_func"):
+        return original.__class__(fn, info)
+    return fn
+
+
+def wrap_tool(tool, middleware: Middleware):
+    """
+    Returns an async function_tool that runs `tool` through `middleware`. functools.wraps keeps
+    the signature, annotations, docstring and the livekit tool info, so the schema sent to
+    the model is unchanged.
+    """
+    name = tool_name(tool)
+    signature = inspect.signature(tool)
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+        except TypeError:
+            arguments = dict(kwargs)
+
+        async def call():
+            result = tool(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        return await middleware(name, arguments, call)
+
+    return _as_tool(tool, wrapper)
+
+
+def wrap_tools(tools: Iterable, middleware: Middleware) -> List:
+    return [wrap_tool(t, middleware) for t in tools]
+
+
+def chain(*middlewares: Middleware) -> Middleware:
+    """
+    Combines middlewares into one; the first is outermost and sees the final output.
+    """
+    async def run(name: str, arguments: Dict[str, Any], call: ToolCall) -> Any:
+        async def step(i: int) -> Any:
+            if i == len(middlewares):
+                return await call()
+            return await middlewares[i](name, arguments, lambda: step(i + 1))
+        return await step(0)
+
+    return run
@@ -0,0 +1,277 @@
+import asyncio
+import base64
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import hero_http
+from hero_tools import ToolCall, tool_name
+
+logger = logging.getLogger(__name__)
+
+TRACE_DIR = os.getenv("HERO_TRACE_DIR", "")  # empty = recording off
+# Longer upstream bodies are cut; replays of those responses see the cut version
+TRACE_MAX_BODY = int(os.getenv("HERO_TRACE_MAX_BODY", str(256 * 1024)))
+
+# Tool arguments whose values are never written to a trace
+_SECRET_ARGS = ("password", "secret", "token", "api_key")
+# Upstream hosts whose answers describe the user (public IP, where they are): these body
+# fields are written as REDACTED, and replays see them that way
+SENSITIVE_FIELDS = {
+    "ipinfo.io": ("ip", "hostname", "city", "region", "country", "loc", "postal", "org", "timezone"),
+}
+
+_call_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("hero_trace_call", default=None)
+
+
+def _encode(body: Any) -> Any:
+    if isinstance(body, bytes):
+        return {"__bytes__": base64.b64encode(body[:TRACE_MAX_BODY]).decode()}
+    if isinstance(body, str) and len(body) > TRACE_MAX_BODY:
+        return body[:TRACE_MAX_BODY]
+    return body
+
+
+def _decode(body: Any) -> Any:
+    if isinstance(body, dict) and set(body) == {"__bytes__"}:
+        return base64.b64decode(body["__bytes__"])
+    return body
+
+
+def _redact(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: "REDACTED" if any(s in k.lower() for s in _SECRET_ARGS) else v for k, v in arguments.items()}
+
+
+def _redact_body(key: str, body: Any) -> Any:
+    url = key.split(" ", 1)[-1]
+    fields = SENSITIVE_FIELDS.get(urlsplit(url).hostname or "")
+    if not fields or not isinstance(body, dict):
+        return body
+    return {k: "REDACTED" if k in fields else v for k, v in body.items()}
+
+
+class TraceRecorder:
+    """
+    Appends one JSON line per event to TRACE_DIR/<session>.jsonl: a session header, every
+    tool call (name, arguments, start/end offsets, output size, outcome) and every upstream
+    response made during a call (redacted request key, status, time, body). Offsets are
+    seconds since the session started. Bodies from SENSITIVE_FIELDS hosts are redacted; the
+    requests that follow them (a geocoded city, its coordinates) are recorded as made.
+    """
+
+    def __init__(self, directory: str = TRACE_DIR):
+        self.directory = directory
+        self.path = ""
+        self._file = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._started = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def start(self, session: str, metadata: str = "") -> None:
+        if not self.directory or self.active:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{session}.jsonl")
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._started = time.perf_counter()
+        self._write({"type": "session", "session": session, "metadata": metadata, "wall": time.time()})
+        hero_http.response_hook = self._on_response
+        logger.info(f"[Trace] Recording session to {self.path}")
+
+    def stop(self) -> None:
+        if not self.active:
+            return
+        if hero_http.response_hook == self._on_response:
+            hero_http.response_hook = None
+        with self._lock:
+            self._file.close()
+            self._file = None
+        logger.info(f"[Trace] Saved {self.path}")
+
+    def _offset(self) -> float:
+        return round(time.perf_counter() - self._started, 4)
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()  # a crashed session still leaves a usable trace
+
+    def _on_response(self, key: str, status: Optional[int], elapsed_ms: float, body: Any, error: Optional[str]) -> None:
+        event = {"type": "response", "call": _call_id.get(), "at": self._offset(), "key": key,
+                 "status": status, "ms": round(elapsed_ms, 1)}
+        if error is not None:
+            event["error"] = error
+        else:
+            event["body"] = _encode(_redact_body(key, body))
+        self._write(event)
+
+    async def middleware(self, name: str, arguments: Dict[str, Any], call: ToolCall) -> Any:
+        """
+        Tool middleware; a pass-through while no session is being recorded.
+        """
+        if not self.active:
+            return await call()
+        call_id = next(self._ids)
+        token = _call_id.set(call_id)
+        start = self._offset()
+        outcome, result = "ok", None
+        try:
+            result = await call()
+            return result
+        except BaseException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            _call_id.reset(token)
+            self._write({"type": "call", "id": call_id, "tool": name, "args": _redact(arguments),
+                         "start": start, "end": self._offset(), "outcome": outcome,
+                         "output_bytes": len(str(result).encode()) if result is not None else 0})
+
+
+recorder = TraceRecorder()
+trace = recorder.middleware
+
+
+def load_trace(path: str) -> Dict[str, Any]:
+    """
+    Reads a trace into its session header, calls (by start time) and responses.
+    """
+    session, calls, responses = {}, [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            kind = event.get("type")
+            if kind == "session":
+                session = event
+            elif kind == "call":
+                calls.append(event)
+            elif kind == "response":
+                responses.append(event)
+    calls.sort(key=lambda c: c["start"])
+    return {"session": session, "calls": calls, "responses": responses}
+
+
+class RecordedResponses:
+    """
+    hero_http responder serving recorded responses by request key, in recorded order (the
+    last one repeats once a key runs out). With `speed` > 0 each response takes its recorded
+    time divided by `speed`. Requests missing from the trace fail like a network error: in
+    the recorded session they were served from a cache the replay doesn't have, or vice versa.
+    """
+
+    def __init__(self, responses: Iterable[Dict[str, Any]], speed: float = 1.0):
+        self.speed = speed
+        self.by_key: Dict[str, deque] = defaultdict(deque)
+        for r in responses:
+            self.by_key[r["key"]].append(r)
+        self.served = 0
+        self.missing: Dict[str, int] = defaultdict(int)
+
+    async def __call__(self, key: str) -> Any:
+        queue = self.by_key.get(key)
+        if not queue:
+            self.missing[key] += 1
+            raise aiohttp.ClientConnectionError(f"no recorded response for {key}")
+        response = queue.popleft() if len(queue) > 1 else queue[0]
+        self.served += 1
+        if self.speed > 0:
+            await asyncio.sleep(response["ms"] / 1000 / self.speed)
+        if "error" in response:
+            raise aiohttp.ClientConnectionError(f"recorded failure: {response['error']}")
+        return _decode(response["body"])
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def replay(path: str, tools: Iterable, speed: float = 1.0, concurrency: int = 4,
+                 skip: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Feeds a trace back through `tools` against its recorded upstream responses.
+    speed > 0 keeps the recorded call schedule and response times, scaled by `speed`;
+    speed == 0 runs the calls in order as fast as possible, `concurrency` at a time.
+    Returns recorded vs replayed latency per tool and the calls whose output size changed.
+    """
+    data = load_trace(path)
+    by_name = {tool_name(t): t for t in tools}
+    responses = RecordedResponses(data["responses"], speed)
+    skip = set(skip)
+    rows: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: {"recorded": [], "replayed": []})
+    changed, errors, skipped = [], defaultdict(int), defaultdict(int)
+    limit = asyncio.Semaphore(concurrency if speed == 0 else max(1, len(data["calls"])))
+    started = time.perf_counter()
+
+    async def run(call: Dict[str, Any]) -> None:
+        tool = by_name.get(call["tool"])
+        if tool is None or call["tool"] in skip:
+            skipped[call["tool"]] += 1
+            return
+        if speed > 0:
+            await asyncio.sleep(max(0.0, call["start"] / speed - (time.perf_counter() - started)))
+        async with limit:
+            t = time.perf_counter()
+            result = None
+            try:
+                result = await tool(**call["args"])
+            except Exception as e:
+                errors[f"{call['tool']}: {type(e).__name__}"] += 1
+            elapsed = time.perf_counter() - t
+        rows[call["tool"]]["recorded"].append(call["end"] - call["start"])
+        rows[call["tool"]]["replayed"].append(elapsed)
+        size = len(str(result).encode()) if result is not None else 0
+        if size != call["output_bytes"]:
+            changed.append({"id": call["id"], "tool": call["tool"], "recorded_bytes": call["output_bytes"], "replayed_bytes": size})
+
+    previous, hero_http.responder = hero_http.responder, responses
+    try:
+        # Tasks start, and so queue on the semaphore, in recorded order
+        await asyncio.gather(*(run(c) for c in data["calls"]))
+    finally:
+        hero_http.responder = previous
+
+    tools_report = {}
+    for name, row in rows.items():
+        tools_report[name] = {
+            "calls": len(row["replayed"]),
+            "recorded_p50_ms": round(_percentile(row["recorded"], 0.5) * 1000, 2),
+            "recorded_p95_ms": round(_percentile(row["recorded"], 0.95) * 1000, 2),
+            "replayed_p50_ms": round(_percentile(row["replayed"], 0.5) * 1000, 2),
+            "replayed_p95_ms": round(_percentile(row["replayed"], 0.95) * 1000, 2),
+        }
+    return {
+        "trace": path,
+        "session": data["session"].get("session"),
+        "speed": speed,
+        "wall_s": round(time.perf_counter() - started, 3),
+        "tools": tools_report,
+        "responses_served": responses.served,
+        "responses_missing": dict(responses.missing),
+        "output_size_changed": changed,
+        "errors": dict(errors),
+        "skipped": dict(skipped),
+    }
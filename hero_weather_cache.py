@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from hero_http import get_json
+
+logger = logging.getLogger(__name__)
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Served as-is while younger than FRESH_FOR; between FRESH_FOR and STALE_FOR the entry is
+# still returned immediately but a background refresh is queued; older entries are refetched.
+WEATHER_FRESH_FOR = float(os.getenv("HERO_WEATHER_FRESH_FOR", "600"))
+WEATHER_STALE_FOR = float(os.getenv("HERO_WEATHER_STALE_FOR", "10800"))
+WEATHER_PREFETCH_TOP_N = int(os.getenv("HERO_WEATHER_PREFETCH_TOP_N", "20"))
+WEATHER_CACHE_SIZE = int(os.getenv("HERO_WEATHER_CACHE_SIZE", "1000"))
+WEATHER_PREFETCH_INTERVAL = float(os.getenv("HERO_WEATHER_PREFETCH_INTERVAL", str(WEATHER_FRESH_FOR / 2)))
+
+# Refreshes queued within this window go out as one multi-coordinate request.
+_BATCH_WINDOW = 0.05
+_MAX_BATCH = 100
+
+Key = Tuple[float, float]
+
+
+def coord_key(lat: float, lon: float) -> Key:
+    # ~1 km resolution, plenty for "current weather in <city>"
+    return (round(float(lat), 2), round(float(lon), 2))
+
+
+class ForecastCache:
+    """
+    Stale-while-revalidate cache of Open-Meteo `current_weather` keyed by coordinates.
+    Concurrent misses and background refreshes are coalesced into batched
+    multi-coordinate requests, and a prefetcher keeps the most asked-for places warm.
+    At most `max_entries` locations are kept, least recently asked for evicted first.
+    """
+
+    def __init__(self, fresh_for: float = WEATHER_FRESH_FOR, stale_for: float = WEATHER_STALE_FOR,
+                 top_n: int = WEATHER_PREFETCH_TOP_N, prefetch_interval: float = WEATHER_PREFETCH_INTERVAL,
+                 max_entries: int = WEATHER_CACHE_SIZE):
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.top_n = top_n
+        self.prefetch_interval = prefetch_interval
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Key, Tuple[dict, float]]" = OrderedDict()
+        self._demand: Counter = Counter()
+        self._pending: Dict[Key, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # batch requests in flight, referenced until done
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.upstream_requests = 0
+
+    async def get(self, lat: float, lon: float) -> dict:
+        """
+        Returns the `current_weather` block for the coordinates.
+        """
+        key = coord_key(lat, lon)
+        self._demand[key] += 1
+        self._ensure_prefetcher()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            data, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.fresh_for:
+                self.hits += 1
+                return data
+            if age < self.stale_for:
+                self.stale_hits += 1
+                self._enqueue(key)  # refresh in the background, answer now
+                return data
+
+        self.misses += 1
+        # shield: one caller being cancelled must not cancel the shared fetch for the others
+        return await asyncio.shield(self._enqueue(key))
+
+    def _enqueue(self, key: Key) -> asyncio.Future:
+        fut = self._pending.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            # Background refreshes may never be awaited; don't let their errors go unretrieved
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pending[key] = fut
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(_BATCH_WINDOW, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for i in range(0, len(keys), _MAX_BATCH):
+            chunk = {k: pending[k] for k in keys[i:i + _MAX_BATCH]}
+            task = asyncio.ensure_future(self._resolve(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, pending: Dict[Key, asyncio.Future]) -> None:
+        try:
+            results = await self.fetch_many(list(pending))
+        except Exception as e:
+            for fut in pending.values():
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for key, fut in pending.items():
+            if not fut.done():
+                fut.set_result(results.get(key, {}))
+
+    async def fetch_many(self, keys: List[Key]) -> Dict[Key, dict]:
+        """
+        Fetches current weather for all keys with a single Open-Meteo request and stores it.
+        """
+        params = {
+            "latitude": ",".join(str(k[0]) for k in keys),
+            "longitude": ",".join(str(k[1]) for k in keys),
+            "current_weather": "true",
+            "timezone": "auto",
+        }
+        self.upstream_requests += 1
+        data = await get_json(FORECAST_URL, params=params)
+        # Open-Meteo answers a single location with an object and several with a list
+        items = data if isinstance(data, list) else [data]
+
+        now = time.monotonic()
+        results = {}
+        for key, item in zip(keys, items):
+            current = item.get("current_weather", {}) if isinstance(item, dict) else {}
+            if current:
+                self._entries[key] = (current, now)
+                self._entries.move_to_end(key)
+            results[key] = current
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.info(f"[Weather Cache] Fetched {len(keys)} location(s) in one request")
+        return results
+
+    def _ensure_prefetcher(self) -> None:
+        if self.top_n <= 0 or (self._prefetch_task is not None and not self._prefetch_task.done()):
+            return
+        self._prefetch_task = asyncio.get_running_loop().create_task(self._prefetch_loop())
+
+    async def _prefetch_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.prefetch_interval)
+            try:
+                await self.prefetch()
+            except Exception as e:
+                logger.warning(f"[Weather Cache] Prefetch failed: {e}")
+
+    async def prefetch(self) -> int:
+        """
+        Refreshes the N most requested locations that are due within the next interval.
+        Returns the number of locations fetched.
+        """
+        now = time.monotonic()
+        due = [
+            key for key, _ in self._demand.most_common(self.top_n)
+            if key not in self._entries or now - self._entries[key][1] > self.fresh_for - self.prefetch_interval
+        ]
+        # Decay demand so yesterday's popular cities fall out of the top N
+        for key in list(self._demand):
+            self._demand[key] //= 2
+            if not self._demand[key]:
+                del self._demand[key]
+        for i in range(0, len(due), _MAX_BATCH):
+            await self.fetch_many(due[i:i + _MAX_BATCH])
+        return len(due)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "upstream_requests": self.upstream_requests,
+        }
+
+
+forecast_cache = ForecastCache()
@@ -1,16 +1,98 @@
+import os
 import logging
 import datetime
-import requests
+from collections import OrderedDict
+from typing import Optional
 from livekit.agents import function_tool
+from hero_cache import SqliteCache, cache_path
+from hero_http import get_json, track_requests
+from hero_weather_cache import forecast_cache
+
+logger = logging.getLogger(__name__)
+
+IPINFO_URL = "https://ipinfo.io/json"
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
 
 # -------------------------------------------------
-# 🧩 LOGGING SETUP
+# 🗺️ LOCATION CACHE (shared by all worker processes)
 # -------------------------------------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
+# City -> coordinates never changes, so geocoding results are kept until evicted.
+# The IP-detected location only lives for IP_LOCATION_TTL seconds.
+GEOCODE_CACHE_SIZE = int(os.getenv("HERO_GEOCODE_CACHE_SIZE", "5000"))
+IP_LOCATION_TTL = float(os.getenv("HERO_IP_LOCATION_TTL", "3600"))
+
+_geocode_cache = SqliteCache(cache_path("geo.sqlite3"), "geocode", max_entries=GEOCODE_CACHE_SIZE)
+_ip_location_cache = SqliteCache(cache_path("geo.sqlite3"), "ip_location", max_entries=16, ttl=IP_LOCATION_TTL)
+
+
+# Small in-process front for the hottest cities so they skip the SQLite round trip.
+_HOT_COORDS_SIZE = 256
+_hot_coords: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def normalize_city(city: str) -> str:
+    return " ".join(city.strip().strip(".,?!").lower().split())
+
+
+def location_cache_stats() -> dict:
+    return {
+        "geocode": _geocode_cache.stats(),
+        "ip_location": _ip_location_cache.stats(),
+        "forecast": forecast_cache.stats(),
+    }
+
+
+async def _detect_location() -> dict:
+    """
+    Returns {"city", "latitude", "longitude"} for the machine's public IP (coordinates may be missing).
+    """
+    cached = await _ip_location_cache.aget("current")
+    if cached:
+        logger.info(f"[Weather Tool] Using cached IP location: {cached.get('city')}")
+        return cached
+
+    location_data = await get_json(IPINFO_URL)
+    location = {"city": location_data.get("city")}
+    try:
+        lat, lon = (float(v) for v in location_data.get("loc", "").split(","))
+        location.update(latitude=lat, longitude=lon)
+    except ValueError:
+        pass
+    if location["city"]:
+        await _ip_location_cache.aset("current", location)
+    return location
+
+
+async def _geocode(city: str) -> Optional[dict]:
+    """
+    Returns {"latitude", "longitude"} for a city name, or None if Open-Meteo does not know it.
+    """
+    key = normalize_city(city)
+    if key in _hot_coords:
+        _hot_coords.move_to_end(key)
+        return _hot_coords[key]
+
+    cached = await _geocode_cache.aget(key)
+    if cached:
+        _remember_hot(key, cached)
+        return cached
+
+    geo_data = await get_json(GEOCODING_URL, params={"name": city})
+    if "results" not in geo_data or len(geo_data["results"]) == 0:
+        return None
+
+    coords = {"latitude": geo_data["results"][0]["latitude"], "longitude": geo_data["results"][0]["longitude"]}
+    await _geocode_cache.aset(key, coords)
+    _remember_hot(key, coords)
+    return coords
+
+
+def _remember_hot(key: str, coords: dict) -> None:
+    _hot_coords[key] = coords
+    _hot_coords.move_to_end(key)
+    if len(_hot_coords) > _HOT_COORDS_SIZE:
+        _hot_coords.popitem(last=False)
 
 
 # -------------------------------------------------
@@ -36,36 +118,37 @@ async def get_weather(city: str = None) -> str:
     If no city is provided, it automatically detects the user's city from IP.
     """
     try:
-        # Step 1: Detect user's city automatically if not given
-        if not city:
-            logger.info("[Weather Tool] City not provided, attempting auto-detect...")
-            location_response = requests.get("https://ipinfo.io/json", timeout=5)
-            location_data = location_response.json()
-            city = location_data.get("city")
-            logger.info(f"[Weather Tool] Auto-detected city: {city}")
+        with track_requests("Weather Tool"):
+            # Step 1: Detect user's city automatically if not given
+            coords = None
+            if not city:
+                logger.info("[Weather Tool] City not provided, attempting auto-detect...")
+                location = await _detect_location()
+                city = location.get("city")
+                if "latitude" in location:
+                    coords = location
+                logger.info(f"[Weather Tool] Auto-detected city: {city}")
 
-        if not city:
-            logger.warning("[Weather Tool] Could not auto-detect city.")
-            return "Sorry, I couldn't detect your city automatically."
+            if not city:
+                logger.warning("[Weather Tool] Could not auto-detect city.")
+                return "Sorry, I couldn't detect your city automatically."
 
-        # Step 2: Fetch weather data from Open-Meteo API (no key required)
-        weather_url = f"https://api.open-meteo.com/v1/forecast?current_weather=true&timezone=auto"
-        geo_resp = requests.get(f"https://geocoding-api.open-meteo.com/v1/search?name={city}", timeout=5)
-        geo_data = geo_resp.json()
+            # Step 2: Resolve coordinates (cached) and fetch weather from Open-Meteo (no key required)
+            if coords is None:
+                coords = await _geocode(city)
 
-        if "results" not in geo_data or len(geo_data["results"]) == 0:
-            logger.error(f"[Weather Tool] City not found: {city}")
-            return f"Sorry, I couldn't find weather data for {city}."
+            if coords is None:
+                logger.error(f"[Weather Tool] City not found: {city}")
+                return f"Sorry, I couldn't find weather data for {city}."
 
-        lat = geo_data["results"][0]["latitude"]
-        lon = geo_data["results"][0]["longitude"]
+            lat = coords["latitude"]
+            lon = coords["longitude"]
 
-        logger.info(f"[Weather Tool] Coordinates for {city}: lat={lat}, lon={lon}")
+            logger.info(f"[Weather Tool] Coordinates for {city}: lat={lat}, lon={lon}")
 
-        weather_resp = requests.get(f"{weather_url}&latitude={lat}&longitude={lon}", timeout=5)
-        weather_data = weather_resp.json()
+            # Served from the stale-while-revalidate cache when this place was asked recently
+            current_weather = await forecast_cache.get(lat, lon)
 
-        current_weather = weather_data.get("current_weather", {})
         temp = current_weather.get("temperature")
         wind = current_weather.get("windspeed")
         weather_code = current_weather.get("weathercode")
@@ -90,9 +173,13 @@ async def get_weather(city: str = None) -> str:
 if __name__ == "__main__":
     import asyncio
 
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
     async def test_tools():
         print(await get_current_datetime())
         print(await get_weather())           # Auto city detection
         print(await get_weather("Delhi"))    # Manual city
+        print(await get_weather("delhi"))    # Served from the geocode cache
+        print(location_cache_stats())
 
     asyncio.run(test_tools())
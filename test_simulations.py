@@ -2,40 +2,19 @@ import asyncio
 import logging
 import os
 import shutil
-import subprocess
-from typing import Optional, List
 from livekit.agents import function_tool
+import hero_proc
+from hero_app_index import app_index, launch
+from hero_fs_index import FS_PAGE_SIZE, describe, file_index, page_footer, scan_listing
 
 try:
     import psutil
 except Exception:
     psutil = None
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
-def _run_subprocess(cmd: List[str], shell: bool = False, capture_output: bool = True, text: bool = True):
-    """
-    Run subprocess and return (returncode, stdout, stderr). Logs command.
-    """
-    logger.info(f"[subprocess] Running command: {cmd} (shell={shell})")
-    try:
-        proc = subprocess.run(cmd, shell=shell, capture_output=capture_output, text=text, check=False)
-        logger.info(f"[subprocess] returncode={proc.returncode}")
-        if proc.stdout:
-            logger.info(f"[subprocess] stdout: {proc.stdout.strip()}")
-        if proc.stderr:
-            logger.info(f"[subprocess] stderr: {proc.stderr.strip()}")
-        return proc.returncode, proc.stdout, proc.stderr
-    except Exception as e:
-        logger.exception("[subprocess] Exception while running command.")
-        return -1, "", str(e)
-
-
 @function_tool
 async def create_folder(path: str) -> str:
     """
@@ -51,20 +30,31 @@ async def create_folder(path: str) -> str:
 
 
 @function_tool
-async def list_folder_items(path: str = ".") -> str:
+async def list_folder_items(path: str = ".", page: int = 1) -> str:
     """
-    List items in the specified folder (non-recursive).
+    List items in the specified folder (non-recursive), folders first, a page at a time.
+    Hidden entries and dependency folders (node_modules, venv, ...) are left out.
+    Use find_file instead to look for a file by name anywhere.
     """
     try:
-        logger.info(f"[list_folder_items] Listing path: {path}")
+        logger.info(f"[list_folder_items] Listing path: {path} (page {page})")
         if not os.path.exists(path):
             return f"Path does not exist: {path}"
-        items = os.listdir(path)
-        logger.info(f"[list_folder_items] {len(items)} items found.")
+        page = max(1, int(page))
+        offset = (page - 1) * FS_PAGE_SIZE
+        # Indexed folders are answered from the file index, others straight from disk
+        listed = await asyncio.to_thread(file_index.listing, path, offset)
+        if listed is None:
+            listed = await asyncio.to_thread(scan_listing, path, offset)
+        items, total = listed
+        logger.info(f"[list_folder_items] {total} items found.")
         # Return a concise string; LiveKit tools should return serializable simple text/JSON
-        if not items:
+        if not total:
             return f"No items in {path}"
-        return f"Items in {path}:\n" + "\n".join(items[:200])  # limit length in response
+        if not items:
+            return f"No more items in {path} ({total} in total)"
+        return (f"Items in {path}:\n" + "\n".join(describe(i, full_path=False) for i in items)
+                + page_footer(page, len(items), total, "list_folder_items", f"path={path!r}"))
     except Exception as e:
         logger.exception("[list_folder_items] Error listing folder")
         return f"Error listing folder {path}: {e}"
@@ -74,7 +64,8 @@ async def list_folder_items(path: str = ".") -> str:
 async def run_application(name_or_path: str) -> str:
     """
     Try to run an application by name or full path. If not found, says not available.
-    Uses shutil.which and common Windows Program Files locations.
+    Names are looked up in the application index (hero_app_index), which also matches
+    aliases and close misspellings.
     """
     try:
         logger.info(f"[run_application] Request to run: {name_or_path}")
@@ -82,40 +73,14 @@ async def run_application(name_or_path: str) -> str:
         # If a full path provided and exists, run it
         if os.path.isabs(name_or_path) and os.path.exists(name_or_path):
             logger.info("[run_application] Running absolute path.")
-            # Use startfile or subprocess depending on platform
-            if os.name == "nt":
-                os.startfile(name_or_path)
-                return f"Launched {name_or_path}"
-            else:
-                # POSIX fallback
-                _run_subprocess([name_or_path])
-                return f"Launched {name_or_path}"
-
-        # Try to locate via PATH
-        exe_path = shutil.which(name_or_path)
-        if exe_path:
-            logger.info(f"[run_application] Found in PATH: {exe_path}")
-            if os.name == "nt":
-                os.startfile(exe_path)
-            else:
-                _run_subprocess([exe_path])
+            await launch([name_or_path])
             return f"Launched {name_or_path}"
-        
-        # Try common Windows program directories (best-effort, Windows specific)
-        if os.name == "nt":
-            program_files = [os.environ.get("ProgramFiles", r"C:\Program Files"), os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")]
-            for base in program_files:
-                candidate = os.path.join(base, name_or_path)
-                if os.path.exists(candidate):
-                    logger.info(f"[run_application] Found candidate: {candidate}")
-                    os.startfile(candidate)
-                    return f"Launched {candidate}"
-                # try with exe suffix
-                candidate_exe = candidate + ".exe"
-                if os.path.exists(candidate_exe):
-                    logger.info(f"[run_application] Found candidate exe: {candidate_exe}")
-                    os.startfile(candidate_exe)
-                    return f"Launched {candidate_exe}"
+
+        entry = await asyncio.to_thread(app_index.resolve, name_or_path)
+        if entry is not None:
+            logger.info(f"[run_application] Found {entry.name} ({entry.source}): {entry.command}")
+            await launch(entry.command)
+            return f"Launched {entry.name}"
 
         logger.warning("[run_application] Application not found")
         return f"Application not available: {name_or_path}"
@@ -142,7 +107,7 @@ async def play_media_file(file_path: str) -> str:
             # POSIX
             opener = shutil.which("xdg-open") or shutil.which("open")
             if opener:
-                _run_subprocess([opener, file_path])
+                await hero_proc.launch([opener, file_path])
                 return f"Playing {file_path} with {opener}"
             else:
                 return "No system opener found on this OS to play media."
@@ -170,7 +135,8 @@ async def get_battery_percentage() -> str:
         
         # Fallback: Windows WMIC
         if os.name == "nt":
-            rc, out, err = _run_subprocess(["wmic", "path", "Win32_Battery", "get", "EstimatedChargeRemaining"], shell=False)
+            result = await hero_proc.run(["wmic", "path", "Win32_Battery", "get", "EstimatedChargeRemaining"], timeout=10)
+            rc, out, err = result.returncode, result.stdout, result.stderr
             if rc == 0 and out:
                 # Parse the output (WMIC returns a table; extract the number)
                 lines = out.strip().split('\n')
@@ -199,12 +165,12 @@ async def open_settings() -> str:
         logger.info("[open_settings] Opening system settings")
         if os.name == "nt":
             # ms-settings: URI opens Windows Settings
-            _run_subprocess(["start", "ms-settings:"], shell=True)
+            await hero_proc.launch("start ms-settings:")
             return "Opening Windows Settings..."
         else:
             opener = shutil.which("gnome-control-center") or shutil.which("systemsettings") or shutil.which("xdg-open")
             if opener:
-                _run_subprocess([opener])
+                await hero_proc.launch([opener])
                 return f"Opening settings via {opener}..."
             return "Could not find a settings application on this system."
     except Exception as e:
@@ -220,19 +186,18 @@ async def get_system_info() -> str:
     try:
         logger.info("[get_system_info] Gathering system information")
         if os.name == "nt":
-            rc, out, err = _run_subprocess(["systeminfo"])
-            if rc == 0:
-                # Limit the size of returned text
-                return out[:8000] if out else "No systeminfo output"
-            return f"systeminfo failed: {err}"
+            # systeminfo output is capped at the source rather than cut afterwards
+            result = await hero_proc.run(["systeminfo"], timeout=30, max_output=8000)
+            if result.ok:
+                return result.stdout or "No systeminfo output"
+            if result.timed_out:
+                return "systeminfo timed out"
+            return f"systeminfo failed: {result.stderr}"
         else:
             # POSIX fallback
-            uname_rc, uname_out, _ = _run_subprocess(["uname", "-a"])
-            lsb = ""
-            if shutil.which("lsb_release"):
-                _, lsb_out, _ = _run_subprocess(["lsb_release", "-a"])
-                lsb = "\n" + (lsb_out or "")
-            return (uname_out or "") + lsb
+            commands = [["uname", "-a"]] + ([["lsb_release", "-a"]] if shutil.which("lsb_release") else [])
+            results = await asyncio.gather(*(hero_proc.run(c, timeout=5) for c in commands))
+            return "\n".join(r.stdout for r in results if r.stdout)
     except Exception as e:
         logger.exception("[get_system_info] Error fetching system info")
         return f"Error fetching system info: {e}"